@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measure agent cold-start cost of loading connection modules
+
+Each measurement runs in a fresh interpreter and compares:
+  - lazy:  importing only the connections the agent config references
+  - eager: importing every registered connection (the old import-everything behaviour)
+
+Connections are resolved but not constructed, so no credentials or network access are needed.
+
+Usage: python benchmark_startup.py [agent_name ...] [--runs N]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+MEASURE_SNIPPET = """
+import json, resource, sys, time
+start = time.perf_counter()
+from src.connection_manager import CONNECTION_REGISTRY, ConnectionManager
+names = {names!r} or list(CONNECTION_REGISTRY)
+for name in names:
+    try:
+        ConnectionManager._class_name_to_type(name)
+    except Exception as e:
+        print(f"could not import {{name}}: {{e}}", file=sys.stderr)
+elapsed = time.perf_counter() - start
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_mb, "modules": len(sys.modules)}}))
+"""
+
+
+def measure(connection_names, runs):
+    """Run the import measurement `runs` times in fresh interpreters and return the medians"""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", MEASURE_SNIPPET.format(names=connection_names)],
+            capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ZerePy connection cold-start")
+    parser.add_argument("agents", nargs="*", default=["starter"], help="Agent names in agents/ (default: starter)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per measurement (default: 3)")
+    args = parser.parse_args()
+
+    eager = measure([], args.runs)
+    print(f"{'agent':<20} {'mode':<6} {'import s':>9} {'max RSS MB':>11} {'modules':>8}")
+    for agent_name in args.agents:
+        agent_config = json.load(open(Path("agents") / f"{agent_name}.json"))
+        connection_names = [config["name"] for config in agent_config["config"]]
+        lazy = measure(connection_names, args.runs)
+        for mode, stats in (("lazy", lazy), ("eager", eager)):
+            print(f"{agent_name:<20} {mode:<6} {stats['seconds']:>9.2f} {stats['rss_mb']:>11.1f} {stats['modules']:>8.0f}")
+        print(f"{'':<20} saved  {eager['seconds'] - lazy['seconds']:>9.2f} {eager['rss_mb'] - lazy['rss_mb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from src.metrics import get_metrics_registry
 
 logger = logging.getLogger("action_handler")
 
@@ -10,11 +12,31 @@ def register_action(action_name):
         return func
     return decorator
 
+def _track(action_name):
+    return get_metrics_registry().track("action_runs", "Agent action run", action=action_name)
+
 def execute_action(agent, action_name, **kwargs):
     if action_name in action_registry:
-       return action_registry[action_name](agent, **kwargs)
+        with _track(action_name) as timing:
+            result = action_registry[action_name](agent, **kwargs)
+            # Actions return a falsy result when there was nothing to do
+            timing.outcome = "success" if result else "noop"
+            return result
     else:
         logger.error(f"Action {action_name} not found")
         return None
-    
 
+async def execute_action_async(agent, action_name, **kwargs):
+    """Run a registered action on the event loop, offloading synchronous handlers to a worker thread"""
+    if action_name not in action_registry:
+        logger.error(f"Action {action_name} not found")
+        return None
+
+    handler = action_registry[action_name]
+    with _track(action_name) as timing:
+        if asyncio.iscoroutinefunction(handler):
+            result = await handler(agent, **kwargs)
+        else:
+            result = await asyncio.to_thread(handler, agent, **kwargs)
+        timing.outcome = "success" if result else "noop"
+        return result
@@ -1,7 +1,11 @@
 import time,random
 from src.action_handler import register_action
+from src.helpers.tokens import fit_recent, truncate_to_tokens
 from src.prompts import REPLY_ECHOCHAMBER_PROMPT, POST_ECHOCHAMBER_PROMPT
 
+# Longest incoming message quoted in a reply prompt, in tokens
+MAX_REPLY_CONTENT_TOKENS = 300
+
 @register_action("post-echochambers")
 def post_echochambers(agent, **kwargs):
     current_time = time.time()
@@ -15,8 +19,14 @@ def post_echochambers(agent, **kwargs):
     if current_time - agent.state["echochambers_last_message"] > agent.echochambers_message_interval:
         agent.logger.info("\n📝 GENERATING NEW ECHOCHAMBERS MESSAGE")
         
-        # Generate message based on room topic and tags
-        previous_messages = agent.connection_manager.connections["echochambers"].sent_messages
+        # Generate message based on room topic and tags, quoting as much recent history as fits the budget
+        echochambers = agent.connection_manager.connections["echochambers"]
+        previous_messages = fit_recent(
+            echochambers.sent_messages,
+            echochambers.history_token_budget,
+            lambda msg: f"- {msg['content']}",
+            tokenizer=agent.tokenizer
+        )
         previous_content = "\n".join([f"- {msg['content']}" for msg in previous_messages])
         agent.logger.info(f"Found {len(previous_messages)} messages in post history")
         
@@ -48,6 +58,8 @@ def reply_echochambers(agent, **kwargs):
         agent.state["echochambers_replied_messages"] = set()
         
 
+    echochambers = agent.connection_manager.connections["echochambers"]
+
     # Get recent messages
     history = agent.connection_manager.perform_action(
         connection_name="echochambers",
@@ -71,8 +83,10 @@ def reply_echochambers(agent, **kwargs):
             # Skip if:
             # 1. It's our message
             # 2. We've already replied to it
-            if (sender_username == agent.connection_manager.connections["echochambers"].config["sender_username"] or 
-                message_id in agent.state.get("echochambers_replied_messages", set())):
+            # 3. It is older than the window replied ids are remembered for
+            if (sender_username == echochambers.config["sender_username"] or 
+                message_id in agent.state.get("echochambers_replied_messages", set()) or
+                echochambers.is_stale(message)):
                 agent.logger.info(f"Skipping message from {sender_username} (already replied or own message)")
                 continue
                 
@@ -81,7 +95,7 @@ def reply_echochambers(agent, **kwargs):
             refer_username = random.random() < 0.7
             username_prompt = f"Refer the sender by their @{sender_username}" if refer_username else "Respond without directly referring to the sender"
             prompt = REPLY_ECHOCHAMBER_PROMPT.format(
-                content=content,
+                content=truncate_to_tokens(content, MAX_REPLY_CONTENT_TOKENS, tokenizer=agent.tokenizer),
                 sender_username=sender_username,
                 room_topic=agent.state['room_info']['topic'],
                 tags=", ".join(agent.state['room_info']['tags']),
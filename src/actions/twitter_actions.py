@@ -1,9 +1,18 @@
-import time,threading
+import time
 from src.action_handler import register_action
 from src.helpers import print_h_bar
+from src.helpers.rate_limit import RateLimited, endpoint_key, get_rate_limit_governor
 from src.prompts import POST_TWEET_PROMPT, REPLY_TWEET_PROMPT
 
 
+def _check_post_budget():
+    # Defer before generating text that could not be posted anyway
+    bucket = endpoint_key("post", "tweets")
+    delay = get_rate_limit_governor().delay("twitter", bucket)
+    if delay > 0:
+        raise RateLimited("twitter", bucket, time.time() + delay)
+
+
 @register_action("post-tweet")
 def post_tweet(agent, **kwargs):
     current_time = time.time()
@@ -14,6 +23,7 @@ def post_tweet(agent, **kwargs):
         last_tweet_time = agent.state["last_tweet_time"]
 
     if current_time - last_tweet_time >= agent.tweet_interval:
+        _check_post_budget()
         agent.logger.info("\n📝 GENERATING NEW TWEET")
         print_h_bar()
 
@@ -39,6 +49,7 @@ def post_tweet(agent, **kwargs):
 @register_action("reply-to-tweet")
 def reply_to_tweet(agent, **kwargs):
     if "timeline_tweets" in agent.state and agent.state["timeline_tweets"] is not None and len(agent.state["timeline_tweets"]) > 0:
+        _check_post_budget()
         tweet = agent.state["timeline_tweets"].pop(0)
         tweet_id = tweet.get('id')
         if not tweet_id:
@@ -47,8 +58,7 @@ def reply_to_tweet(agent, **kwargs):
         agent.logger.info(f"\n💬 GENERATING REPLY to: {tweet.get('text', '')[:50]}...")
 
         base_prompt = REPLY_TWEET_PROMPT.format(tweet_text =tweet.get('text') )
-        system_prompt = agent._construct_system_prompt()
-        reply_text = agent.prompt_llm(prompt=base_prompt, system_prompt=system_prompt)
+        reply_text = agent.prompt_llm(prompt=base_prompt)
 
         if reply_text:
             agent.logger.info(f"\n🚀 Posting reply: '{reply_text}'")
@@ -97,19 +107,8 @@ def like_tweet(agent, **kwargs):
 
 @register_action("respond-to-mentions")
 def respond_to_mentions(agent,**kwargs): #REQUIRES TWITTER PREMIUM PLAN
-
-    filter_str = f"@{agent.username} -is:retweet"
-    stream_function = agent.connection_manager.perform_action(
-        connection_name="twitter",
-        action_name="stream-tweets",
-        params=[filter_str]
-    )
-    def process_tweets():
-        for tweet_data in stream_function:
-            tweet_id = tweet_data["id"]
-            tweet_text = tweet_data["text"]
-            agent.logger.info(f"Received a mention: {tweet_text}")
-
-    processing_thread = threading.Thread(target=process_tweets)
-    processing_thread.daemon = True
-    processing_thread.start()
\ No newline at end of file
+    # Mentions are streamed into the timeline queue that reply-to-tweet and like-tweet draw from
+    if not agent.start_tweet_stream():
+        return False
+    agent.logger.info(f"\n📡 Streaming mentions of @{agent.username}")
+    return True
@@ -1,26 +1,55 @@
+import asyncio
+import contextlib
 import json
-import random
-import time
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
 from dotenv import load_dotenv
 from src.connection_manager import ConnectionManager
+from src.connection_pool import ConnectionPool
+from src.llm_router import LLMRouter
 from src.helpers import print_h_bar
-from src.action_handler import execute_action
+from src.action_handler import execute_action_async
+from src.helpers.rate_limit import RateLimited
+from src.helpers.tokens import Tokenizer, get_tokenizer
+from src.prompt_builder import DEFAULT_SYSTEM_PROMPT_TOKENS, PromptBuilder, PromptParts, join_prompt_parts
+from src.scheduler import ScheduledTask, TaskScheduler
+from src.state_store import AgentState, open_state_store
+from src.connections.echochambers_connection import ECHOCHAMBERS_DEDUP_WINDOW
+from src.tweet_stream import SEEN_TWEETS_LIMIT, TweetQueue, TweetStreamConsumer
 import src.actions.twitter_actions  
 import src.actions.echochamber_actions
 import src.actions.solana_actions
+
+if TYPE_CHECKING:
+    from src.subscriptions import ChainEvent, EventQueue
 from datetime import datetime
 
 REQUIRED_FIELDS = ["name", "bio", "traits", "examples", "loop_delay", "config", "tasks"]
 
+# Seconds between checks for inputs (timeline, room info) that need replenishing
+INPUT_REFRESH_DELAY = 30
+
+# Seconds between refreshes of the example accounts' tweets in the system prompt
+EXAMPLE_REFRESH_INTERVAL = 3600
+
+# Most recent chain events kept in agent state for actions to read
+CHAIN_EVENTS_KEPT = 100
+
+# State restored after a restart, see src/state_store.py
+PERSISTED_STATE_KEYS = ("last_tweet_time", "echochambers_last_message")
+PERSISTED_STATE_SETS = {"echochambers_replied_messages": (10000, ECHOCHAMBERS_DEDUP_WINDOW)}
+
 logger = logging.getLogger("agent")
 
 class ZerePyAgent:
     def __init__(
             self,
-            agent_name: str
+            agent_name: str,
+            connection_pool: Optional[ConnectionPool] = None
     ):
         try:
             agent_path = Path("agents") / f"{agent_name}.json"
@@ -36,7 +65,9 @@ class ZerePyAgent:
             self.examples = agent_dict["examples"]
             self.example_accounts = agent_dict["example_accounts"]
             self.loop_delay = agent_dict["loop_delay"]
-            self.connection_manager = ConnectionManager(agent_dict["config"])
+            self.connection_manager = ConnectionManager(
+                agent_dict["config"], connection_pool=connection_pool, cursor_scope=self.name
+            )
             self.use_time_based_weights = agent_dict["use_time_based_weights"]
             self.time_based_multipliers = agent_dict["time_based_multipliers"]
 
@@ -47,6 +78,8 @@ class ZerePyAgent:
             if has_twitter_tasks and twitter_config:
                 self.tweet_interval = twitter_config.get("tweet_interval", 900)
                 self.own_tweet_replies_count = twitter_config.get("own_tweet_replies_count", 2)
+                # Stream mentions as they happen (needs TWITTER_BEARER_TOKEN and a premium plan)
+                self.stream_mentions = twitter_config.get("stream_mentions", False)
 
             # Extract Echochambers config
             echochambers_config = next((config for config in agent_dict["config"] if config["name"] == "echochambers"), None)
@@ -55,28 +88,88 @@ class ZerePyAgent:
                 self.echochambers_history_count = echochambers_config.get("history_read_count", 50)
 
             self.is_llm_set = False
+            # Routing across LLM providers, e.g. {"hedge_after": 8} or {"hedge_after": "p95"}, see src/llm_router.py
+            self.llm_router_config = agent_dict.get("llm_router", {})
+            self.llm_router: Optional[LLMRouter] = None
+            # The first provider's tokenizer, used for prompt budgets when available
+            self.tokenizer: Optional[Tokenizer] = None
 
-            # Cache for system prompt
+            # Cache for system prompt, built to fit this many tokens
             self._system_prompt = None
+            self.system_prompt_tokens = agent_dict.get("system_prompt_tokens", DEFAULT_SYSTEM_PROMPT_TOKENS)
+
+            # Latest tweets of each example account, refreshed in the background by the agent loop
+            self._example_tweets = {}
+            self._example_refresh_task: Optional[asyncio.Task] = None
+            self.example_refresh_interval = agent_dict.get("example_refresh_interval", EXAMPLE_REFRESH_INTERVAL)
+
+            # Chain subscriptions (blocks, transfers, Solana accounts), see src/subscriptions.py
+            self.subscriptions = agent_dict.get("subscriptions", [])
 
             # Extract loop tasks
             self.tasks = agent_dict.get("tasks", [])
             self.task_weights = [task.get("weight", 0) for task in self.tasks]
             self.logger = logging.getLogger("agent")
 
-            # Set up empty agent state
-            self.state = {}
+            # Set up agent state, restoring what was persisted before a restart
+            self.state_store = open_state_store(self.name, agent_dict.get("state_store"))
+            self.state = AgentState(self.state_store, PERSISTED_STATE_KEYS, self._persisted_state_sets())
+            self._attach_echochambers_state()
+
+            # Shared by agents in the same host so each gets its turn at running an action
+            self.action_slots: Optional[asyncio.Semaphore] = None
+
+            # Built when the loop starts, see src/scheduler.py
+            self.scheduler: Optional[TaskScheduler] = None
+
+            # Mention stream feeding state["timeline_tweets"], see src/tweet_stream.py
+            self.tweet_stream: Optional[TweetStreamConsumer] = None
+            self._event_loop: Optional[asyncio.AbstractEventLoop] = None
 
         except Exception as e:
             logger.error("Could not load ZerePy agent")
             raise e
 
+    def _persisted_state_sets(self) -> dict:
+        """PERSISTED_STATE_SETS with replied ids kept as long as the Echochambers connection treats messages as fresh"""
+        sets = dict(PERSISTED_STATE_SETS)
+        echochambers = self.connection_manager.connections.get("echochambers")
+        if echochambers is not None:
+            limit, _ = sets["echochambers_replied_messages"]
+            sets["echochambers_replied_messages"] = (limit, echochambers.dedup_window)
+        return sets
+
+    def _attach_echochambers_state(self) -> None:
+        """
+        Back the Echochambers connection's processed and sent message history with the state store.
+        Echochambers connections aren't pooled, so the instance swapped into belongs to this agent.
+        """
+        echochambers = self.connection_manager.connections.get("echochambers")
+        if echochambers is None:
+            return
+        echochambers.processed_messages = self.state_store.member_set(
+            "echochambers_processed_messages",
+            echochambers.processed_messages.limit,
+            echochambers.processed_messages.window
+        )
+        echochambers.sent_messages = self.state_store.message_log(
+            "echochambers_sent_messages", echochambers.sent_messages.maxlen
+        )
+
     def _setup_llm_provider(self):
-        # Get first available LLM provider and its model
+        # Route generations across every configured LLM provider, the first one configured is tried first
         llm_providers = self.connection_manager.get_model_providers()
         if not llm_providers:
             raise ValueError("No configured LLM provider found")
         self.model_provider = llm_providers[0]
+        self.tokenizer = get_tokenizer(
+            self.model_provider, self.connection_manager.connections[self.model_provider].config.get("model")
+        )
+        self.llm_router = LLMRouter(
+            self.connection_manager,
+            llm_providers,
+            hedge_after=self.llm_router_config.get("hedge_after")
+        )
 
         # Load Twitter username for self-reply detection if Twitter tasks exist
         if any("tweet" in task["name"] for task in self.tasks):
@@ -87,33 +180,96 @@ class ZerePyAgent:
 
     def _construct_system_prompt(self) -> str:
         """Construct the system prompt from agent configuration"""
+        return join_prompt_parts(*self._system_prompt_parts())
+
+    def _system_prompt_parts(self) -> PromptParts:
+        """The system prompt as (stable, volatile) parts, so providers can cache the stable one"""
         if self._system_prompt is None:
-            prompt_parts = []
-            prompt_parts.extend(self.bio)
-
-            if self.traits:
-                prompt_parts.append("\nYour key traits are:")
-                prompt_parts.extend(f"- {trait}" for trait in self.traits)
-
-            if self.examples or self.example_accounts:
-                prompt_parts.append("\nHere are some examples of your style (Please avoid repeating any of these):")
-                if self.examples:
-                    prompt_parts.extend(f"- {example}" for example in self.examples)
-
-                if self.example_accounts:
-                    for example_account in self.example_accounts:
-                        tweets = self.connection_manager.perform_action(
-                            connection_name="twitter",
-                            action_name="get-latest-tweets",
-                            params=[example_account]
-                        )
-                        if tweets:
-                            prompt_parts.extend(f"- {tweet['text']}" for tweet in tweets)
-
-            self._system_prompt = "\n".join(prompt_parts)
+            if self.example_accounts and self._example_refresh_task is None and not self._example_tweets:
+                # Outside the agent loop nothing refreshes the examples, so fetch them once here
+                self._store_example_tweets(self._fetch_example_tweets())
+            self._system_prompt = self._build_system_prompt()
 
         return self._system_prompt
-    
+
+    def _build_system_prompt(self) -> PromptParts:
+        # Bio and traits are never trimmed; fetched tweets go first when over budget, then the examples.
+        # The fetched tweets change between refreshes, so they come last to keep the rest a cacheable prefix.
+        builder = PromptBuilder(self.system_prompt_tokens, self.tokenizer)
+        builder.add("bio", self.bio, priority=0)
+        builder.add("traits", [f"- {trait}" for trait in self.traits], header="\nYour key traits are:", priority=0)
+
+        examples_header = "\nHere are some examples of your style (Please avoid repeating any of these):"
+        examples = [f"- {example}" for example in self.examples or []]
+        builder.add("examples", examples, header=examples_header if examples else None, priority=1)
+
+        account_tweets = [
+            f"- {text}"
+            for example_account in self.example_accounts or []
+            for text in self._example_tweets.get(example_account, [])
+        ]
+        builder.add(
+            "example_tweets",
+            account_tweets,
+            header=None if examples else examples_header,
+            stable=False,
+            priority=2
+        )
+
+        system_prompt = builder.build_parts()
+        logger.debug(f"System prompt is about {builder.tokens} tokens")
+        return system_prompt
+
+    def _fetch_account_tweets(self, example_account: str) -> Optional[List[str]]:
+        try:
+            tweets = self.connection_manager.perform_action(
+                connection_name="twitter",
+                action_name="get-latest-tweets",
+                # The prompt needs the latest tweets, not just those since the last read
+                params=[example_account, 10, False]
+            )
+        except RateLimited as e:
+            logger.warning(f"Could not fetch example tweets from {example_account}: {e}")
+            return None
+        return [tweet["text"] for tweet in tweets] if tweets else None
+
+    def _fetch_example_tweets(self) -> dict:
+        """Latest tweets of every example account, fetched concurrently; accounts that failed are left out"""
+        if not self.example_accounts:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(self.example_accounts)) as executor:
+            results = list(executor.map(self._fetch_account_tweets, self.example_accounts))
+        return {account: texts for account, texts in zip(self.example_accounts, results) if texts}
+
+    def _store_example_tweets(self, fetched: dict) -> bool:
+        """Merge freshly fetched example tweets, returning True if the prompt needs rebuilding"""
+        changed = {account: texts for account, texts in fetched.items() if self._example_tweets.get(account) != texts}
+        if not changed:
+            return False
+        # Swap in a new dict so a prompt being built in another thread never sees it half updated
+        self._example_tweets = {**self._example_tweets, **changed}
+        return True
+
+    async def refresh_example_tweets(self) -> bool:
+        """Fetch the example accounts' latest tweets and swap in a rebuilt system prompt if any changed"""
+        fetched = await asyncio.to_thread(self._fetch_example_tweets)
+        if not self._store_example_tweets(fetched):
+            return False
+        # A single assignment, so concurrent generations see either the old prompt or the new one
+        self._system_prompt = await asyncio.to_thread(self._build_system_prompt)
+        logger.info("\n🔄 Refreshed example tweets in the system prompt")
+        return True
+
+    async def _refresh_example_tweets_loop(self) -> None:
+        """Keep the example tweets in the system prompt current without holding up any action"""
+        while True:
+            delay = self.example_refresh_interval
+            try:
+                await self.refresh_example_tweets()
+            except Exception as e:
+                logger.error(f"\n❌ Error refreshing example tweets: {e}")
+            await asyncio.sleep(delay)
+
     def _adjust_weights_for_time(self, current_hour: int, task_weights: list) -> list:
         weights = task_weights.copy()
         
@@ -136,84 +292,245 @@ class ZerePyAgent:
         return weights
 
     def prompt_llm(self, prompt: str, system_prompt: str = None) -> str:
-        """Generate text using the configured LLM provider"""
-        system_prompt = system_prompt or self._construct_system_prompt()
+        """Generate text using the fastest healthy LLM provider"""
+        system_prompt = system_prompt or self._system_prompt_parts()
 
-        return self.connection_manager.perform_action(
-            connection_name=self.model_provider,
-            action_name="generate-text",
-            params=[prompt, system_prompt]
-        )
+        return self.llm_router.generate(prompt, system_prompt)
+
+    async def prompt_llm_async(self, prompt: str, system_prompt: str = None) -> str:
+        """Generate text using the fastest healthy LLM provider without blocking the event loop"""
+        system_prompt = system_prompt or await asyncio.to_thread(self._system_prompt_parts)
+
+        return await self.llm_router.generate_async(prompt, system_prompt)
+
+    def prompt_llm_batch(self, prompts: List, system_prompt: str = None) -> List[Optional[str]]:
+        """Generate text for several prompts concurrently, results come back in prompt order"""
+        system_prompt = system_prompt or self._system_prompt_parts()
+
+        return self.llm_router.generate_batch(prompts, system_prompt)
+
+    async def prompt_llm_batch_async(self, prompts: List, system_prompt: str = None) -> List[Optional[str]]:
+        """Generate text for several prompts concurrently without blocking the event loop"""
+        system_prompt = system_prompt or await asyncio.to_thread(self._system_prompt_parts)
+
+        return await self.llm_router.generate_batch_async(prompts, system_prompt)
 
     def perform_action(self, connection: str, action: str, **kwargs) -> None:
         return self.connection_manager.perform_action(connection, action, **kwargs)
+
+    async def perform_action_async(self, connection: str, action: str, **kwargs) -> None:
+        return await self.connection_manager.perform_action_async(connection, action, **kwargs)
     
-    def select_action(self, use_time_based_weights: bool = False) -> dict:
-        task_weights = [weight for weight in self.task_weights.copy()]
-        
-        if use_time_based_weights:
-            current_hour = datetime.now().hour
-            task_weights = self._adjust_weights_for_time(current_hour, task_weights)
-        
-        return random.choices(self.tasks, weights=task_weights, k=1)[0]
+    def _current_task_weights(self) -> list:
+        if self.use_time_based_weights:
+            return self._adjust_weights_for_time(datetime.now().hour, self.task_weights)
+        return self.task_weights
+
+    def _task_min_interval(self, task: dict) -> float:
+        """Shortest period for a task, so the scheduler never wakes it before it can do anything"""
+        if "interval" in task:
+            return task["interval"]
+        if task["name"] == "post-tweet":
+            return getattr(self, "tweet_interval", 0)
+        if task["name"] == "post-echochambers":
+            return getattr(self, "echochambers_message_interval", 0)
+        return 0
+
+    def _build_scheduler(self) -> TaskScheduler:
+        tasks = [
+            ScheduledTask(
+                name=task["name"],
+                weight=task.get("weight", 0),
+                min_interval=self._task_min_interval(task),
+                cooldown=task.get("cooldown")
+            )
+            for task in self.tasks
+        ]
+        return TaskScheduler(tasks, self.loop_delay, weights_fn=self._current_task_weights)
+
+    def _timeline_queue(self) -> TweetQueue:
+        """The queue in state["timeline_tweets"], created on first use"""
+        tweets = self.state.get("timeline_tweets")
+        if not isinstance(tweets, TweetQueue):
+            queue = TweetQueue(seen=self.state_store.member_set("twitter_seen_tweets", SEEN_TWEETS_LIMIT))
+            queue.extend(tweets)
+            self.state["timeline_tweets"] = tweets = queue
+        return tweets
+
+    def _on_streamed_tweet(self, tweet: dict) -> None:
+        # Runs on the event loop; a mention is worth replying to now rather than at the next scheduled reply
+        if self.scheduler:
+            self.scheduler.trigger("reply-to-tweet")
+
+    def start_tweet_stream(self) -> bool:
+        """Start streaming mentions into the timeline queue; returns False if already streaming"""
+        if self.tweet_stream and self.tweet_stream.running:
+            return False
+
+        on_tweet = None
+        if self._event_loop:
+            loop = self._event_loop
+            on_tweet = lambda tweet: loop.call_soon_threadsafe(self._on_streamed_tweet, tweet)
+        self.tweet_stream = TweetStreamConsumer(
+            self.connection_manager,
+            f"@{self.username} -is:retweet",
+            self._timeline_queue(),
+            on_tweet=on_tweet
+        )
+        self.tweet_stream.start()
+        return True
 
-    def loop(self):
-        """Main agent loop for autonomous behavior"""
+    async def _replenish_inputs(self) -> None:
+        """Refill agent inputs that have been consumed by actions"""
+        # TODO: Add more inputs to complexify agent behavior
+        if any("tweet" in task["name"] for task in self.tasks):
+            timeline = self._timeline_queue()
+            if len(timeline) == 0:
+                logger.info("\n👀 READING TIMELINE")
+                tweets = await self.connection_manager.perform_action_async(
+                    connection_name="twitter",
+                    action_name="read-timeline",
+                    params=[]
+                )
+                # Tweets already replied to or liked are dropped by the queue
+                if timeline.extend(tweets) and self.scheduler:
+                    # Tasks that found the timeline empty can run again now
+                    for name in ("reply-to-tweet", "like-tweet"):
+                        self.scheduler.retry_now(name)
+
+        if "room_info" not in self.state or self.state["room_info"] is None:
+            if any("echochambers" in task["name"] for task in self.tasks):
+                logger.info("\n👀 READING ECHOCHAMBERS ROOM INFO")
+                self.state["room_info"] = await self.connection_manager.perform_action_async(
+                    connection_name="echochambers",
+                    action_name="get-room-info",
+                    params={}
+                )
+                if self.state["room_info"] and self.scheduler:
+                    self.scheduler.retry_now("post-echochambers")
+
+    async def _replenish_inputs_loop(self) -> None:
+        """Keep inputs topped up in the background so reads never wait behind a slow action"""
+        while True:
+            delay = INPUT_REFRESH_DELAY
+            try:
+                await self._replenish_inputs()
+            except RateLimited as e:
+                logger.info(f"\n⏸️ Deferring input refresh: {e}")
+                delay = max(delay, e.retry_after)
+            except Exception as e:
+                logger.error(f"\n❌ Error replenishing agent inputs: {e}")
+            await asyncio.sleep(delay)
+
+    async def _handle_events_loop(self, queue: "EventQueue") -> None:
+        """Record chain events in agent state and run the action a subscription names for them"""
+        while True:
+            event: "ChainEvent" = await queue.get()
+            events = self.state.setdefault("chain_events", [])
+            events.append(event)
+            del events[:-CHAIN_EVENTS_KEPT]
+            logger.info(f"\n⛓️ {event.kind} event from {event.subscription}: {event.id}")
+
+            if event.task:
+                try:
+                    async with self.action_slots or contextlib.nullcontext():
+                        await execute_action_async(self, event.task, event=event)
+                except Exception as e:
+                    logger.error(f"\n❌ Error handling {event.kind} event with {event.task}: {e}")
+
+    async def loop_async(self):
+        """Main agent loop for autonomous behavior, run as coroutines on the current event loop"""
         if not self.is_llm_set:
-            self._setup_llm_provider()
+            await asyncio.to_thread(self._setup_llm_provider)
 
         logger.info("\n🚀 Starting agent loop...")
         logger.info("Press Ctrl+C at any time to stop the loop.")
         print_h_bar()
 
-        time.sleep(2)
+        await asyncio.sleep(2)
         logger.info("Starting loop in 5 seconds...")
         for i in range(5, 0, -1):
             logger.info(f"{i}...")
-            time.sleep(1)
+            await asyncio.sleep(1)
+
+        # SCHEDULE TASKS
+        self.scheduler = self._build_scheduler()
+        self._event_loop = asyncio.get_running_loop()
+
+        # REFRESH EXAMPLE TWEETS
+        # Generations use the prompt without them until the first refresh lands
+        if self.example_accounts:
+            self._example_refresh_task = asyncio.create_task(self._refresh_example_tweets_loop())
+
+        # REPLENISH INPUTS
+        # The first pass completes before any action runs, later passes run alongside actions
+        try:
+            await self._replenish_inputs()
+        except Exception as e:
+            logger.error(f"\n❌ Error replenishing agent inputs: {e}")
+        replenish_task = asyncio.create_task(self._replenish_inputs_loop())
+
+        # STREAM MENTIONS
+        if getattr(self, "stream_mentions", False):
+            self.start_tweet_stream()
+
+        # SUBSCRIBE TO CHAIN EVENTS
+        subscription_engine = None
+        events_task = None
+        if self.subscriptions:
+            # Only agents with subscriptions load the engine and, through it, the chain SDKs
+            from src.subscriptions import SubscriptionEngine
+
+            subscription_engine = SubscriptionEngine(
+                self.connection_manager,
+                self.subscriptions,
+                checkpoint_path=Path.home() / ".zerepy" / "checkpoints" / f"{self.name}.json"
+            )
+            subscription_engine.start()
+            events_task = asyncio.create_task(self._handle_events_loop(subscription_engine.queue))
 
         try:
             while True:
+                # WAIT FOR THE NEXT DUE TASK
+                # TODO: Add agentic action selection
+                action_name = await self.scheduler.next_task()
                 success = False
+                deferred_until = None
                 try:
-                    # REPLENISH INPUTS
-                    # TODO: Add more inputs to complexify agent behavior
-                    if "timeline_tweets" not in self.state or self.state["timeline_tweets"] is None or len(self.state["timeline_tweets"]) == 0:
-                        if any("tweet" in task["name"] for task in self.tasks):
-                            logger.info("\n👀 READING TIMELINE")
-                            self.state["timeline_tweets"] = self.connection_manager.perform_action(
-                                connection_name="twitter",
-                                action_name="read-timeline",
-                                params=[]
-                            )
-
-                    if "room_info" not in self.state or self.state["room_info"] is None:
-                        if any("echochambers" in task["name"] for task in self.tasks):
-                            logger.info("\n👀 READING ECHOCHAMBERS ROOM INFO")
-                            self.state["room_info"] = self.connection_manager.perform_action(
-                                connection_name="echochambers",
-                                action_name="get-room-info",
-                                params={}
-                            )
-
-                    # CHOOSE AN ACTION
-                    # TODO: Add agentic action selection
-                    
-                    action = self.select_action(use_time_based_weights=self.use_time_based_weights)
-                    action_name = action["name"]
-
                     # PERFORM ACTION
-                    success = execute_action(self, action_name)
-
-                    logger.info(f"\n⏳ Waiting {self.loop_delay} seconds before next loop...")
-                    print_h_bar()
-                    time.sleep(self.loop_delay if success else 60)
-
+                    async with self.action_slots or contextlib.nullcontext():
+                        success = await execute_action_async(self, action_name)
+                except RateLimited as e:
+                    logger.info(f"\n⏸️ Deferring {action_name}: {e}")
+                    deferred_until = e.retry_at
                 except Exception as e:
                     logger.error(f"\n❌ Error in agent loop iteration: {e}")
-                    logger.info(f"⏳ Waiting {self.loop_delay} seconds before retrying...")
-                    time.sleep(self.loop_delay)
 
+                # A task that did nothing backs off for its cooldown; the loop moves on to whatever is due next
+                if deferred_until:
+                    due = self.scheduler.defer(action_name, deferred_until)
+                else:
+                    due = self.scheduler.complete(action_name, bool(success))
+                logger.info(f"\n⏳ Next {action_name} in {max(int(due - time.time()), 0)} seconds")
+                print_h_bar()
+        finally:
+            replenish_task.cancel()
+            if self._example_refresh_task:
+                self._example_refresh_task.cancel()
+                self._example_refresh_task = None
+            if self.tweet_stream:
+                self.tweet_stream.stop()
+            if events_task:
+                events_task.cancel()
+            if subscription_engine:
+                await subscription_engine.stop()
+            if self.llm_router:
+                self.llm_router.close()
+
+    def loop(self):
+        """Main agent loop for autonomous behavior"""
+        try:
+            asyncio.run(self.loop_async())
         except KeyboardInterrupt:
             logger.info("\n🛑 Agent loop stopped by user.")
-            return
\ No newline at end of file
+            return
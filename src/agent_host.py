@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+from src.agent import ZerePyAgent
+from src.connection_pool import ConnectionPool
+from src.helpers import print_h_bar
+
+logger = logging.getLogger("agent_host")
+
+# Agents allowed to run an action at the same time, waiting agents are served in arrival order
+DEFAULT_MAX_CONCURRENT_ACTIONS = 4
+
+# Worker threads shared by all agents for blocking connection calls
+DEFAULT_EXECUTOR_WORKERS = 32
+
+
+class AgentHost:
+    """
+    Runs several agents in one process.
+
+    All agents draw their connections from one ConnectionPool, so agents using
+    the same credentials and config share clients, providers and sessions.
+    Action execution goes through a shared FIFO semaphore, so every agent gets
+    its turn no matter how busy the others are.
+    """
+
+    def __init__(
+            self,
+            max_concurrent_actions: int = DEFAULT_MAX_CONCURRENT_ACTIONS,
+            executor_workers: int = DEFAULT_EXECUTOR_WORKERS
+    ):
+        self.connection_pool = ConnectionPool()
+        self.agents: Dict[str, ZerePyAgent] = {}
+        self.max_concurrent_actions = max_concurrent_actions
+        self.executor_workers = executor_workers
+
+    @staticmethod
+    def list_agent_files(agents_dir: Path = Path("agents")) -> List[str]:
+        """List agent names available on file, skipping general.json"""
+        return sorted(
+            agent_file.stem for agent_file in agents_dir.glob("*.json")
+            if agent_file.stem != "general"
+        )
+
+    def load_agent(self, agent_name: str) -> ZerePyAgent:
+        """Load an agent from agents/ using the host's shared connections"""
+        agent = ZerePyAgent(agent_name, connection_pool=self.connection_pool)
+        self.agents[agent_name] = agent
+        logger.info(f"✅ Loaded agent {agent_name} ({agent.name})")
+        return agent
+
+    def load_agents(self, agent_names: List[str]) -> None:
+        """Load several agents, skipping any that fail to load"""
+        for agent_name in agent_names:
+            try:
+                self.load_agent(agent_name)
+            except Exception as e:
+                logger.error(f"❌ Could not load agent {agent_name}: {e}")
+
+        logger.info(
+            f"Loaded {len(self.agents)} agents sharing {self.connection_pool.size} connections"
+        )
+
+    async def _run_agent(self, agent_name: str, agent: ZerePyAgent) -> None:
+        try:
+            await agent.loop_async()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Agent {agent_name} stopped: {e}")
+
+    async def run(self) -> None:
+        """Run every loaded agent's loop concurrently on the current event loop"""
+        if not self.agents:
+            raise ValueError("No agents loaded")
+
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="zerepy")
+        )
+
+        action_slots = asyncio.Semaphore(self.max_concurrent_actions)
+        for agent in self.agents.values():
+            agent.action_slots = action_slots
+
+        logger.info(f"\n🚀 Starting {len(self.agents)} agents: {', '.join(self.agents)}")
+        print_h_bar()
+
+        await asyncio.gather(
+            *(self._run_agent(agent_name, agent) for agent_name, agent in self.agents.items())
+        )
+
+    def run_forever(self) -> None:
+        """Blocking entry point, stops on Ctrl+C"""
+        try:
+            asyncio.run(self.run())
+        except KeyboardInterrupt:
+            logger.info("\n🛑 Agent host stopped by user.")
@@ -5,6 +5,7 @@ This API provides endpoints for using ZerePy as an AI provider in the Baultro ga
 """
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import logging
@@ -17,6 +18,8 @@ try:
 except ImportError:
     from src.connection_manager import ConnectionManager
 from src.agent import ZerePyAgent
+from src.helpers.sse import sse_events, SSE_HEADERS
+from src.helpers.response_cache import ResponseCache
 from dotenv import load_dotenv
 
 # Configure logging
@@ -49,6 +52,7 @@ class PromptRequest(BaseModel):
     model: Optional[str] = None
     temperature: Optional[float] = 0.7
     max_tokens: Optional[int] = 1024
+    stream: Optional[bool] = False
 
 class ChatMessage(BaseModel):
     role: str
@@ -60,6 +64,7 @@ class ChatRequest(BaseModel):
     model: Optional[str] = None
     temperature: Optional[float] = 0.7
     max_tokens: Optional[int] = 1024
+    stream: Optional[bool] = False
 
 class ResponseModel(BaseModel):
     text: str
@@ -72,9 +77,12 @@ default_llm_provider = None
 # Check if we're running in mock mode
 MOCK_LLM = os.environ.get('MOCK_LLM', 'false').lower() == 'true'
 
+# Opt-in with ZEREPY_RESPONSE_CACHE=true, None when disabled
+response_cache = ResponseCache.from_env()
+
 def get_default_agent():
     """Get or create the default agent"""
-    global agent_cache
+    global agent_cache, default_llm_provider
     
     if "default" not in agent_cache:
         try:
@@ -156,6 +164,29 @@ def get_default_agent():
     
     return agent_cache["default"]
 
+def response_cache_key(prompt: str, system_prompt: str, request) -> Optional[str]:
+    """Response cache key for a request, None when caching is off or responses are mocked"""
+    if not response_cache or MOCK_LLM:
+        return None
+    return ResponseCache.make_key(
+        default_llm_provider, request.model, system_prompt, prompt, request.temperature, request.max_tokens
+    )
+
+def stream_llm_response(agent, prompt: str, system_prompt: str, model: Optional[str] = None,
+                        cache_key: Optional[str] = None) -> StreamingResponse:
+    """Stream the LLM output to the client as server-sent events"""
+    cached = response_cache.get(cache_key) if cache_key else None
+    if MOCK_LLM:
+        prompt_preview = prompt[:50] + "..." if len(prompt) > 50 else prompt
+        chunks = iter([f"[MOCK RESPONSE] This is a simulated streamed response to: \"{prompt_preview}\"."])
+    elif cached is not None:
+        chunks = iter([cached])
+    else:
+        chunks = agent.connection_manager.stream_text(default_llm_provider, prompt, system_prompt, model)
+        if cache_key:
+            chunks = response_cache.stream_through(cache_key, chunks)
+    return StreamingResponse(sse_events(chunks), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.get("/")
 async def root():
     """Server status endpoint"""
@@ -166,6 +197,13 @@ async def root():
         "llm_provider": default_llm_provider
     }
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Response cache hit/miss counters and size"""
+    if not response_cache:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
 @app.get("/providers")
 async def list_providers():
     """List available LLM providers"""
@@ -187,6 +225,14 @@ async def generate_content(request: PromptRequest):
         if not system_prompt:
             system_prompt = agent._construct_system_prompt()
         
+        cache_key = response_cache_key(request.prompt, system_prompt, request)
+        if request.stream:
+            return stream_llm_response(agent, request.prompt, system_prompt, request.model, cache_key)
+        
+        cached = response_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            return {"text": cached}
+        
         # Use the agent to generate a response
         if MOCK_LLM:
             # In mock mode, generate a simulated response
@@ -207,6 +253,8 @@ async def generate_content(request: PromptRequest):
                 }
             )
         
+        if cache_key and response:
+            response_cache.set(cache_key, response)
         return {"text": response}
     except Exception as e:
         logger.error(f"Error generating content: {str(e)}")
@@ -237,6 +285,14 @@ async def chat(request: ChatRequest):
         chat_context = "\n".join([f"{msg.role}: {msg.content}" for msg in request.messages[:-1]])
         prompt = f"Chat History:\n{chat_context}\n\nUser: {last_user_message}\n\nAssistant:"
         
+        cache_key = response_cache_key(prompt, system_prompt, request)
+        if request.stream:
+            return stream_llm_response(agent, prompt, system_prompt, request.model, cache_key)
+        
+        cached = response_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            return {"text": cached}
+        
         # Generate response
         if MOCK_LLM:
             # In mock mode, generate a simulated response
@@ -256,6 +312,8 @@ async def chat(request: ChatRequest):
                 }
             )
         
+        if cache_key and response:
+            response_cache.set(cache_key, response)
         return {"text": response}
     except Exception as e:
         logger.error(f"Error in chat: {str(e)}")
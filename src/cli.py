@@ -12,6 +12,7 @@ from prompt_toolkit.styles import Style
 from prompt_toolkit.formatted_text import HTML
 from prompt_toolkit.history import FileHistory
 from src.agent import ZerePyAgent
+from src.connection_pool import ConnectionPool
 from src.helpers import print_h_bar
 
 # Configure logging
@@ -34,6 +35,9 @@ class Command:
 class ZerePyCLI:
     def __init__(self):
         self.agent = None
+
+        # Reloading or switching agents reuses connections that are already set up
+        self.connection_pool = ConnectionPool()
         
         # Create config directory if it doesn't exist
         self.config_dir = Path.home() / '.zerepy'
@@ -339,7 +343,7 @@ class ZerePyCLI:
 
     def _load_agent_from_file(self, agent_name):
         try: 
-            self.agent = ZerePyAgent(agent_name)
+            self.agent = ZerePyAgent(agent_name, connection_pool=self.connection_pool)
             logger.info(f"\n✅ Successfully loaded agent: {self.agent.name}")
         except FileNotFoundError:
             logger.error(f"Agent file not found: {agent_name}")
@@ -1,104 +1,147 @@
+import asyncio
+import importlib
 import logging
-from typing import Any, List, Optional, Type, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Iterator, List, Optional, Type, Dict, Tuple
 from src.connections.base_connection import BaseConnection
-from src.connections.anthropic_connection import AnthropicConnection
-from src.connections.eternalai_connection import EternalAIConnection
-from src.connections.goat_connection import GoatConnection
-from src.connections.groq_connection import GroqConnection
-from src.connections.openai_connection import OpenAIConnection
-from src.connections.twitter_connection import TwitterConnection
-from src.connections.farcaster_connection import FarcasterConnection
-from src.connections.ollama_connection import OllamaConnection
-from src.connections.echochambers_connection import EchochambersConnection
-from src.connections.solana_connection import SolanaConnection
-from src.connections.hyperbolic_connection import HyperbolicConnection
-from src.connections.galadriel_connection import GaladrielConnection
-from src.connections.sonic_connection import SonicConnection
-from src.connections.discord_connection import DiscordConnection
-from src.connections.allora_connection import AlloraConnection
-from src.connections.xai_connection import XAIConnection
-from src.connections.ethereum_connection import EthereumConnection
-from src.connections.together_connection import TogetherAIConnection
-from src.connections.evm_connection import EVMConnection
-from src.connections.perplexity_connection import PerplexityConnection
-from src.connections.monad_connection import MonadConnection
+from src.connection_pool import ConnectionPool
+from src.helpers.checkpoints import cursor_scope
+from src.helpers.rate_limit import RateLimited
+from src.metrics import get_metrics_registry
 
 logger = logging.getLogger("connection_manager")
 
+# Connection name -> (module, class). Modules are only imported once an agent config references them,
+# so a twitter + openai agent never pays for web3, solana or the other SDKs.
+CONNECTION_REGISTRY: Dict[str, Tuple[str, str]] = {
+    "twitter": ("src.connections.twitter_connection", "TwitterConnection"),
+    "anthropic": ("src.connections.anthropic_connection", "AnthropicConnection"),
+    "openai": ("src.connections.openai_connection", "OpenAIConnection"),
+    "farcaster": ("src.connections.farcaster_connection", "FarcasterConnection"),
+    "groq": ("src.connections.groq_connection", "GroqConnection"),
+    "eternalai": ("src.connections.eternalai_connection", "EternalAIConnection"),
+    "ollama": ("src.connections.ollama_connection", "OllamaConnection"),
+    "echochambers": ("src.connections.echochambers_connection", "EchochambersConnection"),
+    "goat": ("src.connections.goat_connection", "GoatConnection"),
+    "solana": ("src.connections.solana_connection", "SolanaConnection"),
+    "hyperbolic": ("src.connections.hyperbolic_connection", "HyperbolicConnection"),
+    "galadriel": ("src.connections.galadriel_connection", "GaladrielConnection"),
+    "sonic": ("src.connections.sonic_connection", "SonicConnection"),
+    "discord": ("src.connections.discord_connection", "DiscordConnection"),
+    "allora": ("src.connections.allora_connection", "AlloraConnection"),
+    "xai": ("src.connections.xai_connection", "XAIConnection"),
+    "ethereum": ("src.connections.ethereum_connection", "EthereumConnection"),
+    "together": ("src.connections.together_connection", "TogetherAIConnection"),
+    "evm": ("src.connections.evm_connection", "EVMConnection"),
+    "perplexity": ("src.connections.perplexity_connection", "PerplexityConnection"),
+    "monad": ("src.connections.monad_connection", "MonadConnection"),
+}
+
+
+# Seconds a connection may take to initialize, overridable with "init_timeout" in the connection config
+DEFAULT_CONNECTION_INIT_TIMEOUT = 20
+
+
+def register_connection_type(name: str, module_path: str, class_name: str) -> None:
+    """Make a connection available to agent configs under the given name"""
+    CONNECTION_REGISTRY[name] = (module_path, class_name)
+
 
 class ConnectionManager:
-    def __init__(self, agent_config):
+    def __init__(
+            self,
+            agent_config,
+            connection_pool: Optional[ConnectionPool] = None,
+            cursor_scope: Optional[str] = None
+    ):
         self.connections: Dict[str, BaseConnection] = {}
-        for config in agent_config:
-            self._register_connection(config)
+        # Without a shared pool every manager owns its connections, as before
+        self.connection_pool = connection_pool if connection_pool is not None else ConnectionPool()
+        # Read cursors of pooled connections are kept per scope (the agent name)
+        self.cursor_scope = cursor_scope
+        self._pool_keys: Dict[str, str] = {}
+        self._register_connections(agent_config)
 
     @staticmethod
-    def _class_name_to_type(class_name: str) -> Type[BaseConnection]:
-        if class_name == "twitter":
-            return TwitterConnection
-        elif class_name == "anthropic":
-            return AnthropicConnection
-        elif class_name == "openai":
-            return OpenAIConnection
-        elif class_name == "farcaster":
-            return FarcasterConnection
-        elif class_name == "groq":
-            return GroqConnection
-        elif class_name == "eternalai":
-            return EternalAIConnection
-        elif class_name == "ollama":
-            return OllamaConnection
-        elif class_name == "echochambers":
-            return EchochambersConnection
-        elif class_name == "goat":
-            return GoatConnection
-        elif class_name == "solana":
-            return SolanaConnection
-        elif class_name == "hyperbolic":
-            return HyperbolicConnection
-        elif class_name == "galadriel":
-            return GaladrielConnection
-        elif class_name == "sonic":
-            return SonicConnection
-        elif class_name == "discord":
-            return DiscordConnection
-        elif class_name == "allora":
-            return AlloraConnection
-        elif class_name == "xai":
-            return XAIConnection
-        elif class_name == "ethereum":
-            return EthereumConnection
-        elif class_name == "together":
-            return TogetherAIConnection
-        elif class_name == "evm":
-            return EVMConnection
-        elif class_name == "perplexity":
-            return PerplexityConnection
-        elif class_name == "monad":
-            return MonadConnection
-        return None
-
-    def _register_connection(self, config_dic: Dict[str, Any]) -> None:
+    def _class_name_to_type(class_name: str) -> Optional[Type[BaseConnection]]:
+        entry = CONNECTION_REGISTRY.get(class_name)
+        if entry is None:
+            return None
+        module_path, attr_name = entry
+        return getattr(importlib.import_module(module_path), attr_name)
+
+    def _register_connections(self, agent_config: List[Dict[str, Any]]) -> None:
         """
-        Create and register a new connection with configuration
+        Create and register all connections from an agent config concurrently
+
+        Constructors such as the chain connections make blocking RPC round-trips, so they
+        run side by side and each gets its own timeout. A connection that fails or times
+        out is left out and logged; the rest of the agent loads normally.
 
         Args:
-            name: Identifier for the connection
-            connection_class: The connection class to instantiate
-            config: Configuration dictionary for the connection
+            agent_config: List of configuration dictionaries, one per connection
         """
-        try:
-            name = config_dic["name"]
-            connection_class = self._class_name_to_type(name)
-            connection = connection_class(config_dic)
-            self.connections[name] = connection
-        except Exception as e:
-            logging.error(f"Failed to initialize connection {name}: {e}")
+        # Resolve classes up front so module imports stay on the calling thread
+        pending = []
+        for config_dic in agent_config:
+            name = config_dic.get("name")
+            try:
+                connection_class = self._class_name_to_type(name)
+                if connection_class is None:
+                    raise ValueError(f"Unknown connection type '{name}'")
+                pending.append((name, connection_class, config_dic))
+            except Exception as e:
+                logging.error(f"Failed to initialize connection {name}: {e}")
+
+        if not pending:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="connection-init")
+        started = time.monotonic()
+        futures = [
+            executor.submit(self.connection_pool.acquire, name, connection_class, config_dic)
+            for name, connection_class, config_dic in pending
+        ]
+
+        # Register in config order, the first configured LLM provider is the default one
+        for (name, _, config_dic), future in zip(pending, futures):
+            timeout = config_dic.get("init_timeout", DEFAULT_CONNECTION_INIT_TIMEOUT)
+            try:
+                key = future.result(timeout=max(0, started + timeout - time.monotonic()))
+                self.connections[name] = self.connection_pool.get(key)
+                self._pool_keys[name] = key
+            except FutureTimeoutError:
+                logging.error(f"Timed out initializing connection {name} after {timeout}s, continuing without it")
+            except Exception as e:
+                logging.error(f"Failed to initialize connection {name}: {e}")
+
+        # Don't wait on constructors that timed out, they finish (or fail) in the background
+        executor.shutdown(wait=False)
+
+    def is_configured(self, connection_name: str, refresh: bool = False, verbose: bool = False) -> bool:
+        """
+        Get a connection's configuration status from the shared status cache
+
+        Args:
+            connection_name: Name of the connection to check
+            refresh: Skip the cache and run a live is_configured() check
+            verbose: Passed on to is_configured() for live checks
+        """
+        return self.connection_pool.status.get(
+            self._pool_keys[connection_name], self.connections[connection_name], refresh=refresh, verbose=verbose
+        )
+
+    def invalidate_configured(self, connection_name: Optional[str] = None) -> None:
+        """Drop cached configuration status for one connection, or for all of this manager's connections"""
+        names = [connection_name] if connection_name else list(self._pool_keys)
+        for name in names:
+            if name in self._pool_keys:
+                self.connection_pool.status.invalidate(self._pool_keys[name])
 
     def _check_connection(self, connection_string: str) -> bool:
         try:
-            connection = self.connections[connection_string]
-            return connection.is_configured(verbose=True)
+            return self.is_configured(connection_string, refresh=True, verbose=True)
         except KeyError:
             logging.error(
                 "\nUnknown connection. Try 'list-connections' to see all supported connections."
@@ -112,7 +155,10 @@ class ConnectionManager:
         """Configure a specific connection"""
         try:
             connection = self.connections[connection_name]
-            success = connection.configure()
+            try:
+                success = connection.configure()
+            finally:
+                self.invalidate_configured(connection_name)
 
             if success:
                 logging.info(
@@ -134,9 +180,9 @@ class ConnectionManager:
     def list_connections(self) -> None:
         """List all available connections and their status"""
         logging.info("\nAVAILABLE CONNECTIONS:")
-        for name, connection in self.connections.items():
+        for name in self.connections:
             status = (
-                "✅ Configured" if connection.is_configured() else "❌ Not Configured"
+                "✅ Configured" if self.is_configured(name) else "❌ Not Configured"
             )
             logging.info(f"- {name}: {status}")
 
@@ -145,7 +191,7 @@ class ConnectionManager:
         try:
             connection = self.connections[connection_name]
 
-            if connection.is_configured():
+            if self.is_configured(connection_name):
                 logging.info(
                     f"\n✅ {connection_name} is configured. You can use any of its actions."
                 )
@@ -169,62 +215,171 @@ class ConnectionManager:
         except Exception as e:
             logging.error(f"\nAn error occurred: {e}")
 
+    def _prepare_action(
+        self, connection_name: str, action_name: str, params: List[Any]
+    ) -> Optional[Tuple[BaseConnection, Dict[str, Any]]]:
+        """Resolve the connection for an action and map its params to kwargs, logging why if it can't run"""
+        connection = self.connections[connection_name]
+
+        if not self.is_configured(connection_name):
+            logging.error(
+                f"\nError: Connection '{connection_name}' is not configured"
+            )
+            return None
+
+        if action_name not in connection.actions:
+            logging.error(
+                f"\nError: Unknown action '{action_name}' for connection '{connection_name}'"
+            )
+            return None
+
+        action = connection.actions[action_name]
+
+        # Convert list of params to kwargs dictionary, handling both required and optional params
+        kwargs = {}
+        param_index = 0
+
+        # Add provided parameters up to the number provided
+        for i, param in enumerate(action.parameters):
+            if param_index < len(params):
+                kwargs[param.name] = params[param_index]
+                param_index += 1
+
+        # Validate all required parameters are present
+        missing_required = [
+            param.name
+            for param in action.parameters
+            if param.required and param.name not in kwargs
+        ]
+
+        if missing_required:
+            logging.error(
+                f"\nError: Missing required parameters: {', '.join(missing_required)}"
+            )
+            return None
+
+        return connection, kwargs
+
+    @staticmethod
+    def _track(connection_name: str, action_name: str):
+        # Timed once the pool grants a slot, so latency is the connection's own and not time spent queued
+        return get_metrics_registry().track(
+            "connection_requests", "Connection action request", connection=connection_name, action=action_name
+        )
+
     def perform_action(
         self, connection_name: str, action_name: str, params: List[Any]
     ) -> Optional[Any]:
-        """Perform an action on a specific connection with given parameters"""
+        """
+        Perform an action on a specific connection with given parameters
+
+        Errors are logged and return None, except RateLimited, which is raised so
+        the caller can retry the action once the rate limit resets.
+        """
         try:
-            connection = self.connections[connection_name]
+            prepared = self._prepare_action(connection_name, action_name, params)
+            if prepared is None:
+                return None
+            connection, kwargs = prepared
 
-            if not connection.is_configured():
-                logging.error(
-                    f"\nError: Connection '{connection_name}' is not configured"
+            with self.connection_pool.limiter(self._pool_keys[connection_name]):
+                with self._track(connection_name, action_name), cursor_scope(self.cursor_scope):
+                    return connection.perform_action(action_name, kwargs)
+
+        except RateLimited:
+            raise
+        except Exception as e:
+            logging.error(
+                f"\nAn error occurred while trying action {action_name} for {connection_name} connection: {e}"
+            )
+            return None
+
+    async def perform_action_async(
+        self, connection_name: str, action_name: str, params: List[Any]
+    ) -> Optional[Any]:
+        """
+        Perform an action without blocking the event loop.
+
+        Callers waiting on a busy connection are parked on the event loop rather
+        than in a worker thread, so a slow connection cannot starve the others.
+        Connections with an async-native perform_action_async are awaited directly,
+        the rest run in a worker thread.
+        """
+        key = self._pool_keys.get(connection_name)
+        if key is None:
+            # Unknown connection, let perform_action log it
+            return self.perform_action(connection_name, action_name, params)
+
+        connection = self.connections[connection_name]
+        async with self.connection_pool.async_limiter(key):
+            if not hasattr(connection, "perform_action_async"):
+                return await asyncio.to_thread(
+                    self.perform_action, connection_name, action_name, params
                 )
-                return None
 
-            if action_name not in connection.actions:
+            try:
+                # The configuration check may hit the network on a cache miss
+                prepared = await asyncio.to_thread(self._prepare_action, connection_name, action_name, params)
+                if prepared is None:
+                    return None
+                connection, kwargs = prepared
+                with self._track(connection_name, action_name), cursor_scope(self.cursor_scope):
+                    return await connection.perform_action_async(action_name, kwargs)
+
+            except RateLimited:
+                raise
+            except Exception as e:
                 logging.error(
-                    f"\nError: Unknown action '{action_name}' for connection '{connection_name}'"
+                    f"\nAn error occurred while trying action {action_name} for {connection_name} connection: {e}"
                 )
                 return None
 
-            action = connection.actions[action_name]
+    def generate_batch(
+        self, connection_name: str, prompts: List[Any], system_prompt: Optional[str] = None
+    ) -> Optional[List[Optional[str]]]:
+        """
+        Generate text for many prompts on one LLM connection
 
-            # Convert list of params to kwargs dictionary, handling both required and optional params
-            kwargs = {}
-            param_index = 0
+        Args:
+            connection_name: LLM provider connection to use
+            prompts: Prompt strings or (prompt, system_prompt) pairs
+            system_prompt: System prompt for prompts that don't carry their own
 
-            # Add provided parameters up to the number provided
-            for i, param in enumerate(action.parameters):
-                if param_index < len(params):
-                    kwargs[param.name] = params[param_index]
-                    param_index += 1
+        Returns:
+            Results in prompt order with None for failed prompts, or None if the action failed
+        """
+        params = [prompts] if system_prompt is None else [prompts, system_prompt]
+        return self.perform_action(connection_name, "generate-batch", params)
 
-            # Validate all required parameters are present
-            missing_required = [
-                param.name
-                for param in action.parameters
-                if param.required and param.name not in kwargs
-            ]
+    async def generate_batch_async(
+        self, connection_name: str, prompts: List[Any], system_prompt: Optional[str] = None
+    ) -> Optional[List[Optional[str]]]:
+        """Async variant of generate_batch"""
+        params = [prompts] if system_prompt is None else [prompts, system_prompt]
+        return await self.perform_action_async(connection_name, "generate-batch", params)
 
-            if missing_required:
-                logging.error(
-                    f"\nError: Missing required parameters: {', '.join(missing_required)}"
-                )
-                return None
+    def stream_text(
+        self, connection_name: str, prompt: str, system_prompt: str, model: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Stream generated text from an LLM connection chunk by chunk
 
-            return connection.perform_action(action_name, kwargs)
+        Unlike perform_action, errors are raised to the caller: it is usually already
+        sending a streamed response and has to report them in-band.
+        """
+        connection = self.connections[connection_name]
+        if not connection.is_llm_provider:
+            raise ValueError(f"Connection '{connection_name}' is not an LLM provider")
+        if not self.is_configured(connection_name):
+            raise ValueError(f"Connection '{connection_name}' is not configured")
 
-        except Exception as e:
-            logging.error(
-                f"\nAn error occurred while trying action {action_name} for {connection_name} connection: {e}"
-            )
-            return None
+        with self.connection_pool.limiter(self._pool_keys[connection_name]):
+            yield from connection.generate_text_stream(prompt, system_prompt, model=model)
 
     def get_model_providers(self) -> List[str]:
         """Get a list of all LLM provider connections"""
         return [
             name
             for name, conn in self.connections.items()
-            if conn.is_configured() and getattr(conn, "is_llm_provider", lambda: False)
+            if getattr(conn, "is_llm_provider", False) and self.is_configured(name)
         ]
@@ -3,8 +3,9 @@ Custom Connection Manager for Baultro that only imports necessary connections
 """
 
 import logging
-from typing import Any, List, Optional, Type, Dict
+from typing import Any, Iterator, List, Optional, Type, Dict
 from src.connections.base_connection import BaseConnection
+from src.connection_pool import ConfigurationStatusCache
 from src.connections.anthropic_connection import AnthropicConnection
 from src.connections.openai_connection import OpenAIConnection
 from src.connections.groq_connection import GroqConnection
@@ -15,6 +16,7 @@ logger = logging.getLogger("connection_manager")
 class ConnectionManager:
     def __init__(self, agent_config):
         self.connections: Dict[str, BaseConnection] = {}
+        self.status = ConfigurationStatusCache()
         for config in agent_config:
             self._register_connection(config)
 
@@ -48,10 +50,17 @@ class ConnectionManager:
         except Exception as e:
             logging.error(f"Failed to initialize connection {name}: {e}")
 
+    def is_configured(self, connection_name: str, refresh: bool = False, verbose: bool = False) -> bool:
+        """Get a connection's configuration status, cached so requests don't each hit the provider API"""
+        return self.status.get(connection_name, self.connections[connection_name], refresh=refresh, verbose=verbose)
+
+    def invalidate_configured(self, connection_name: Optional[str] = None) -> None:
+        """Drop cached configuration status for one connection, or for all of them"""
+        self.status.invalidate(connection_name)
+
     def _check_connection(self, connection_string: str) -> bool:
         try:
-            connection = self.connections[connection_string]
-            return connection.is_configured(verbose=True)
+            return self.is_configured(connection_string, refresh=True, verbose=True)
         except KeyError:
             logging.error(
                 "\nUnknown connection. Try 'list-connections' to see all supported connections."
@@ -65,7 +74,10 @@ class ConnectionManager:
         """Configure a specific connection"""
         try:
             connection = self.connections[connection_name]
-            success = connection.configure()
+            try:
+                success = connection.configure()
+            finally:
+                self.invalidate_configured(connection_name)
 
             if success:
                 logging.info(
@@ -87,9 +99,9 @@ class ConnectionManager:
     def list_connections(self) -> None:
         """List all available connections and their status"""
         logging.info("\nAVAILABLE CONNECTIONS:")
-        for name, connection in self.connections.items():
+        for name in self.connections:
             status = (
-                "✅ Configured" if connection.is_configured() else "❌ Not Configured"
+                "✅ Configured" if self.is_configured(name) else "❌ Not Configured"
             )
             logging.info(f"- {name}: {status}")
 
@@ -98,7 +110,7 @@ class ConnectionManager:
         try:
             connection = self.connections[connection_name]
 
-            if connection.is_configured():
+            if self.is_configured(connection_name):
                 logging.info(
                     f"\n✅ {connection_name} is configured. You can use any of its actions."
                 )
@@ -129,7 +141,7 @@ class ConnectionManager:
         try:
             connection = self.connections[connection_name]
 
-            if not connection.is_configured():
+            if not self.is_configured(connection_name):
                 logging.error(
                     f"\nError: Connection '{connection_name}' is not configured"
                 )
@@ -149,10 +161,22 @@ class ConnectionManager:
             )
             return None
 
+    def stream_text(
+        self, connection_name: str, prompt: str, system_prompt: str, model: Optional[str] = None
+    ) -> Iterator[str]:
+        """Stream generated text from an LLM connection chunk by chunk, raising errors to the caller"""
+        connection = self.connections[connection_name]
+        if not connection.is_llm_provider:
+            raise ValueError(f"Connection '{connection_name}' is not an LLM provider")
+        if not self.is_configured(connection_name):
+            raise ValueError(f"Connection '{connection_name}' is not configured")
+
+        yield from connection.generate_text_stream(prompt, system_prompt, model=model)
+
     def get_model_providers(self) -> List[str]:
         """Get a list of all LLM provider connections"""
         return [
             name
             for name, conn in self.connections.items()
-            if conn.is_configured() and getattr(conn, "is_llm_provider", lambda: False)()
+            if getattr(conn, "is_llm_provider", False) and self.is_configured(name)
         ]
@@ -0,0 +1,166 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple, Type
+from src.connections.base_connection import BaseConnection
+
+logger = logging.getLogger("connection_pool")
+
+# Max number of in-flight actions per connection, overridable with "max_concurrency" in the connection config
+DEFAULT_CONNECTION_CONCURRENCY = 4
+
+# Seconds a connection's configuration status is trusted before is_configured() runs again
+DEFAULT_STATUS_TTL = 300
+# Failed checks are often transient (a timeout, a 5xx), so they're only trusted briefly
+DEFAULT_NEGATIVE_STATUS_TTL = 5
+
+
+class ConfigurationStatusCache:
+    """
+    Remembers the result of connection.is_configured() for a while.
+
+    Several connections check their status with a live API call (listing models,
+    fetching room info), which the agent loop and the server would otherwise make
+    before every action and on every health check. Entries expire after `ttl`
+    seconds, or `negative_ttl` seconds for connections found unconfigured, and
+    are dropped explicitly whenever a connection is reconfigured.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_STATUS_TTL, negative_ttl: float = DEFAULT_NEGATIVE_STATUS_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[bool, float]] = {}
+        self._check_locks: Dict[Hashable, threading.Lock] = {}
+
+    def _lookup(self, key: Hashable) -> Optional[bool]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def get(self, key: Hashable, connection: BaseConnection, refresh: bool = False, verbose: bool = False) -> bool:
+        """
+        Get a connection's configuration status, checking it live only when needed
+
+        Args:
+            key: Cache key identifying the connection
+            connection: The connection to check on a cache miss
+            refresh: Ignore the cached value and check live
+            verbose: Passed on to is_configured() for live checks
+        """
+        if not refresh:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+
+        with self._lock:
+            check_lock = self._check_locks.setdefault(key, threading.Lock())
+
+        # One live check per connection at a time, concurrent callers reuse its result
+        with check_lock:
+            if not refresh:
+                cached = self._lookup(key)
+                if cached is not None:
+                    return cached
+            # Exceptions propagate without touching the cache, the next call checks again
+            configured = bool(connection.is_configured(verbose=verbose))
+            ttl = self.ttl if configured else self.negative_ttl
+            with self._lock:
+                self._entries[key] = (configured, time.monotonic() + ttl)
+        return configured
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Forget the status of one connection, or of all connections if no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class ConnectionPool:
+    """
+    Process-wide store of connection objects.
+
+    Connections are keyed on their name and full config, and credentials come
+    from the process environment. Agents that declare the same connection
+    config therefore share one client, one Web3 provider and one OAuth session,
+    and also share that connection's concurrency limit. Connection classes that
+    keep per-agent state (poolable = False) get an instance per acquire().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections: Dict[str, BaseConnection] = {}
+        self._creation_locks: Dict[str, threading.Lock] = {}
+        self._concurrency: Dict[str, int] = {}
+        self._limiters: Dict[str, threading.BoundedSemaphore] = {}
+        self._async_limiters: Dict[str, asyncio.Semaphore] = {}
+        self._async_limiters_loop = None
+        self._unpooled = itertools.count()
+        self.status = ConfigurationStatusCache()
+
+    @staticmethod
+    def make_key(name: str, config: Dict[str, Any]) -> str:
+        return f"{name}:{json.dumps(config, sort_keys=True, default=str)}"
+
+    def acquire(self, name: str, connection_class: Type[BaseConnection], config: Dict[str, Any]) -> str:
+        """
+        Get or create the shared connection for a config
+
+        Args:
+            name: Connection name as declared in the agent config
+            connection_class: The connection class to instantiate if not pooled yet
+            config: Configuration dictionary for the connection
+
+        Returns:
+            str: Pool key to look the connection and its limiters up with
+        """
+        key = self.make_key(name, config)
+        if not connection_class.poolable:
+            key = f"{key}#{next(self._unpooled)}"
+        with self._lock:
+            if key in self._connections:
+                return key
+            creation_lock = self._creation_locks.setdefault(key, threading.Lock())
+
+        # Build outside the pool lock so slow constructors don't block unrelated connections
+        with creation_lock:
+            if key not in self._connections:
+                # Connections may mutate their config during validation, hand them a copy
+                connection = connection_class(dict(config))
+                limit = config.get("max_concurrency", DEFAULT_CONNECTION_CONCURRENCY)
+                with self._lock:
+                    self._concurrency[key] = limit
+                    self._limiters[key] = threading.BoundedSemaphore(limit)
+                    self._connections[key] = connection
+            else:
+                logger.debug(f"Reusing pooled connection {name}")
+        return key
+
+    def get(self, key: str) -> BaseConnection:
+        return self._connections[key]
+
+    def limiter(self, key: str) -> threading.BoundedSemaphore:
+        return self._limiters[key]
+
+    def async_limiter(self, key: str) -> asyncio.Semaphore:
+        """Get the connection's semaphore bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._async_limiters_loop is not loop:
+                self._async_limiters = {}
+                self._async_limiters_loop = loop
+            if key not in self._async_limiters:
+                limit = self._concurrency.get(key, DEFAULT_CONNECTION_CONCURRENCY)
+                self._async_limiters[key] = asyncio.Semaphore(limit)
+            return self._async_limiters[key]
+
+    @property
+    def size(self) -> int:
+        return len(self._connections)
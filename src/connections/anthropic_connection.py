@@ -1,12 +1,16 @@
 import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Union
 from dotenv import load_dotenv, set_key
 from anthropic import Anthropic, NotFoundError
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, prompt_batch, system_prompt_parts
+from src.prompt_builder import PromptParts, join_prompt_parts
 
 logger = logging.getLogger("connections.anthropic_connection")
 
+# Anthropic only caches prompts above a model-dependent minimum (1024 tokens or more); shorter ones are sent as is
+PROMPT_CACHE_CONTROL = {"type": "ephemeral"}
+
 class AnthropicConnectionError(Exception):
     """Base exception for Anthropic connection errors"""
     pass
@@ -38,6 +42,9 @@ class AnthropicConnection(BaseConnection):
             
         if not isinstance(config["model"], str):
             raise ValueError("model must be a string")
+
+        if not isinstance(config.get("prompt_caching", True), bool):
+            raise ValueError("prompt_caching must be a boolean")
             
         return config
 
@@ -48,11 +55,20 @@ class AnthropicConnection(BaseConnection):
                 name="generate-text",
                 parameters=[
                     ActionParameter("prompt", True, str, "The input prompt for text generation"),
-                    ActionParameter("system_prompt", True, str, "System prompt to guide the model"),
+                    ActionParameter("system_prompt", True, system_prompt_parts, "System prompt to guide the model"),
                     ActionParameter("model", False, str, "Model to use for generation")
                 ],
                 description="Generate text using Anthropic models"
             ),
+            "generate-batch": Action(
+                name="generate-batch",
+                parameters=[
+                    ActionParameter("prompts", True, prompt_batch, "List of prompts or [prompt, system_prompt] pairs"),
+                    ActionParameter("system_prompt", False, system_prompt_parts, "System prompt for prompts that don't carry their own"),
+                    ActionParameter("model", False, str, "Model to use for generation")
+                ],
+                description="Generate text for several prompts concurrently using Anthropic models"
+            ),
             "check-model": Action(
                 name="check-model",
                 parameters=[
@@ -128,7 +144,24 @@ class AnthropicConnection(BaseConnection):
                 logger.debug(f"Configuration check failed: {e}")
             return False
 
-    def generate_text(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
+    def _system_blocks(self, system_prompt: Union[str, PromptParts]) -> Any:
+        """
+        The system prompt marked as a cacheable prefix, so repeated generations with the
+        agent's system prompt reuse it instead of paying full input cost and latency again.
+        Prompts given as (stable, volatile) parts are sent as two blocks with only the
+        stable one cached, so a refresh of the part that changes doesn't invalidate the cache.
+        """
+        if not system_prompt:
+            return system_prompt
+        stable, volatile = system_prompt_parts(system_prompt)
+        if not self.config.get("prompt_caching", True):
+            return join_prompt_parts(stable, volatile)
+        blocks = [{"type": "text", "text": stable, "cache_control": PROMPT_CACHE_CONTROL}] if stable else []
+        if volatile:
+            blocks.append({"type": "text", "text": volatile})
+        return blocks
+
+    def generate_text(self, prompt: str, system_prompt: Union[str, PromptParts], model: str = None, **kwargs) -> str:
         """Generate text using Anthropic models"""
         try:
             client = self._get_client()
@@ -141,7 +174,7 @@ class AnthropicConnection(BaseConnection):
                 model=model,
                 max_tokens=1000,
                 temperature=0,
-                system=system_prompt,
+                system=self._system_blocks(system_prompt),
                 messages=[
                     {
                         "role": "user",
@@ -159,6 +192,40 @@ class AnthropicConnection(BaseConnection):
         except Exception as e:
             raise AnthropicAPIError(f"Text generation failed: {e}")
 
+    def generate_text_stream(
+            self, prompt: str, system_prompt: Union[str, PromptParts], model: str = None, **kwargs
+    ) -> Iterator[str]:
+        """Generate text using Anthropic models, yielding chunks as they arrive"""
+        try:
+            client = self._get_client()
+
+            # Use configured model if none provided
+            if not model:
+                model = self.config["model"]
+
+            with client.messages.stream(
+                model=model,
+                max_tokens=1000,
+                temperature=0,
+                system=self._system_blocks(system_prompt),
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": prompt
+                            }
+                        ]
+                    }
+                ]
+            ) as stream:
+                for text in stream.text_stream:
+                    yield text
+
+        except Exception as e:
+            raise AnthropicAPIError(f"Text generation failed: {e}")
+
     def check_model(self, model: str, **kwargs) -> bool:
         """Check if a specific model is available"""
         try:
@@ -1,7 +1,71 @@
+import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Callable, Optional, Tuple
 from dataclasses import dataclass
+from src.prompt_builder import PromptParts, join_prompt_parts
+
+# Prompts in flight at once for generate_batch, overridable with "batch_concurrency" in the connection config
+DEFAULT_BATCH_CONCURRENCY = 8
+
+def prompt_batch(value) -> List[Tuple[str, Optional[str]]]:
+    """
+    Parse a batch of prompts into (prompt, system_prompt) pairs
+
+    Accepts a list (or its JSON encoding, as passed from the CLI) whose items are
+    prompt strings or [prompt, system_prompt] pairs.
+    """
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, (list, tuple)):
+        raise ValueError("prompts must be a list")
+
+    batch = []
+    for item in value:
+        if isinstance(item, str):
+            batch.append((item, None))
+        elif isinstance(item, (list, tuple)) and len(item) == 2:
+            batch.append((item[0], item[1]))
+        elif isinstance(item, dict) and "prompt" in item:
+            batch.append((item["prompt"], item.get("system_prompt")))
+        else:
+            raise ValueError(f"Invalid prompt in batch: {item!r}")
+    return batch
+
+def system_prompt_text(value) -> str:
+    """Parse a system prompt given as a string or as (stable, volatile) parts from PromptBuilder into one string"""
+    if isinstance(value, (list, tuple)):
+        return join_prompt_parts(*system_prompt_parts(value))
+    return str(value)
+
+def system_prompt_parts(value) -> PromptParts:
+    """Parse a system prompt into (stable, volatile) parts; a plain string is all stable"""
+    if isinstance(value, (list, tuple)):
+        if len(value) != 2:
+            raise ValueError("system prompt parts must be a (stable, volatile) pair")
+        return str(value[0] or ""), str(value[1] or "")
+    return str(value), ""
+
+def comma_list(value) -> List[str]:
+    """Parse a list parameter given as a list, a JSON list or a comma-separated string"""
+    if isinstance(value, str):
+        value = value.strip()
+        value = json.loads(value) if value.startswith("[") else value.split(",")
+    if not isinstance(value, (list, tuple)):
+        raise ValueError("expected a list")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def flag(value) -> bool:
+    """Parse a boolean parameter given as a bool or a string such as "true", "no" or "0" from the CLI"""
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ("true", "yes", "1", "on"):
+            return True
+        if value in ("false", "no", "0", "off"):
+            return False
+        raise ValueError(f"expected true or false, got {value!r}")
+    return bool(value)
 
 @dataclass
 class ActionParameter:
@@ -29,6 +93,9 @@ class Action:
         return errors
 
 class BaseConnection(ABC):
+    # Whether agents with the same config may share one instance; connections keeping per-agent state set False
+    poolable = True
+
     def __init__(self, config):
         try:
             # Dictionary to store action name -> handler method mapping
@@ -112,3 +179,52 @@ class BaseConnection(ABC):
             
         handler = self.actions[action_name]
         return handler(**kwargs)
+
+    def generate_batch(self, prompts, system_prompt: str = None, model: str = None, **kwargs) -> List[Optional[str]]:
+        """
+        Generate text for several prompts concurrently using generate_text
+
+        Args:
+            prompts: Prompt strings or (prompt, system_prompt) pairs, see prompt_batch
+            system_prompt: System prompt for items that don't carry their own
+            model: Model to use for every prompt
+
+        Returns:
+            List[Optional[str]]: Results in the order of the prompts, None where generation failed
+
+        Raises:
+            The first error if every prompt in the batch failed
+        """
+        batch = prompt_batch(prompts)
+        if not batch:
+            return []
+
+        def generate(item):
+            prompt, item_system_prompt = item
+            return self.generate_text(prompt, item_system_prompt or system_prompt, model=model)
+
+        concurrency = self.config.get("batch_concurrency", DEFAULT_BATCH_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(batch)), thread_name_prefix="generate-batch") as executor:
+            futures = [executor.submit(generate, item) for item in batch]
+
+        results, errors = [], []
+        for index, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logging.error(f"Batch generation failed for prompt {index}: {e}")
+                results.append(None)
+                errors.append(e)
+
+        if len(errors) == len(batch):
+            raise errors[0]
+        return results
+
+    def generate_text_stream(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> Iterator[str]:
+        """
+        Generate text as a stream of chunks
+
+        Providers with a streaming API override this; the default yields the
+        whole generate_text result as a single chunk.
+        """
+        yield self.generate_text(prompt, system_prompt, model=model, **kwargs)
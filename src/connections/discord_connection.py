@@ -2,9 +2,11 @@ import os
 import logging
 from typing import Dict, Any
 from dotenv import set_key, load_dotenv
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, flag
 from src.helpers import print_h_bar
-import requests
+from src.helpers.checkpoints import get_cursor_store
+from src.helpers.http import get_session
+from src.helpers.rate_limit import endpoint_key, get_rate_limit_governor
 import json
 
 logger = logging.getLogger("connections.discord_connection")
@@ -81,6 +83,12 @@ class DiscordConnection(BaseConnection):
                         int,
                         "Number of messages to retrieve",
                     ),
+                    ActionParameter(
+                        "new_only",
+                        False,
+                        flag,
+                        "Only messages posted since the last read, defaults to true",
+                    ),
                 ],
                 description="Get the latest messages from a channel",
             ),
@@ -99,6 +107,12 @@ class DiscordConnection(BaseConnection):
                         int,
                         "Number of messages to retrieve",
                     ),
+                    ActionParameter(
+                        "new_only",
+                        False,
+                        flag,
+                        "Only messages posted since the last read, defaults to true",
+                    ),
                 ],
                 description="Get the latest messages that mention the bot",
             ),
@@ -258,19 +272,40 @@ class DiscordConnection(BaseConnection):
         logger.info(f"Retrieved {len(formatted_response)} channels")
         return formatted_response
 
-    def read_messages(self, channel_id: str, count: int, **kwargs) -> dict:
-        """Reading messages in a channel"""
-        logger.debug("Sending a new message")
+    def _read_channel(self, channel_id: str, count: int, cursor_name: str, new_only: bool) -> list:
+        """
+        Read messages in a channel, passing the last message id read as `after`
+        so only newer messages come back, and record the new last id
+        """
+        cursors = get_cursor_store()
+        cursor_key = f"discord:{channel_id}:{cursor_name}"
+        after = cursors.get(cursor_key) if new_only else None
+
         request_path = f"/channels/{channel_id}/messages?limit={count}"
+        if after:
+            # With `after`, Discord returns the oldest `count` newer messages, so nothing is skipped
+            request_path += f"&after={after}"
         response = self._get_request(request_path)
+
+        if response:
+            newest_id = max((message["id"] for message in response), key=int)
+            if after is None or int(newest_id) > int(after):
+                cursors.set(cursor_key, newest_id)
+        return response
+
+    def read_messages(self, channel_id: str, count: int, new_only: bool = True, **kwargs) -> dict:
+        """Reading messages in a channel, by default only those posted since the last read"""
+        logger.debug("Reading messages")
+        response = self._read_channel(channel_id, count, "messages", new_only)
         formatted_response = self._format_messages(response)
 
         logger.info(f"Retrieved {len(formatted_response)} messages")
         return formatted_response
 
-    def read_mentioned_messages(self, channel_id: str, count: int, **kwargs) -> dict:
+    def read_mentioned_messages(self, channel_id: str, count: int, new_only: bool = True, **kwargs) -> dict:
         """Reads messages in a channel and filters for bot mentioned messages"""
-        messages = self.read_messages(channel_id, count)
+        # Kept apart from read-messages' position so one reader does not consume the other's messages
+        messages = self._format_messages(self._read_channel(channel_id, count, "mentions", new_only))
         mentioned_messages = self._filter_message_for_bot_mentions(messages)
 
         logger.info(f"Retrieved {len(mentioned_messages)} mentioned messages")
@@ -383,14 +418,20 @@ class DiscordConnection(BaseConnection):
             formatted_channels.append(formatted_channel)
         return formatted_channels
 
+    def _request(self, method: str, url_path: str, headers: Dict[str, str], data) -> Any:
+        """Make a request within Discord's rate limits, raising RateLimited instead of hitting a 429"""
+        # Discord budgets each channel and guild separately
+        bucket = endpoint_key(method, url_path, major_params=("channels", "guilds", "webhooks"))
+        governor = get_rate_limit_governor()
+        governor.acquire("discord", bucket)
+        headers = dict(headers, Authorization=self._get_request_auth_token())
+        response = get_session().request(method, f"{self.base_url}{url_path}", headers=headers, data=data)
+        governor.check_response("discord", bucket, response)
+        return response
+
     def _put_request(self, url_path: str) -> None:
         """Helper method to make PUT request"""
-        url = f"{self.base_url}{url_path}"
-        headers = {
-            "Accept": "application/json",
-            "Authorization": self._get_request_auth_token(),
-        }
-        response = requests.request("PUT", url, headers=headers, data={})
+        response = self._request("PUT", url_path, {"Accept": "application/json"}, {})
         if response.status_code != 204:
             raise DiscordAPIError(
                 f"Failed to called PUT to Discord: {response.status_code} - {response.text}"
@@ -399,13 +440,11 @@ class DiscordConnection(BaseConnection):
 
     def _post_request(self, url_path: str, payload: str) -> dict:
         """Helper method to make POST request"""
-        url = f"{self.base_url}{url_path}"
         headers = {
             "Content-Type": "application/json",
             "Accept": "application/json",
-            "Authorization": self._get_request_auth_token(),
         }
-        response = requests.request("POST", url, headers=headers, data=payload)
+        response = self._request("POST", url_path, headers, payload)
         if response.status_code != 200:
             raise DiscordAPIError(
                 f"Failed to call POST to Discord: {response.status_code} - {response.text}"
@@ -414,13 +453,7 @@ class DiscordConnection(BaseConnection):
 
     def _get_request(self, url_path: str) -> str:
         """Helper method to make GET request"""
-        url = f"{self.base_url}{url_path}"
-        headers = {
-            "Accept": "application/json",
-            "Authorization": self._get_request_auth_token(),
-        }
-        print(headers)
-        response = requests.request("GET", url, headers=headers, data={})
+        response = self._request("GET", url_path, {"Accept": "application/json"}, {})
         if response.status_code != 200:
             raise DiscordAPIError(
                 f"Failed to call GET to Discord: {response.status_code} - {response.text}"
@@ -435,7 +468,7 @@ class DiscordConnection(BaseConnection):
         try:
             url = f"{self.base_url}/users/@me"
             headers = {"Accept": "application/json", "Authorization": f"Bot {api_key}"}
-            response = requests.request("GET", url, headers=headers, data={})
+            response = get_session().request("GET", url, headers=headers, data={})
             if response.status_code != 200:
                 raise DiscordAPIError(
                     f"Failed to call GET to Discord: {response.status_code} - {response.text}"
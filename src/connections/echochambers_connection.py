@@ -1,14 +1,24 @@
 import logging
 import time
+from datetime import datetime
 from typing import Dict, Any, List
 from collections import deque
+from urllib.parse import urlparse
 
 import requests
 from dotenv import load_dotenv
 from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.helpers.http import get_session
+from src.helpers.rate_limit import endpoint_key, get_rate_limit_governor
+from src.state_store import BoundedSet
 
 logger = logging.getLogger("connections.echochambers_connection")
 
+# Messages older than this are never replied to, so their ids only need remembering this long
+ECHOCHAMBERS_DEDUP_WINDOW = 7 * 24 * 3600
+# Token budget for our own recent messages quoted in the post prompt
+ECHOCHAMBERS_HISTORY_TOKENS = 500
+
 class EchochambersConnectionError(Exception):
     """Base exception for Echochambers connection errors"""
     pass
@@ -22,6 +32,9 @@ class EchochambersAPIError(EchochambersConnectionError):
     pass
 
 class EchochambersConnection(BaseConnection):
+    # The processed ids, sent history and reply queue belong to one agent, which backs them with its state store
+    poolable = False
+
     def __init__(self, config: Dict[str, Any]):
         logger.info("✨ Initializing Echochambers adapter")
         super().__init__(config)
@@ -33,6 +46,8 @@ class EchochambersConnection(BaseConnection):
         self.sender_model = config.get("sender_model")
         self.history_read_count = config.get("history_read_count")
         self.post_history_track = config.get("post_history_track")
+        self.dedup_window = config.get("dedup_window", ECHOCHAMBERS_DEDUP_WINDOW)
+        self.history_token_budget = config.get("history_token_budget", ECHOCHAMBERS_HISTORY_TOKENS)
 
         # Validate essential configurations
         if not all([self.api_url, self.api_key, self.room, self.sender_username, self.sender_model, self.history_read_count, self.post_history_track]):
@@ -45,7 +60,8 @@ class EchochambersConnection(BaseConnection):
 
         # Initialize message queue and tracking
         self.message_queue: List[Dict[str, Any]] = []
-        self.processed_messages = set()
+        # Bounded so ids seen over weeks of uptime do not pile up; agents swap in a persistent set
+        self.processed_messages = BoundedSet(10000, window=self.dedup_window)
         self.max_queue_size = 100
         
         # Keep track of our last messages to ensure uniqueness
@@ -55,7 +71,8 @@ class EchochambersConnection(BaseConnection):
         self.metrics = {
             'messages_sent': 0,
             'messages_failed': 0,
-            'api_latency': [],
+            # Milliseconds per API request, the most recent ones only
+            'api_latency': deque(maxlen=100),
             'last_error': None,
             'last_metrics_log': time.time()
         }
@@ -191,7 +208,8 @@ class EchochambersConnection(BaseConnection):
                 if len(self.message_queue) >= self.max_queue_size:
                     break
                 if (message['id'] not in self.processed_messages and
-                        message['sender']['username'] != self.sender_username):
+                        message['sender']['username'] != self.sender_username and
+                        not self.is_stale(message)):
                     self.message_queue.append(message)
                     self.processed_messages.add(message['id'])
 
@@ -201,6 +219,14 @@ class EchochambersConnection(BaseConnection):
             self._handle_error("Failed to process room history", e)
             raise
 
+    def is_stale(self, message: Dict[str, Any]) -> bool:
+        """Whether a message is older than the dedup window, so its id may have been forgotten"""
+        try:
+            sent_at = datetime.fromisoformat(str(message.get("timestamp", "")).replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return False
+        return sent_at < time.time() - self.dedup_window
+
     def _make_request(self, method: str, url: str, **kwargs) -> Any:
         """Make HTTP request with retries and error handling"""
         headers = {
@@ -208,15 +234,17 @@ class EchochambersConnection(BaseConnection):
             "x-api-key": self.api_key
         }
         kwargs['headers'] = headers
+        bucket = endpoint_key(method, urlparse(url).path)
+        governor = get_rate_limit_governor()
 
         for attempt in range(3):
             try:
-                response = requests.request(method, url, timeout=10, **kwargs)
-                if response.status_code == 429:  # Rate limit
-                    retry_after = int(response.headers.get('Retry-After', 60))
-                    logger.warning(f"Rate limit hit, waiting {retry_after}s")
-                    time.sleep(retry_after)
-                    continue
+                # A used-up budget or a 429 raises RateLimited so the caller defers instead of waiting here
+                governor.acquire("echochambers", bucket)
+                started = time.monotonic()
+                response = get_session().request(method, url, timeout=10, **kwargs)
+                self.metrics['api_latency'].append((time.monotonic() - started) * 1000)
+                governor.check_response("echochambers", bucket, response)
                 response.raise_for_status()
                 return response.json()
             except requests.Timeout:
@@ -4,9 +4,9 @@ import json
 from typing import Dict, Any
 from dotenv import load_dotenv, set_key
 from openai import OpenAI
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, prompt_batch, system_prompt_text
+from src.helpers.http import get_session
 from web3 import Web3
-import requests
 
 logger = logging.getLogger("connections.eternalai_connection")
 IPFS = "ipfs://"
@@ -58,11 +58,20 @@ class EternalAIConnection(BaseConnection):
                 name="generate-text",
                 parameters=[
                     ActionParameter("prompt", True, str, "The input prompt for text generation"),
-                    ActionParameter("system_prompt", True, str, "System prompt to guide the model"),
+                    ActionParameter("system_prompt", True, system_prompt_text, "System prompt to guide the model"),
                     ActionParameter("model", False, str, "Model to use for generation")
                 ],
                 description="Generate text using EternalAI models"
             ),
+            "generate-batch": Action(
+                name="generate-batch",
+                parameters=[
+                    ActionParameter("prompts", True, prompt_batch, "List of prompts or [prompt, system_prompt] pairs"),
+                    ActionParameter("system_prompt", False, system_prompt_text, "System prompt for prompts that don't carry their own"),
+                    ActionParameter("model", False, str, "Model to use for generation")
+                ],
+                description="Generate text for several prompts concurrently using EternalAI models"
+            ),
             "check-model": Action(
                 name="check-model",
                 parameters=[
@@ -147,12 +156,12 @@ class EternalAIConnection(BaseConnection):
     def get_on_chain_system_prompt_content(on_chain_data: str) -> str:
         if IPFS in on_chain_data:
             light_house = on_chain_data.replace(IPFS, LIGHTHOUSE_IPFS)
-            response = requests.get(light_house)
+            response = get_session().get(light_house)
             if response.status_code == 200:
                 return response.text
             else:
                 gcs = on_chain_data.replace(IPFS, GCS_ETERNAL_AI_BASE_URL)
-                response = requests.get(gcs)
+                response = get_session().get(gcs)
                 if response.status_code == 200:
                     return response.text
                 else:
@@ -1,14 +1,18 @@
 import logging
 import os
 import time
-import requests
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 from dotenv import load_dotenv, set_key
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
 from src.constants.networks import EVM_NETWORKS
 from src.constants.abi import ERC20_ABI
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, comma_list
+from src.helpers.http import get_session
+from src.helpers.evm.transactions import get_transaction_pipeline
+from src.helpers.evm.multicall import get_portfolio
+from src.helpers.token_cache import get_token_cache
+from src.helpers.quotes import QuoteCache, quote_all, summarize_kyber_route
 
 logger = logging.getLogger("connections.ethereum_connection")
 
@@ -36,11 +40,27 @@ class EthereumConnection(BaseConnection):
         
         # Kyberswap aggregator API for best swap routes
         self.aggregator_api = f"https://aggregator-api.kyberswap.com/{self.network}/api/v1"
+        self._quote_cache = QuoteCache()
 
     def _get_explorer_link(self, tx_hash: str) -> str:
         """Generate block explorer link for transaction"""
         return f"https://{self.scanner_url}/tx/{tx_hash}"
 
+    def _get_decimals(self, token_address: str) -> int:
+        """ERC-20 decimals, read from the chain once per token and cached"""
+        return get_token_cache().get_decimals(
+            self.chain_id,
+            token_address,
+            lambda: self._web3.eth.contract(
+                address=Web3.to_checksum_address(token_address),
+                abi=ERC20_ABI
+            ).functions.decimals().call()
+        )
+
+    def _get_pipeline(self, account):
+        """Get the nonce-managed transaction pipeline for this account"""
+        return get_transaction_pipeline(self._web3, account, self.chain_id)
+
     def _initialize_web3(self) -> None:
         """Initialize Web3 connection with retry logic"""
         if not self._web3:
@@ -93,6 +113,23 @@ class EthereumConnection(BaseConnection):
                 ],
                 description="Get ETH or token balance"
             ),
+            "get-portfolio": Action(
+                name="get-portfolio",
+                parameters=[
+                    ActionParameter("addresses", False, comma_list, "Comma-separated addresses (optional, your wallet if not provided)"),
+                    ActionParameter("tokens", False, comma_list, "Comma-separated token addresses or tickers")
+                ],
+                description="Get ETH and token balances for one or more addresses in one batched call"
+            ),
+            "quote-swap": Action(
+                name="quote-swap",
+                parameters=[
+                    ActionParameter("token_in", True, str, "Input token address"),
+                    ActionParameter("token_out", True, comma_list, "Comma-separated output token addresses"),
+                    ActionParameter("amounts", True, comma_list, "Comma-separated input amounts to quote")
+                ],
+                description="Quote swaps for several amounts or output tokens at once without executing them"
+            ),
             "transfer": Action(
                 name="transfer", 
                 parameters=[
@@ -202,7 +239,7 @@ class EthereumConnection(BaseConnection):
     def _get_token_address(self, ticker: str) -> Optional[str]:
         """Helper function to get token address from DEXScreener"""
         try:
-            response = requests.get(
+            response = get_session().get(
                 f"https://api.dexscreener.com/latest/dex/search?q={ticker}"
             )
             response.raise_for_status()
@@ -241,7 +278,7 @@ class EthereumConnection(BaseConnection):
             if ticker.lower() in ["eth", "ethereum"]:
                 return f"Token: ETH\nAddress: {self.NATIVE_TOKEN}"
                 
-            address = self._get_token_address(ticker)
+            address = get_token_cache().get_address(self.chain_id, ticker, lambda: self._get_token_address(ticker))
             if address:
                 return address
 
@@ -259,7 +296,7 @@ class EthereumConnection(BaseConnection):
             balance = contract.functions.balanceOf(
                 Web3.to_checksum_address(address)
             ).call()
-            decimals = contract.functions.decimals().call()
+            decimals = self._get_decimals(token_address)
             return balanqce / (10 ** decimals)
         else:
             # Get native ETH balance
@@ -299,7 +336,7 @@ class EthereumConnection(BaseConnection):
             
             # Get token info
             symbol = token_contract.functions.symbol().call()
-            decimals = token_contract.functions.decimals().call()
+            decimals = self._get_decimals(token_address)
             
             # Get balance
             raw_balance = token_contract.functions.balanceOf(account.address).call()
@@ -308,7 +345,7 @@ class EthereumConnection(BaseConnection):
             # Try to get ETH value using Kyberswap price API
             try:
                 kyber_url = f"{self.aggregator_api}/tokens/rates"
-                response = requests.get(kyber_url, params={
+                response = get_session().get(kyber_url, params={
                     "tokenIn": token_address, 
                     "tokenOut": self.NATIVE_TOKEN, 
                     "amount": str(raw_balance) 
@@ -328,6 +365,30 @@ class EthereumConnection(BaseConnection):
         except Exception as e:
             return False
 
+    def get_portfolio(self, addresses: Optional[List[str]] = None, tokens: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get native and token balances for one or more addresses in a single batched read"""
+        try:
+            if not addresses:
+                private_key = os.getenv('ETH_PRIVATE_KEY')
+                if not private_key:
+                    raise ValueError("No wallet private key configured in .env")
+                account = self._web3.eth.account.from_key(private_key)
+                addresses = [account.address]
+
+            token_addresses = []
+            for token in tokens or []:
+                token_address = token if Web3.is_address(token) else self.get_token_by_ticker(token)
+                if not token_address or not Web3.is_address(token_address):
+                    raise ValueError(f"Unknown token: {token}")
+                if token_address.lower() != self.NATIVE_TOKEN.lower():
+                    token_addresses.append(token_address)
+
+            return get_portfolio(self._web3, addresses, token_addresses)
+
+        except Exception as e:
+            logger.error(f"Failed to get portfolio: {e}")
+            raise
+
     def _prepare_transfer_tx(
         self, 
         to_address: str,
@@ -339,9 +400,8 @@ class EthereumConnection(BaseConnection):
             private_key = os.getenv('ETH_PRIVATE_KEY')
             account = self._web3.eth.account.from_key(private_key)
             
-            # Get latest nonce and gas price
-            nonce = self._web3.eth.get_transaction_count(account.address)
-            gas_price = self._web3.eth.gas_price
+            # Nonce is assigned when the transaction is sent
+            gas_price = self._get_pipeline(account).gas_price()
             
             if token_address and token_address.lower() != self.NATIVE_TOKEN.lower():
                 # Prepare ERC20 transfer
@@ -349,7 +409,7 @@ class EthereumConnection(BaseConnection):
                     address=Web3.to_checksum_address(token_address),
                     abi=ERC20_ABI
                 )
-                decimals = contract.functions.decimals().call()
+                decimals = self._get_decimals(token_address)
                 amount_raw = int(amount * (10 ** decimals))
                 
                 tx = contract.functions.transfer(
@@ -357,14 +417,12 @@ class EthereumConnection(BaseConnection):
                     amount_raw
                 ).build_transaction({
                     'from': account.address,
-                    'nonce': nonce,
                     'gasPrice': gas_price,
                     'chainId': self.chain_id
                 })
             else:
                 # Prepare native ETH transfer
                 tx = {
-                    'nonce': nonce,
                     'to': Web3.to_checksum_address(to_address),
                     'value': self._web3.to_wei(amount, 'ether'),
                     'gas': 21000,  # Standard ETH transfer gas
@@ -398,8 +456,7 @@ class EthereumConnection(BaseConnection):
             private_key = os.getenv('ETH_PRIVATE_KEY')
             account = self._web3.eth.account.from_key(private_key)
             
-            signed = account.sign_transaction(tx)
-            tx_hash = self._web3.eth.send_raw_transaction(signed.rawTransaction)
+            tx_hash = self._get_pipeline(account).send(tx, label="Transfer")
             
             # Return explorer link
             tx_url = self._get_explorer_link(tx_hash.hex())
@@ -409,7 +466,31 @@ class EthereumConnection(BaseConnection):
             logger.error(f"Transfer failed: {str(e)}")
             raise
 
-    def _get_swap_route(
+    def _get_swap_route(self, token_in: str, token_out: str, amount: float, sender: str) -> Dict:
+        """Get the best swap route, reusing a quote for the same swap from the last few seconds"""
+        return self._quote_cache.get_or_fetch(
+            (token_in.lower(), token_out.lower(), float(amount), sender.lower()),
+            lambda: self._fetch_swap_route(token_in, token_out, amount, sender)
+        )
+
+    def quote_swap(self, token_in: str, token_out: List[str], amounts: List[str]) -> List[Dict[str, Any]]:
+        """Quote every output token and amount concurrently without executing anything"""
+        private_key = os.getenv('ETH_PRIVATE_KEY')
+        sender = self._web3.eth.account.from_key(private_key).address
+        requests = [(token_in, out, float(amount), sender) for out in token_out for amount in amounts]
+        quotes = []
+        for request, result in zip(requests, quote_all(self._get_swap_route, requests)):
+            quote = {"token_in": token_in, "token_out": request[1], "amount_in": request[2]}
+            if "error" in result:
+                quote["error"] = result["error"]
+            else:
+                out = request[1]
+                decimals = 18 if out.lower() == self.NATIVE_TOKEN.lower() else self._get_decimals(out)
+                quote.update(summarize_kyber_route(result["quote"], decimals))
+            quotes.append(quote)
+        return quotes
+
+    def _fetch_swap_route(
         self,
         token_in: str,
         token_out: str,
@@ -424,11 +505,7 @@ class EthereumConnection(BaseConnection):
             if token_in.lower() == self.NATIVE_TOKEN.lower():
                 amount_raw = self._web3.to_wei(amount, 'ether')
             else:
-                token_contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_in),
-                    abi=ERC20_ABI
-                )
-                decimals = token_contract.functions.decimals().call()
+                decimals = self._get_decimals(token_in)
                 amount_raw = int(amount * (10 ** decimals))
             
             # Prepare API request
@@ -441,7 +518,7 @@ class EthereumConnection(BaseConnection):
                 "gasInclude": "true"
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = get_session().get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -479,7 +556,7 @@ class EthereumConnection(BaseConnection):
                 "source": "zerepy"
             }
             
-            response = requests.post(url, headers=headers, json=payload)
+            response = get_session().post(url, headers=headers, json=payload)
             response.raise_for_status()
             
             data = response.json()
@@ -492,8 +569,7 @@ class EthereumConnection(BaseConnection):
                 'to': Web3.to_checksum_address(route_data["routerAddress"]),
                 'data': data["data"]["data"],
                 'value': self._web3.to_wei(amount, 'ether') if token_in.lower() == self.NATIVE_TOKEN.lower() else 0,
-                'nonce': self._web3.eth.get_transaction_count(account.address),
-                'gasPrice': self._web3.eth.gas_price,
+                'gasPrice': self._get_pipeline(account).gas_price(),
                 'chainId': self.chain_id
             }
             
@@ -511,64 +587,58 @@ class EthereumConnection(BaseConnection):
             logger.error(f"Failed to build swap transaction: {str(e)}")
             raise
 
-        def _handle_token_approval(
-            self,
-            token_address: str,
-            spender_address: str,
-            amount: int
-        ) -> Optional[str]:
-            """Handle token approval for spender, returns tx hash if approval needed"""
-            try:
-                private_key = os.getenv('ETH_PRIVATE_KEY')
-                account = self._web3.eth.account.from_key(private_key)
+    def _handle_token_approval(
+        self,
+        token_address: str,
+        spender_address: str,
+        amount: int
+    ) -> Optional[str]:
+        """Handle token approval for spender, returns tx hash if approval needed"""
+        try:
+            private_key = os.getenv('ETH_PRIVATE_KEY')
+            account = self._web3.eth.account.from_key(private_key)
+            
+            token_contract = self._web3.eth.contract(
+                address=Web3.to_checksum_address(token_address),
+                abi=ERC20_ABI
+            )
+            
+            # Check current allowance
+            current_allowance = token_contract.functions.allowance(
+                account.address,
+                spender_address
+            ).call()
+            
+            if current_allowance < amount:
+                # Prepare approval transaction
+                approve_tx = token_contract.functions.approve(
+                    spender_address,
+                    amount
+                ).build_transaction({
+                    'from': account.address,
+                    'gasPrice': self._get_pipeline(account).gas_price(),
+                    'chainId': self.chain_id
+                })
                 
-                token_contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_address),
-                    abi=ERC20_ABI
-                )
+                # Estimate gas for approval
+                try:
+                    gas_estimate = self._web3.eth.estimate_gas(approve_tx)
+                    approve_tx['gas'] = int(gas_estimate * 1.1)  # Add 10% buffer
+                except Exception as e:
+                    logger.warning(f"Approval gas estimation failed: {e}, using default")
+                    approve_tx['gas'] = 100000  # Default gas for approvals
                 
-                # Check current allowance
-                current_allowance = token_contract.functions.allowance(
-                    account.address,
-                    spender_address
-                ).call()
+                # Sign and send approval transaction. Not waited on: the swap takes
+                # the next nonce, so it can only be mined after the approval
+                tx_hash = self._get_pipeline(account).send(approve_tx, label="Approval")
                 
-                if current_allowance < amount:
-                    # Prepare approval transaction
-                    approve_tx = token_contract.functions.approve(
-                        spender_address,
-                        amount
-                    ).build_transaction({
-                        'from': account.address,
-                        'nonce': self._web3.eth.get_transaction_count(account.address),
-                        'gasPrice': self._web3.eth.gas_price,
-                        'chainId': self.chain_id
-                    })
-                    
-                    # Estimate gas for approval
-                    try:
-                        gas_estimate = self._web3.eth.estimate_gas(approve_tx)
-                        approve_tx['gas'] = int(gas_estimate * 1.1)  # Add 10% buffer
-                    except Exception as e:
-                        logger.warning(f"Approval gas estimation failed: {e}, using default")
-                        approve_tx['gas'] = 100000  # Default gas for approvals
-                    
-                    # Sign and send approval transaction
-                    signed_approve = account.sign_transaction(approve_tx)
-                    tx_hash = self._web3.eth.send_raw_transaction(signed_approve.rawTransaction)
-                    
-                    # Wait for approval to be mined
-                    receipt = self._web3.eth.wait_for_transaction_receipt(tx_hash)
-                    if receipt['status'] != 1:
-                        raise ValueError("Token approval failed")
-                    
-                    return tx_hash.hex()
-                    
-                return None
+                return tx_hash.hex()
+                
+            return None
 
-            except Exception as e:
-                logger.error(f"Token approval failed: {str(e)}")
-                raise
+        except Exception as e:
+            logger.error(f"Token approval failed: {str(e)}")
+            raise
 
     def swap(
         self,
@@ -604,11 +674,7 @@ class EthereumConnection(BaseConnection):
                 if token_in.lower() == "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2".lower():  # WETH
                     amount_raw = self._web3.to_wei(amount, 'ether')
                 else:
-                    token_contract = self._web3.eth.contract(
-                        address=Web3.to_checksum_address(token_in),
-                        abi=ERC20_ABI
-                    )
-                    decimals = token_contract.functions.decimals().call()
+                    decimals = self._get_decimals(token_in)
                     amount_raw = int(amount * (10 ** decimals))
                     
                 approval_hash = self._handle_token_approval(token_in, router_address, amount_raw)
@@ -617,8 +683,7 @@ class EthereumConnection(BaseConnection):
             
             # Build and send swap transaction
             swap_tx = self._build_swap_tx(token_in, token_out, amount, slippage, route_data)
-            signed_tx = account.sign_transaction(swap_tx)
-            tx_hash = self._web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = self._get_pipeline(account).send(swap_tx, label="Swap")
 
             tx_url = self._get_explorer_link(tx_hash.hex())
             
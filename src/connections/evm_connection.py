@@ -1,14 +1,18 @@
 import logging
 import os
 import time
-import requests
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 from dotenv import load_dotenv, set_key
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
 from src.constants.networks import EVM_NETWORKS
 from src.constants.abi import ERC20_ABI
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, comma_list
+from src.helpers.http import get_session
+from src.helpers.evm.transactions import get_transaction_pipeline
+from src.helpers.evm.multicall import get_portfolio
+from src.helpers.token_cache import get_token_cache
+from src.helpers.quotes import QuoteCache, quote_all, summarize_kyber_route
 
 logger = logging.getLogger("connections.evm_connection")
 
@@ -42,11 +46,27 @@ class EVMConnection(BaseConnection):
         
         # Kyberswap aggregator API for best swap routes
         self.aggregator_api = f"https://aggregator-api.kyberswap.com/{self.network}/api/v1"
+        self._quote_cache = QuoteCache()
 
     def _get_explorer_link(self, tx_hash: str) -> str:
         """Generate block explorer link for transaction"""
         return f"https://{self.scanner_url}/tx/{tx_hash}"
 
+    def _get_decimals(self, token_address: str) -> int:
+        """ERC-20 decimals, read from the chain once per token and cached"""
+        return get_token_cache().get_decimals(
+            self.chain_id,
+            token_address,
+            lambda: self._web3.eth.contract(
+                address=Web3.to_checksum_address(token_address),
+                abi=ERC20_ABI
+            ).functions.decimals().call()
+        )
+
+    def _get_pipeline(self, account):
+        """Get the nonce-managed transaction pipeline for this account"""
+        return get_transaction_pipeline(self._web3, account, self.chain_id)
+
     def _initialize_web3(self) -> None:
         """Initialize Web3 connection with retry logic"""
         if not self._web3:
@@ -100,6 +120,23 @@ class EVMConnection(BaseConnection):
                 ],
                 description="Get ETH or token balance"
             ),
+            "get-portfolio": Action(
+                name="get-portfolio",
+                parameters=[
+                    ActionParameter("addresses", False, comma_list, "Comma-separated addresses (optional, your wallet if not provided)"),
+                    ActionParameter("tokens", False, comma_list, "Comma-separated token addresses or tickers")
+                ],
+                description="Get ETH and token balances for one or more addresses in one batched call"
+            ),
+            "quote-swap": Action(
+                name="quote-swap",
+                parameters=[
+                    ActionParameter("token_in", True, str, "Input token address"),
+                    ActionParameter("token_out", True, comma_list, "Comma-separated output token addresses"),
+                    ActionParameter("amounts", True, comma_list, "Comma-separated input amounts to quote")
+                ],
+                description="Quote swaps for several amounts or output tokens at once without executing them"
+            ),
             "transfer": Action(
                 name="transfer", 
                 parameters=[
@@ -205,7 +242,7 @@ class EVMConnection(BaseConnection):
     def _get_token_address(self, ticker: str) -> Optional[str]:
         """Helper function to get token address from DEXScreener"""
         try:
-            response = requests.get(f"https://api.dexscreener.com/latest/dex/search?q={ticker}")
+            response = get_session().get(f"https://api.dexscreener.com/latest/dex/search?q={ticker}")
             response.raise_for_status()
             data = response.json()
             if not data.get('pairs'):
@@ -240,7 +277,7 @@ class EVMConnection(BaseConnection):
         try:
             if ticker.lower() in ["eth", "ethereum", "matic"]:
                 return f"{self.NATIVE_TOKEN}"
-            address = self._get_token_address(ticker)
+            address = get_token_cache().get_address(self.chain_id, ticker, lambda: self._get_token_address(ticker))
             if address:
                 return address
         except Exception as error:
@@ -254,7 +291,7 @@ class EVMConnection(BaseConnection):
                 abi=ERC20_ABI
             )
             balance = contract.functions.balanceOf(Web3.to_checksum_address(address)).call()
-            decimals = contract.functions.decimals().call()
+            decimals = self._get_decimals(token_address)
             return balance / (10 ** decimals)
         else:
             balance = self._web3.eth.get_balance(Web3.to_checksum_address(address))
@@ -280,7 +317,7 @@ class EVMConnection(BaseConnection):
                 address=Web3.to_checksum_address(token_address), 
                 abi=ERC20_ABI 
             )
-            decimals = token_contract.functions.decimals().call()
+            decimals = self._get_decimals(token_address)
             raw_balance = token_contract.functions.balanceOf(account.address).call()
             token_balance = raw_balance / (10 ** decimals)
             return token_balance
@@ -288,33 +325,54 @@ class EVMConnection(BaseConnection):
         except Exception as e:
             return False
 
+    def get_portfolio(self, addresses: Optional[List[str]] = None, tokens: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get native and token balances for one or more addresses in a single batched read"""
+        try:
+            if not addresses:
+                private_key = os.getenv('EVM_PRIVATE_KEY') or os.getenv('ETH_PRIVATE_KEY')
+                if not private_key:
+                    raise ValueError("No wallet private key configured in .env")
+                account = self._web3.eth.account.from_key(private_key)
+                addresses = [account.address]
+
+            token_addresses = []
+            for token in tokens or []:
+                token_address = token if Web3.is_address(token) else self.get_token_by_ticker(token)
+                if not token_address or not Web3.is_address(token_address):
+                    raise ValueError(f"Unknown token: {token}")
+                if token_address.lower() != self.NATIVE_TOKEN.lower():
+                    token_addresses.append(token_address)
+
+            return get_portfolio(self._web3, addresses, token_addresses)
+
+        except Exception as e:
+            logger.error(f"Failed to get portfolio: {e}")
+            raise
+
     def _prepare_transfer_tx(self, to_address: str, amount: float, token_address: Optional[str] = None) -> Dict[str, Any]:
         """Prepare transfer transaction with proper gas estimation"""
         try:
             private_key = os.getenv('EVM_PRIVATE_KEY') or os.getenv('ETH_PRIVATE_KEY')
             account = self._web3.eth.account.from_key(private_key)
-            nonce = self._web3.eth.get_transaction_count(account.address)
-            gas_price = self._web3.eth.gas_price
+            gas_price = self._get_pipeline(account).gas_price()
             
             if token_address and token_address.lower() != self.NATIVE_TOKEN.lower():
                 contract = self._web3.eth.contract(
                     address=Web3.to_checksum_address(token_address),
                     abi=ERC20_ABI
                 )
-                decimals = contract.functions.decimals().call()
+                decimals = self._get_decimals(token_address)
                 amount_raw = int(amount * (10 ** decimals))
                 tx = contract.functions.transfer(
                     Web3.to_checksum_address(to_address),
                     amount_raw
                 ).build_transaction({
                     'from': account.address,
-                    'nonce': nonce,
                     'gasPrice': gas_price,
                     'chainId': self.chain_id
                 })
             else:
                 tx = {
-                    'nonce': nonce,
                     'to': Web3.to_checksum_address(to_address),
                     'value': self._web3.to_wei(amount, 'ether'),
                     'gas': 21000,
@@ -336,8 +394,7 @@ class EVMConnection(BaseConnection):
             tx = self._prepare_transfer_tx(to_address, amount, token_address)
             private_key = os.getenv('EVM_PRIVATE_KEY') or os.getenv('ETH_PRIVATE_KEY')
             account = self._web3.eth.account.from_key(private_key)
-            signed = account.sign_transaction(tx)
-            tx_hash = self._web3.eth.send_raw_transaction(signed.rawTransaction)
+            tx_hash = self._get_pipeline(account).send(tx, label="Transfer")
             tx_url = self._get_explorer_link(tx_hash.hex())
             return tx_url
 
@@ -346,17 +403,37 @@ class EVMConnection(BaseConnection):
             raise
 
     def _get_swap_route(self, token_in: str, token_out: str, amount: float, sender: str) -> Dict:
+        """Get the best swap route, reusing a quote for the same swap from the last few seconds"""
+        return self._quote_cache.get_or_fetch(
+            (token_in.lower(), token_out.lower(), float(amount), sender.lower()),
+            lambda: self._fetch_swap_route(token_in, token_out, amount, sender)
+        )
+
+    def quote_swap(self, token_in: str, token_out: List[str], amounts: List[str]) -> List[Dict[str, Any]]:
+        """Quote every output token and amount concurrently without executing anything"""
+        private_key = os.getenv('EVM_PRIVATE_KEY') or os.getenv('ETH_PRIVATE_KEY')
+        sender = self._web3.eth.account.from_key(private_key).address
+        requests = [(token_in, out, float(amount), sender) for out in token_out for amount in amounts]
+        quotes = []
+        for request, result in zip(requests, quote_all(self._get_swap_route, requests)):
+            quote = {"token_in": token_in, "token_out": request[1], "amount_in": request[2]}
+            if "error" in result:
+                quote["error"] = result["error"]
+            else:
+                out = request[1]
+                decimals = 18 if out.lower() == self.NATIVE_TOKEN.lower() else self._get_decimals(out)
+                quote.update(summarize_kyber_route(result["quote"], decimals))
+            quotes.append(quote)
+        return quotes
+
+    def _fetch_swap_route(self, token_in: str, token_out: str, amount: float, sender: str) -> Dict:
         """Get optimal swap route from Kyberswap API"""
         try:
             url = f"{self.aggregator_api}/routes"
             if token_in.lower() == self.NATIVE_TOKEN.lower():
                 amount_raw = self._web3.to_wei(amount, 'ether')
             else:
-                token_contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_in),
-                    abi=ERC20_ABI
-                )
-                decimals = token_contract.functions.decimals().call()
+                decimals = self._get_decimals(token_in)
                 amount_raw = int(amount * (10 ** decimals))
             
             headers = {"x-client-id": "zerepy"}
@@ -367,7 +444,7 @@ class EVMConnection(BaseConnection):
                 "to": sender,
                 "gasInclude": "true"
             }
-            response = requests.get(url, headers=headers, params=params)
+            response = get_session().get(url, headers=headers, params=params)
             response.raise_for_status()
             data = response.json()
             if data.get("code") != 0:
@@ -393,7 +470,7 @@ class EVMConnection(BaseConnection):
                 "deadline": int(time.time() + 1200),
                 "source": "zerepy"
             }
-            response = requests.post(url, headers=headers, json=payload)
+            response = get_session().post(url, headers=headers, json=payload)
             response.raise_for_status()
             data = response.json()
             if data.get("code") != 0:
@@ -403,8 +480,7 @@ class EVMConnection(BaseConnection):
                 'to': Web3.to_checksum_address(route_data["routerAddress"]),
                 'data': data["data"]["data"],
                 'value': self._web3.to_wei(amount, 'ether') if token_in.lower() == self.NATIVE_TOKEN.lower() else 0,
-                'nonce': self._web3.eth.get_transaction_count(account.address),
-                'gasPrice': self._web3.eth.gas_price,
+                'gasPrice': self._get_pipeline(account).gas_price(),
                 'chainId': self.chain_id
             }
             try:
@@ -435,8 +511,7 @@ class EVMConnection(BaseConnection):
                     amount
                 ).build_transaction({
                     'from': account.address,
-                    'nonce': self._web3.eth.get_transaction_count(account.address),
-                    'gasPrice': self._web3.eth.gas_price,
+                    'gasPrice': self._get_pipeline(account).gas_price(),
                     'chainId': self.chain_id
                 })
                 try:
@@ -445,11 +520,8 @@ class EVMConnection(BaseConnection):
                 except Exception as e:
                     logger.warning(f"Approval gas estimation failed: {e}, using default")
                     approve_tx['gas'] = 100000
-                signed_approve = account.sign_transaction(approve_tx)
-                tx_hash = self._web3.eth.send_raw_transaction(signed_approve.rawTransaction)
-                receipt = self._web3.eth.wait_for_transaction_receipt(tx_hash)
-                if receipt['status'] != 1:
-                    raise ValueError("Token approval failed")
+                # Not waited on: the swap takes the next nonce, so it can only be mined after the approval
+                tx_hash = self._get_pipeline(account).send(approve_tx, label="Approval")
                 return tx_hash.hex()
             return None
 
@@ -473,18 +545,13 @@ class EVMConnection(BaseConnection):
                 if token_in.lower() == "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2".lower():
                     amount_raw = self._web3.to_wei(amount, 'ether')
                 else:
-                    token_contract = self._web3.eth.contract(
-                        address=Web3.to_checksum_address(token_in),
-                        abi=ERC20_ABI
-                    )
-                    decimals = token_contract.functions.decimals().call()
+                    decimals = self._get_decimals(token_in)
                     amount_raw = int(amount * (10 ** decimals))
                 approval_hash = self._handle_token_approval(token_in, router_address, amount_raw)
                 if approval_hash:
                     logger.info(f"Token approval transaction: {self._get_explorer_link(approval_hash)}")
             swap_tx = self._build_swap_tx(token_in, token_out, amount, slippage, route_data)
-            signed_tx = account.sign_transaction(swap_tx)
-            tx_hash = self._web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = self._get_pipeline(account).send(swap_tx, label="Swap")
             tx_url = self._get_explorer_link(tx_hash.hex())
             return (f"Swap transaction sent! (allow time for scanner to populate it):\nTransaction: {tx_url}")
                 
@@ -1,13 +1,19 @@
 import os
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from dotenv import set_key, load_dotenv
 from farcaster import Warpcast
 from farcaster.models import CastContent, CastHash, IterableCastsResult, Parent, ReactionsPutResult
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, flag
+from src.helpers.checkpoints import get_cursor_store
 
 logger = logging.getLogger("connections.farcaster_connection")
 
+# Casts fetched per request when reading only new casts; reading stops at the first page reaching seen casts
+FARCASTER_PAGE_SIZE = 25
+# Pages followed back to the last seen cast before older unseen casts are skipped
+FARCASTER_MAX_BACKFILL_PAGES = 10
+
 class FarcasterConnectionError(Exception):
     """Base exception for Farcaster connection errors"""
     pass
@@ -54,7 +60,8 @@ class FarcasterConnection(BaseConnection):
                 parameters=[
                     ActionParameter("fid", True, int, "Farcaster ID of the user"),
                     ActionParameter("cursor", False, int, "Cursor, defaults to None"),
-                    ActionParameter("limit", False, int, "Number of casts to read, defaults to 25, otherwise min(limit, 100)")
+                    ActionParameter("limit", False, int, "Number of casts to read, defaults to 25, otherwise min(limit, 100)"),
+                    ActionParameter("new_only", False, flag, "Only casts newer than the last read when no cursor is given, defaults to true")
                 ],
                 description="Get the latest casts from a user"
             ),
@@ -71,7 +78,8 @@ class FarcasterConnection(BaseConnection):
                 name="read-timeline",
                 parameters=[
                     ActionParameter("cursor", False, int, "Cursor, defaults to None"),
-                    ActionParameter("limit", False, int, "Number of casts to read from timeline, defaults to 100")
+                    ActionParameter("limit", False, int, "Number of casts to read from timeline, defaults to 100"),
+                    ActionParameter("new_only", False, flag, "Only casts newer than the last read when no cursor is given, defaults to true")
                 ],
                 description="Read all recent casts"
             ),
@@ -205,20 +213,62 @@ class FarcasterConnection(BaseConnection):
             raise ValueError(f"Invalid parameters: {', '.join(errors)}")
 
         # Add config parameters if not provided
-        if action_name == "read-timeline" and "count" not in kwargs:
-            kwargs["count"] = self.config["timeline_read_count"]
+        if action_name == "read-timeline" and "limit" not in kwargs:
+            kwargs["limit"] = self.config["timeline_read_count"]
 
         # Call the appropriate method based on action name
         method_name = action_name.replace('-', '_')
         method = getattr(self, method_name)
         return method(**kwargs)
     
-    def get_latest_casts(self, fid: int, cursor: Optional[int] = None, limit: Optional[int] = 25) -> IterableCastsResult:
-        """Get the latest casts from a user"""
+    def _read_new_casts(self, cursor_key: str, fetch: Callable[..., IterableCastsResult], limit: int) -> IterableCastsResult:
+        """
+        Read casts newer than the last read, newest first
+
+        Warpcast pages backwards in time with no "since" parameter, so pages are
+        fetched until one reaches a cast already seen, and the newest cast's
+        timestamp is kept as the high-water mark. The first read returns the
+        newest `limit` casts; later reads return every cast posted since, up to
+        FARCASTER_MAX_BACKFILL_PAGES pages, so the mark never moves past casts
+        that weren't returned.
+        """
+        cursors = get_cursor_store()
+        since = cursors.get(cursor_key, 0)
+        casts, cursor, pages = [], None, 0
+        while True:
+            page_size = FARCASTER_PAGE_SIZE if since else min(limit - len(casts), FARCASTER_PAGE_SIZE)
+            page = fetch(cursor, page_size)
+            pages += 1
+            new_casts = [cast for cast in page.casts if cast.timestamp > since]
+            casts.extend(new_casts)
+            cursor = page.cursor
+            if len(new_casts) < len(page.casts) or not cursor:
+                break
+            if not since and len(casts) >= limit:
+                break
+            if since and pages >= FARCASTER_MAX_BACKFILL_PAGES:
+                logger.warning(
+                    f"More than {FARCASTER_MAX_BACKFILL_PAGES} pages of new casts for {cursor_key}, older ones are skipped"
+                )
+                break
+
+        if casts:
+            cursors.set(cursor_key, max(cast.timestamp for cast in casts))
+        return IterableCastsResult(casts=casts if since else casts[:limit], cursor=cursor)
+
+    def get_latest_casts(self, fid: int, cursor: Optional[int] = None, limit: Optional[int] = 25, new_only: bool = True) -> IterableCastsResult:
+        """Get the latest casts from a user, by default only those posted since the last read"""
         logger.debug(f"Getting latest casts for {fid}, cursor: {cursor}, limit: {limit}")
 
-        casts = self._client.get_casts(fid, cursor, limit)
-        logger.debug(f"Retrieved {len(casts)} casts")
+        if new_only and cursor is None:
+            casts = self._read_new_casts(
+                f"farcaster:casts:{fid}",
+                lambda page_cursor, page_limit: self._client.get_casts(fid, page_cursor, page_limit),
+                limit
+            )
+        else:
+            casts = self._client.get_casts(fid, cursor, limit)
+        logger.debug(f"Retrieved {len(casts.casts)} casts")
         return casts
 
     def post_cast(self, text: str, embeds: Optional[List[str]] = None, channel_key: Optional[str] = None) -> CastContent:
@@ -227,9 +277,11 @@ class FarcasterConnection(BaseConnection):
         return self._client.post_cast(text, embeds, None, channel_key)
 
 
-    def read_timeline(self, cursor: Optional[int] = None, limit: Optional[int] = 100) -> IterableCastsResult:
-        """Read all recent casts"""
+    def read_timeline(self, cursor: Optional[int] = None, limit: Optional[int] = 100, new_only: bool = True) -> IterableCastsResult:
+        """Read all recent casts, by default only those posted since the last read"""
         logger.debug(f"Reading timeline, cursor: {cursor}, limit: {limit}")
+        if new_only and cursor is None:
+            return self._read_new_casts("farcaster:timeline", self._client.get_recent_casts, limit)
         return self._client.get_recent_casts(cursor, limit)
 
     def like_cast(self, cast_hash: str) -> ReactionsPutResult:
@@ -2,10 +2,10 @@ import logging
 import os
 from typing import Dict, Any
 
-import requests
 from dotenv import load_dotenv, set_key
 from openai import OpenAI
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, prompt_batch, system_prompt_text
+from src.helpers.http import get_session
 
 logger = logging.getLogger("connections.galadriel_connection")
 
@@ -53,11 +53,20 @@ class GaladrielConnection(BaseConnection):
                 name="generate-text",
                 parameters=[
                     ActionParameter("prompt", True, str, "The input prompt for text generation"),
-                    ActionParameter("system_prompt", True, str, "System prompt to guide the model"),
+                    ActionParameter("system_prompt", True, system_prompt_text, "System prompt to guide the model"),
                     ActionParameter("model", False, str, "Model to use for generation")
                 ],
                 description="Generate text using Galadriel models"
             ),
+            "generate-batch": Action(
+                name="generate-batch",
+                parameters=[
+                    ActionParameter("prompts", True, prompt_batch, "List of prompts or [prompt, system_prompt] pairs"),
+                    ActionParameter("system_prompt", False, system_prompt_text, "System prompt for prompts that don't carry their own"),
+                    ActionParameter("model", False, str, "Model to use for generation")
+                ],
+                description="Generate text for several prompts concurrently using Galadriel models"
+            ),
         }
 
     def _get_client(self) -> OpenAI:
@@ -127,7 +136,7 @@ class GaladrielConnection(BaseConnection):
             return False
 
     def _is_api_key_valid(self, api_key):
-        response = requests.get(
+        response = get_session().get(
             f"{API_BASE_URL}/chat/completions",
             headers={
                 "Authorization": f"Bearer {api_key}"
@@ -1,9 +1,9 @@
 import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 from dotenv import load_dotenv, set_key
 from openai import OpenAI
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, prompt_batch, system_prompt_text
 
 logger = logging.getLogger("connections.groq_connection")
 
@@ -48,12 +48,21 @@ class GroqConnection(BaseConnection):
                 name="generate-text",
                 parameters=[
                     ActionParameter("prompt", True, str, "The input prompt for text generation"),
-                    ActionParameter("system_prompt", True, str, "System prompt to guide the model"),
+                    ActionParameter("system_prompt", True, system_prompt_text, "System prompt to guide the model"),
                     ActionParameter("model", False, str, "Model to use for generation"),
                     ActionParameter("temperature", False, float, "A decimal number that determines the degree of randomness in the response.")
                 ],
                 description="Generate text using Groq models"
             ),
+            "generate-batch": Action(
+                name="generate-batch",
+                parameters=[
+                    ActionParameter("prompts", True, prompt_batch, "List of prompts or [prompt, system_prompt] pairs"),
+                    ActionParameter("system_prompt", False, system_prompt_text, "System prompt for prompts that don't carry their own"),
+                    ActionParameter("model", False, str, "Model to use for generation")
+                ],
+                description="Generate text for several prompts concurrently using Groq models"
+            ),
             "check-model": Action(
                 name="check-model",
                 parameters=[
@@ -160,6 +169,31 @@ class GroqConnection(BaseConnection):
         except Exception as e:
             raise GroqAPIError(f"Text generation failed: {e}")
 
+    def generate_text_stream(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> Iterator[str]:
+        """Generate text using Groq models, yielding chunks as they arrive"""
+        try:
+            client = self._get_client()
+
+            # Use configured model if none provided
+            if not model:
+                model = self.config["model"]
+
+            stream = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+                stream=True,
+            )
+
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            raise GroqAPIError(f"Text generation failed: {e}")
+
     def check_model(self, model: str, **kwargs) -> bool:
         """Check if a specific model is available"""
         try:
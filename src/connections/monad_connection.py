@@ -1,14 +1,17 @@
 import logging
 import os
 import time
-import requests
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 from dotenv import load_dotenv, set_key
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
 from src.constants.networks import EVM_NETWORKS
 from src.constants.abi import ERC20_ABI
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, comma_list
+from src.helpers.http import get_session
+from src.helpers.evm.transactions import get_transaction_pipeline
+from src.helpers.token_cache import get_token_cache
+from src.helpers.quotes import QuoteCache, quote_all
 
 logger = logging.getLogger("connections.monad_connection")
 
@@ -35,6 +38,7 @@ class MonadConnection(BaseConnection):
             
         self.scanner_url = MONAD_SCANNER_URL
         self.chain_id = MONAD_CHAIN_ID
+        self._quote_cache = QuoteCache()
         
         super().__init__(config)
         self._initialize_web3()
@@ -43,6 +47,21 @@ class MonadConnection(BaseConnection):
         """Generate block explorer link for transaction"""
         return f"https://{self.scanner_url}/tx/{tx_hash}"
 
+    def _get_decimals(self, token_address: str) -> int:
+        """ERC-20 decimals, read from the chain once per token and cached"""
+        return get_token_cache().get_decimals(
+            self.chain_id,
+            token_address,
+            lambda: self._web3.eth.contract(
+                address=Web3.to_checksum_address(token_address),
+                abi=ERC20_ABI
+            ).functions.decimals().call()
+        )
+
+    def _get_pipeline(self, account):
+        """Get the nonce-managed transaction pipeline for this account"""
+        return get_transaction_pipeline(self._web3, account, self.chain_id)
+
     def _initialize_web3(self) -> None:
         """Initialize Web3 connection with retry logic"""
         if not self._web3:
@@ -110,6 +129,15 @@ class MonadConnection(BaseConnection):
                     ActionParameter("slippage", False, float, "Max slippage percentage (default 0.5%)")
                 ],
                 description="Swap tokens using 0x API"
+            ),
+            "quote-swap": Action(
+                name="quote-swap",
+                parameters=[
+                    ActionParameter("token_in", True, str, "Input token address"),
+                    ActionParameter("token_out", True, comma_list, "Comma-separated output token addresses"),
+                    ActionParameter("amounts", True, comma_list, "Comma-separated input amounts to quote")
+                ],
+                description="Quote swaps for several amounts or output tokens at once without executing them"
             )
         }
 
@@ -214,7 +242,7 @@ class MonadConnection(BaseConnection):
                 address=Web3.to_checksum_address(token_address), 
                 abi=ERC20_ABI 
             )
-            decimals = contract.functions.decimals().call()
+            decimals = self._get_decimals(token_address)
             raw_balance = contract.functions.balanceOf(account.address).call()
             return raw_balance / (10 ** decimals)
             
@@ -232,9 +260,6 @@ class MonadConnection(BaseConnection):
         try:
             account = self._get_current_account()
             
-            # Get latest nonce
-            nonce = self._web3.eth.get_transaction_count(account.address)
-            
             # Use fixed gas price for testnet
             gas_price = Web3.to_wei(MONAD_BASE_GAS_PRICE, 'gwei')
             
@@ -244,7 +269,7 @@ class MonadConnection(BaseConnection):
                     address=Web3.to_checksum_address(token_address),
                     abi=ERC20_ABI
                 )
-                decimals = contract.functions.decimals().call()
+                decimals = self._get_decimals(token_address)
                 amount_raw = int(amount * (10 ** decimals))
                 
                 # Monad charges based on gas limit, not usage
@@ -253,14 +278,12 @@ class MonadConnection(BaseConnection):
                     amount_raw
                 ).build_transaction({
                     'from': account.address,
-                    'nonce': nonce,
                     'gasPrice': gas_price,
                     'chainId': self.chain_id
                 })
             else:
                 # Prepare native token transfer
                 tx = {
-                    'nonce': nonce,
                     'to': Web3.to_checksum_address(to_address),
                     'value': self._web3.to_wei(amount, 'ether'),
                     'gas': 21000,  # Standard ETH transfer gas
@@ -295,10 +318,9 @@ class MonadConnection(BaseConnection):
                     f"Insufficient balance. Required: {total_required}, Available: {current_balance}"
                 )
 
-            # Prepare and send transaction
+            # Prepare and send transaction; the pipeline assigns the nonce
             tx = self._prepare_transfer_tx(to_address, amount, token_address)
-            signed = account.sign_transaction(tx)
-            tx_hash = self._web3.eth.send_raw_transaction(signed.rawTransaction)
+            tx_hash = self._get_pipeline(account).send(tx, label="Transfer")
             
             tx_url = self._get_explorer_link(tx_hash.hex())
             return f"Transaction sent: {tx_url}"
@@ -308,6 +330,34 @@ class MonadConnection(BaseConnection):
             raise
 
     def _get_swap_quote(self, token_in: str, token_out: str, amount: float, sender: str) -> Dict:
+        """Get a swap quote, reusing a quote for the same swap from the last few seconds"""
+        return self._quote_cache.get_or_fetch(
+            (token_in.lower(), token_out.lower(), float(amount), sender.lower()),
+            lambda: self._fetch_swap_quote(token_in, token_out, amount, sender)
+        )
+
+    def quote_swap(self, token_in: str, token_out: List[str], amounts: List[str]) -> List[Dict[str, Any]]:
+        """Quote every output token and amount concurrently without executing anything"""
+        sender = self._get_current_account().address
+        requests = [(token_in, out, float(amount), sender) for out in token_out for amount in amounts]
+        quotes = []
+        for request, result in zip(requests, quote_all(self._get_swap_quote, requests)):
+            quote = {"token_in": token_in, "token_out": request[1], "amount_in": request[2]}
+            if "error" in result:
+                quote["error"] = result["error"]
+            else:
+                out = request[1]
+                decimals = 18 if out.lower() == self.NATIVE_TOKEN.lower() else self._get_decimals(out)
+                data = result["quote"]
+                quote.update(
+                    amount_out=int(data["buyAmount"]) / (10 ** decimals),
+                    min_amount_out=int(data.get("minBuyAmount", data["buyAmount"])) / (10 ** decimals),
+                    network_fee=float(self._web3.from_wei(int(data.get("totalNetworkFee") or 0), 'ether'))
+                )
+            quotes.append(quote)
+        return quotes
+
+    def _fetch_swap_quote(self, token_in: str, token_out: str, amount: float, sender: str) -> Dict:
         """Get swap quote from 0x API using v2 endpoints"""
         try:
             load_dotenv()
@@ -318,11 +368,7 @@ class MonadConnection(BaseConnection):
                 token_in = self.NATIVE_TOKEN
                 logger.debug(f"Using native token identifier: {token_in}")
             else:
-                token_contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_in),
-                    abi=ERC20_ABI
-                )
-                decimals = token_contract.functions.decimals().call()
+                decimals = self._get_decimals(token_in)
                 amount_raw = int(amount * (10 ** decimals))
 
             # Set up API request according to v2 spec
@@ -346,7 +392,7 @@ class MonadConnection(BaseConnection):
             logger.debug(params)
             logger.debug("\nURL ")
             logger.debug(url)
-            response = requests.get(
+            response = get_session().get(
                 url,
                 headers=headers,
                 params=params
@@ -416,8 +462,6 @@ class MonadConnection(BaseConnection):
                     approval_hash = self._handle_token_approval(token_in, spender_address, amount_raw)
                     if approval_hash:
                         logger.info(f"Token approval transaction: {self._get_explorer_link(approval_hash)}")
-                        # Wait for approval confirmation
-                        self._web3.eth.wait_for_transaction_receipt(approval_hash)
             
             # Prepare swap transaction using quote data
             tx = {
@@ -425,7 +469,6 @@ class MonadConnection(BaseConnection):
                 'to': Web3.to_checksum_address(transaction["to"]),
                 'data': transaction["data"],
                 'value': self._web3.to_wei(amount, 'ether') if is_native else 0,
-                'nonce': self._web3.eth.get_transaction_count(account.address),
                 'gasPrice': Web3.to_wei(MONAD_BASE_GAS_PRICE, 'gwei'),
                 'chainId': self.chain_id,
             }
@@ -438,8 +481,7 @@ class MonadConnection(BaseConnection):
                 tx['gas'] = 500000  # Default gas limit for swaps
 
             # Sign and send transaction
-            signed_tx = account.sign_transaction(tx)
-            tx_hash = self._web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = self._get_pipeline(account).send(tx, label="Swap")
 
             tx_url = self._get_explorer_link(tx_hash.hex())
             return f"Swap transaction sent: {tx_url}"
@@ -448,58 +490,52 @@ class MonadConnection(BaseConnection):
             logger.error(f"Swap failed: {str(e)}")
             raise
 
-        def _handle_token_approval(
-            self,
-            token_address: str,
-            spender_address: str,
-            amount: int
-        ) -> Optional[str]:
-            """Handle token approval for spender, returns tx hash if approval needed"""
-            try:
-                account = self._get_current_account()
+    def _handle_token_approval(
+        self,
+        token_address: str,
+        spender_address: str,
+        amount: int
+    ) -> Optional[str]:
+        """Handle token approval for spender, returns tx hash if approval needed"""
+        try:
+            account = self._get_current_account()
+            
+            token_contract = self._web3.eth.contract(
+                address=Web3.to_checksum_address(token_address),
+                abi=ERC20_ABI
+            )
+            
+            # Check current allowance
+            current_allowance = token_contract.functions.allowance(
+                account.address,
+                spender_address
+            ).call()
+            
+            if current_allowance < amount:
+                # Prepare approval transaction with fixed gas price
+                approve_tx = token_contract.functions.approve(
+                    spender_address,
+                    amount
+                ).build_transaction({
+                    'from': account.address,
+                    'gasPrice': Web3.to_wei(MONAD_BASE_GAS_PRICE, 'gwei'),
+                    'chainId': self.chain_id
+                })
                 
-                token_contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_address),
-                    abi=ERC20_ABI
-                )
+                # Set fixed gas for approval on Monad
+                approve_tx['gas'] = 100000  # Standard approval gas
                 
-                # Check current allowance
-                current_allowance = token_contract.functions.allowance(
-                    account.address,
-                    spender_address
-                ).call()
+                # Sign and send approval transaction. Not waited on: the swap takes
+                # the next nonce, so it can only be mined after the approval
+                tx_hash = self._get_pipeline(account).send(approve_tx, label="Approval")
                 
-                if current_allowance < amount:
-                    # Prepare approval transaction with fixed gas price
-                    approve_tx = token_contract.functions.approve(
-                        spender_address,
-                        amount
-                    ).build_transaction({
-                        'from': account.address,
-                        'nonce': self._web3.eth.get_transaction_count(account.address),
-                        'gasPrice': Web3.to_wei(MONAD_BASE_GAS_PRICE, 'gwei'),
-                        'chainId': self.chain_id
-                    })
-                    
-                    # Set fixed gas for approval on Monad
-                    approve_tx['gas'] = 100000  # Standard approval gas
-                    
-                    # Sign and send approval transaction
-                    signed_approve = account.sign_transaction(approve_tx)
-                    tx_hash = self._web3.eth.send_raw_transaction(signed_approve.rawTransaction)
-                    
-                    # Wait for approval to be mined
-                    receipt = self._web3.eth.wait_for_transaction_receipt(tx_hash)
-                    if receipt['status'] != 1:
-                        raise ValueError("Token approval failed")
-                    
-                    return tx_hash.hex()
-                    
-                return None
+                return tx_hash.hex()
+                
+            return None
 
-            except Exception as e:
-                logger.error(f"Token approval failed: {str(e)}")
-                raise
+        except Exception as e:
+            logger.error(f"Token approval failed: {str(e)}")
+            raise
 
     def perform_action(self, action_name: str, kwargs: Dict[str, Any]) -> Any:
         """Execute a Monad action with validation"""
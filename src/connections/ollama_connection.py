@@ -1,8 +1,8 @@
 import logging
-import requests
 import json
-from typing import Dict, Any
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from typing import Dict, Any, Iterator
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, prompt_batch, system_prompt_text
+from src.helpers.http import HTTP_CONNECT_TIMEOUT, get_session
 
 logger = logging.getLogger("connections.ollama_connection")
 
@@ -48,11 +48,20 @@ class OllamaConnection(BaseConnection):
                 name="generate-text",
                 parameters=[
                     ActionParameter("prompt", True, str, "The input prompt for text generation"),
-                    ActionParameter("system_prompt", True, str, "System prompt to guide the model"),
+                    ActionParameter("system_prompt", True, system_prompt_text, "System prompt to guide the model"),
                     ActionParameter("model", False, str, "Model to use for generation"),
                 ],
                 description="Generate text using Ollama's running model"
             ),
+            "generate-batch": Action(
+                name="generate-batch",
+                parameters=[
+                    ActionParameter("prompts", True, prompt_batch, "List of prompts or [prompt, system_prompt] pairs"),
+                    ActionParameter("system_prompt", False, system_prompt_text, "System prompt for prompts that don't carry their own"),
+                    ActionParameter("model", False, str, "Model to use for generation")
+                ],
+                description="Generate text for several prompts concurrently using Ollama's running model"
+            ),
         }
 
     def configure(self) -> bool:
@@ -79,7 +88,7 @@ class OllamaConnection(BaseConnection):
         """Test if Ollama is reachable"""
         try:
             url = f"{self.base_url}/v1/models"
-            response = requests.get(url)
+            response = get_session().get(url)
             if response.status_code != 200:
                 raise OllamaAPIError(f"Failed to connect to Ollama: {response.status_code} - {response.text}")
         except Exception as e:
@@ -97,6 +106,10 @@ class OllamaConnection(BaseConnection):
 
     def generate_text(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> str:
         """Generate text using Ollama API with streaming support"""
+        return "".join(self.generate_text_stream(prompt, system_prompt, model=model))
+
+    def generate_text_stream(self, prompt: str, system_prompt: str, model: str = None, **kwargs) -> Iterator[str]:
+        """Generate text using Ollama API, yielding chunks as they arrive"""
         try:
             url = f"{self.base_url}/api/generate"
             payload = {
@@ -104,27 +117,24 @@ class OllamaConnection(BaseConnection):
                 "prompt": prompt,
                 "system": system_prompt,
             }
-            response = requests.post(url, json=payload, stream=True)
-
-            if response.status_code != 200:
-                raise OllamaAPIError(f"API error: {response.status_code} - {response.text}")
-
-            # Initialize an empty string to store the complete response
-            full_response = ""
-
-            # Process each line of the response as a JSON object
-            for line in response.iter_lines():
-                if line:
-                    try:
-                        # Parse the JSON object
-                        data = json.loads(line.decode("utf-8"))
-                        # Append the "response" field to the full response
-                        full_response += data.get("response", "")
-                    except json.JSONDecodeError as e:
-                        raise OllamaAPIError(f"Failed to parse JSON: {e}")
-
-            return full_response
-
+            # Loading a model can take a while before the first line arrives, only bound the connect
+            with get_session().post(url, json=payload, stream=True, timeout=(HTTP_CONNECT_TIMEOUT, None)) as response:
+                if response.status_code != 200:
+                    raise OllamaAPIError(f"API error: {response.status_code} - {response.text}")
+
+                # Process each line of the response as a JSON object
+                for line in response.iter_lines():
+                    if line:
+                        try:
+                            # Parse the JSON object and pass on its "response" field
+                            data = json.loads(line.decode("utf-8"))
+                        except json.JSONDecodeError as e:
+                            raise OllamaAPIError(f"Failed to parse JSON: {e}")
+                        if data.get("response"):
+                            yield data["response"]
+
+        except OllamaAPIError:
+            raise
         except Exception as e:
             raise OllamaAPIError(f"Text generation failed: {e}")
 
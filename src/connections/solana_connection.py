@@ -2,9 +2,11 @@ import logging
 import os
 import requests
 import asyncio
-from typing import Dict, Any, Optional
+import functools
+import threading
+from typing import Dict, Any, List, Optional
 
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, comma_list
 from src.types import JupiterTokenData
 from src.constants import LAMPORTS_PER_SOL, SPL_TOKENS
 from src.helpers.solana.pumpfun import PumpfunTokenManager
@@ -16,6 +18,7 @@ from src.helpers.solana.token_deploy import TokenDeploymentManager
 from src.helpers.solana.performance import SolanaPerformanceTracker
 from src.helpers.solana.transfer import SolanaTransferHelper
 from src.helpers.solana.read import SolanaReadHelper
+from src.helpers.quotes import QuoteCache, quote_all
 
 
 from dotenv import load_dotenv, set_key
@@ -43,18 +46,62 @@ class SolanaConfigurationError(SolanaConnectionError):
     pass
 
 
+def on_connection_loop(method):
+    """Run an async SolanaConnection method on the connection's own event loop, whichever loop awaits it"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        loop = self._get_loop()
+        if asyncio.get_running_loop() is loop:
+            return await method(self, *args, **kwargs)
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(method(self, *args, **kwargs), loop)
+        )
+    return wrapper
+
+
 class SolanaConnection(BaseConnection):
     def __init__(self, config: Dict[str, Any]):
         logger.info("Initializing Solana connection...")
         super().__init__(config)
+        # One event loop and RPC client per connection, reused by every action
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._client: Optional[AsyncClient] = None
+        self._quote_cache = QuoteCache()
 
     @property
     def is_llm_provider(self) -> bool:
         return False
 
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the connection's event loop, started on a daemon thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="solana-connection", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def _run(self, coro):
+        """Run a coroutine on the connection's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+
     def _get_connection_async(self) -> AsyncClient:
-        conn = AsyncClient(self.config["rpc"])
-        return conn
+        # The client's HTTP session binds to the loop it is used on, so only use it from the connection's loop
+        if self._client is None:
+            self._client = AsyncClient(self.config["rpc"])
+        return self._client
+
+    def close(self) -> None:
+        """Close the RPC client and stop the connection's event loop"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.close(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
 
     def _get_wallet(self):
         creds = self._get_credentials()
@@ -143,6 +190,24 @@ class SolanaConnection(BaseConnection):
                 ],
                 description="Swap tokens using Jupiter",
             ),
+            "quote-swap": Action(
+                name="quote-swap",
+                parameters=[
+                    ActionParameter(
+                        "output_mint", True, comma_list, "Comma-separated output token mint addresses"
+                    ),
+                    ActionParameter(
+                        "input_amounts", True, comma_list, "Comma-separated input amounts to quote"
+                    ),
+                    ActionParameter(
+                        "input_mint", False, str, "Input token mint (optional for SOL)"
+                    ),
+                    ActionParameter(
+                        "slippage_bps", False, int, "Slippage in basis points"
+                    ),
+                ],
+                description="Quote Jupiter swaps for several amounts or output tokens at once without executing them",
+            ),
             "get-balance": Action(
                 name="get-balance",
                 parameters=[
@@ -286,14 +351,19 @@ class SolanaConnection(BaseConnection):
     def transfer(
         self, to_address: str, amount: float, token_mint: Optional[str] = None
     ) -> str:
-        res = SolanaTransferHelper.transfer(
+        return self._run(self.transfer_async(to_address, amount, token_mint))
+
+    @on_connection_loop
+    async def transfer_async(
+        self, to_address: str, amount: float, token_mint: Optional[str] = None
+    ) -> str:
+        res = await SolanaTransferHelper.transfer(
             self._get_connection_async(),
             self._get_wallet(),
             to_address,
             amount,
             token_mint,
         )
-        res = asyncio.run(res)
         logger.debug(f"Transferred {amount} to {to_address}\nTransaction ID: {res}")
         return res
 
@@ -304,12 +374,22 @@ class SolanaConnection(BaseConnection):
         input_amount: float,
         input_mint: Optional[str] = SPL_TOKENS["USDC"],
         slippage_bps: int = 100,
+    ) -> str:
+        return self._run(self.trade_async(output_mint, input_amount, input_mint, slippage_bps))
+
+    @on_connection_loop
+    async def trade_async(
+        self,
+        output_mint: str,
+        input_amount: float,
+        input_mint: Optional[str] = SPL_TOKENS["USDC"],
+        slippage_bps: int = 100,
     ) -> str:
         logger.info(f"Swapping {input_amount} for {output_mint}")
         wallet = self._get_wallet()
         async_client = self._get_connection_async()
         jupiter = self._get_jupiter(wallet, async_client)
-        res = TradeManager.trade(
+        return await TradeManager.trade(
             async_client,
             wallet,
             jupiter,
@@ -318,26 +398,29 @@ class SolanaConnection(BaseConnection):
             input_mint,
             slippage_bps,
         )
-        res = asyncio.run(res)
-        return res
 
     def get_balance(self, token_address: str = None) -> float:
+        return self._run(self.get_balance_async(token_address))
+
+    @on_connection_loop
+    async def get_balance_async(self, token_address: str = None) -> float:
         if not token_address:
             logger.info("Getting SOL balance")
         else:
             logger.info(f"Getting balance for {token_address}")
-        res = SolanaReadHelper.get_balance(
+        return await SolanaReadHelper.get_balance(
             self._get_connection_async(), self._get_wallet(), token_address
         )
-        res = asyncio.run(res)
-        return res
 
     def stake(self, amount: float) -> str:
+        return self._run(self.stake_async(amount))
+
+    @on_connection_loop
+    async def stake_async(self, amount: float) -> str:
         logger.info(f"Staking {amount} SOL")
-        res = StakeManager.stake_with_jup(
+        res = await StakeManager.stake_with_jup(
             self._get_connection_async(), self._get_wallet(), amount
         )
-        res = asyncio.run(res)
         logger.debug(f"Staked {amount} SOL\nTransaction ID: {res}")
         return res
 
@@ -353,9 +436,14 @@ class SolanaConnection(BaseConnection):
         # return res
 
     def request_faucet(self) -> str:
+        return self._run(self.request_faucet_async())
+
+    @on_connection_loop
+    async def request_faucet_async(self) -> str:
         logger.info("Requesting faucet funds")
-        res = FaucetManager.request_faucet_funds(self)
-        res = asyncio.run(res)
+        res = await FaucetManager.request_faucet_funds(
+            self._get_connection_async(), self._get_wallet()
+        )
         logger.debug(f"Requested faucet funds\nTransaction ID: {res}")
         return res
 
@@ -376,9 +464,69 @@ class SolanaConnection(BaseConnection):
 
     # todo: test on mainnet
     def get_tps(self) -> int:
-        res = SolanaPerformanceTracker.fetch_current_tps(self._get_connection_async())
-        res = asyncio.run(res)
-        return res
+        return self._run(self.get_tps_async())
+
+    def quote_swap(
+        self,
+        output_mint: List[str],
+        input_amounts: List[str],
+        input_mint: Optional[str] = SPL_TOKENS["USDC"],
+        slippage_bps: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Quote every output mint and amount concurrently without executing anything"""
+        requests = [
+            (input_mint, mint, float(amount), slippage_bps)
+            for mint in output_mint
+            for amount in input_amounts
+        ]
+        # Output decimals are looked up once per mint, concurrently, and a failed lookup only fails that mint's quotes
+        mints = list(dict.fromkeys(output_mint))
+        decimals_by_mint = dict(zip(mints, quote_all(self._get_decimals, [(mint,) for mint in mints])))
+        quotes = []
+        for request, result in zip(requests, quote_all(self._get_swap_quote, requests)):
+            quote = {"input_mint": input_mint, "output_mint": request[1], "input_amount": request[2]}
+            decimals_result = decimals_by_mint[request[1]]
+            if "error" in result:
+                quote["error"] = result["error"]
+            elif "error" in decimals_result:
+                quote["error"] = f"Could not get decimals for {request[1]}: {decimals_result['error']}"
+            else:
+                decimals = decimals_result["quote"]
+                data = result["quote"]
+                quote.update(
+                    amount_out=int(data["outAmount"]) / 10**decimals,
+                    min_amount_out=int(data["otherAmountThreshold"]) / 10**decimals,
+                    price_impact_pct=data.get("priceImpactPct"),
+                )
+            quotes.append(quote)
+        return quotes
+
+    def _get_swap_quote(
+        self, input_mint: str, output_mint: str, input_amount: float, slippage_bps: int
+    ) -> Dict[str, Any]:
+        """Get a Jupiter quote, reusing one for the same swap from the last few seconds"""
+        return self._quote_cache.get_or_fetch(
+            (input_mint, output_mint, input_amount, slippage_bps),
+            lambda: TradeManager.quote(
+                input_mint,
+                output_mint,
+                int(input_amount * 10 ** self._get_decimals(input_mint)),
+                slippage_bps,
+            ),
+        )
+
+    def _get_decimals(self, mint: str) -> int:
+        return self._run(self._get_decimals_async(mint))
+
+    @on_connection_loop
+    async def _get_decimals_async(self, mint: str) -> int:
+        return await TradeManager.get_decimals(
+            self._get_connection_async(), self._get_wallet(), mint
+        )
+
+    @on_connection_loop
+    async def get_tps_async(self) -> int:
+        return await SolanaPerformanceTracker.fetch_current_tps(self._get_connection_async())
 
     def get_token_by_ticker(self, ticker: str) -> str:
         ticker = ticker.upper()
@@ -428,3 +576,19 @@ class SolanaConnection(BaseConnection):
         method_name = action_name.replace("-", "_")
         method = getattr(self, method_name)
         return method(**kwargs)
+
+    async def perform_action_async(self, action_name: str, kwargs) -> Any:
+        """Execute a Solana action with validation, awaiting async-native methods directly"""
+        if action_name not in self.actions:
+            raise KeyError(f"Unknown action: {action_name}")
+
+        action = self.actions[action_name]
+        errors = action.validate_params(kwargs)
+        if errors:
+            raise ValueError(f"Invalid parameters: {', '.join(errors)}")
+
+        method_name = action_name.replace("-", "_")
+        async_method = getattr(self, f"{method_name}_async", None)
+        if async_method is not None:
+            return await async_method(**kwargs)
+        return await asyncio.to_thread(getattr(self, method_name), **kwargs)
@@ -1,14 +1,18 @@
 import logging
 import os
-import requests
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv, set_key
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
 from src.constants.abi import ERC20_ABI
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, comma_list
 from src.constants.networks import SONIC_NETWORKS
+from src.helpers.http import get_session
+from src.helpers.evm.transactions import get_transaction_pipeline
+from src.helpers.evm.multicall import get_portfolio
+from src.helpers.token_cache import get_token_cache
+from src.helpers.quotes import QuoteCache, quote_all, summarize_kyber_route
 
 logger = logging.getLogger("connections.sonic_connection")
 
@@ -35,11 +39,27 @@ class SonicConnection(BaseConnection):
         self.ERC20_ABI = ERC20_ABI
         self.NATIVE_TOKEN = "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
         self.aggregator_api = "https://aggregator-api.kyberswap.com/sonic/api/v1"
+        self._quote_cache = QuoteCache()
 
     def _get_explorer_link(self, tx_hash: str) -> str:
         """Generate block explorer link for transaction"""
         return f"{self.explorer}/tx/{tx_hash}"
 
+    def _get_decimals(self, token_address: str) -> int:
+        """ERC-20 decimals, read from the chain once per token and cached"""
+        return get_token_cache().get_decimals(
+            self.chain_id,
+            token_address,
+            lambda: self._web3.eth.contract(
+                address=Web3.to_checksum_address(token_address),
+                abi=ERC20_ABI
+            ).functions.decimals().call()
+        )
+
+    def _get_pipeline(self, account):
+        """Get the nonce-managed transaction pipeline for this account"""
+        return get_transaction_pipeline(self._web3, account, self.chain_id or self._web3.eth.chain_id)
+
     def _initialize_web3(self):
         """Initialize Web3 connection"""
         if not self._web3:
@@ -69,8 +89,17 @@ class SonicConnection(BaseConnection):
         try:
             if ticker.lower() in ["s", "S"]:
                 return "0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE"
-                
-            response = requests.get(
+
+            return get_token_cache().get_address(self.chain_id, ticker, lambda: self._get_token_address(ticker))
+
+        except Exception as error:
+            logger.error(f"Error fetching token address: {str(error)}")
+            return None
+
+    def _get_token_address(self, ticker: str) -> Optional[str]:
+        """Look up a token address by ticker on DexScreener"""
+        try:
+            response = get_session().get(
                 f"https://api.dexscreener.com/latest/dex/search?q={ticker}"
             )
             response.raise_for_status()
@@ -115,6 +144,23 @@ class SonicConnection(BaseConnection):
                 ],
                 description="Get $S or token balance"
             ),
+            "get-portfolio": Action(
+                name="get-portfolio",
+                parameters=[
+                    ActionParameter("addresses", False, comma_list, "Comma-separated addresses (optional, your wallet if not provided)"),
+                    ActionParameter("tokens", False, comma_list, "Comma-separated token addresses or tickers")
+                ],
+                description="Get $S and token balances for one or more addresses in one batched call"
+            ),
+            "quote-swap": Action(
+                name="quote-swap",
+                parameters=[
+                    ActionParameter("token_in", True, str, "Input token address"),
+                    ActionParameter("token_out", True, comma_list, "Comma-separated output token addresses"),
+                    ActionParameter("amounts", True, comma_list, "Comma-separated input amounts to quote")
+                ],
+                description="Quote swaps for several amounts or output tokens at once without executing them"
+            ),
             "transfer": Action(
                 name="transfer",
                 parameters=[
@@ -200,7 +246,7 @@ class SonicConnection(BaseConnection):
                     abi=self.ERC20_ABI
                 )
                 balance = contract.functions.balanceOf(address).call()
-                decimals = contract.functions.decimals().call()
+                decimals = self._get_decimals(token_address)
                 return balance / (10 ** decimals)
             else:
                 balance = self._web3.eth.get_balance(address)
@@ -210,11 +256,36 @@ class SonicConnection(BaseConnection):
             logger.error(f"Failed to get balance: {e}")
             raise
 
+    def get_portfolio(self, addresses: Optional[List[str]] = None, tokens: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get native and token balances for one or more addresses in a single batched read"""
+        try:
+            if not addresses:
+                private_key = os.getenv('SONIC_PRIVATE_KEY')
+                if not private_key:
+                    raise SonicConnectionError("No wallet configured")
+                account = self._web3.eth.account.from_key(private_key)
+                addresses = [account.address]
+
+            token_addresses = []
+            for token in tokens or []:
+                token_address = token if Web3.is_address(token) else self.get_token_by_ticker(token)
+                if not token_address or not Web3.is_address(token_address):
+                    raise ValueError(f"Unknown token: {token}")
+                if token_address.lower() != self.NATIVE_TOKEN.lower():
+                    token_addresses.append(token_address)
+
+            return get_portfolio(self._web3, addresses, token_addresses)
+
+        except Exception as e:
+            logger.error(f"Failed to get portfolio: {e}")
+            raise
+
     def transfer(self, to_address: str, amount: float, token_address: Optional[str] = None) -> str:
         """Transfer $S or tokens to an address"""
         try:
             private_key = os.getenv('SONIC_PRIVATE_KEY')
             account = self._web3.eth.account.from_key(private_key)
+            pipeline = self._get_pipeline(account)
             chain_id = self._web3.eth.chain_id
             
             if token_address:
@@ -222,7 +293,7 @@ class SonicConnection(BaseConnection):
                     address=Web3.to_checksum_address(token_address),
                     abi=self.ERC20_ABI
                 )
-                decimals = contract.functions.decimals().call()
+                decimals = self._get_decimals(token_address)
                 amount_raw = int(amount * (10 ** decimals))
                 
                 tx = contract.functions.transfer(
@@ -230,22 +301,20 @@ class SonicConnection(BaseConnection):
                     amount_raw
                 ).build_transaction({
                     'from': account.address,
-                    'nonce': self._web3.eth.get_transaction_count(account.address),
-                    'gasPrice': self._web3.eth.gas_price,
+                    'gasPrice': pipeline.gas_price(),
                     'chainId': chain_id
                 })
             else:
                 tx = {
-                    'nonce': self._web3.eth.get_transaction_count(account.address),
                     'to': Web3.to_checksum_address(to_address),
                     'value': self._web3.to_wei(amount, 'ether'),
                     'gas': 21000,
-                    'gasPrice': self._web3.eth.gas_price,
+                    'gasPrice': pipeline.gas_price(),
                     'chainId': chain_id
                 }
 
-            signed = account.sign_transaction(tx)
-            tx_hash = self._web3.eth.send_raw_transaction(signed.rawTransaction)
+            # Nonce is assigned by the pipeline; the receipt is tracked in the background
+            tx_hash = pipeline.send(tx, label="Transfer")
 
             # Log and return explorer link immediately
             tx_link = self._get_explorer_link(tx_hash.hex())
@@ -256,6 +325,28 @@ class SonicConnection(BaseConnection):
             raise
 
     def _get_swap_route(self, token_in: str, token_out: str, amount_in: float) -> Dict:
+        """Get the best swap route, reusing a quote for the same swap from the last few seconds"""
+        return self._quote_cache.get_or_fetch(
+            (token_in.lower(), token_out.lower(), float(amount_in)),
+            lambda: self._fetch_swap_route(token_in, token_out, amount_in)
+        )
+
+    def quote_swap(self, token_in: str, token_out: List[str], amounts: List[str]) -> List[Dict[str, Any]]:
+        """Quote every output token and amount concurrently without executing anything"""
+        requests = [(token_in, out, float(amount)) for out in token_out for amount in amounts]
+        quotes = []
+        for request, result in zip(requests, quote_all(self._get_swap_route, requests)):
+            quote = {"token_in": token_in, "token_out": request[1], "amount_in": request[2]}
+            if "error" in result:
+                quote["error"] = result["error"]
+            else:
+                out = request[1]
+                decimals = 18 if out.lower() == self.NATIVE_TOKEN.lower() else self._get_decimals(out)
+                quote.update(summarize_kyber_route(result["quote"], decimals))
+            quotes.append(quote)
+        return quotes
+
+    def _fetch_swap_route(self, token_in: str, token_out: str, amount_in: float) -> Dict:
         """Get the best swap route from Kyberswap API"""
         try:
             # Handle native token address
@@ -264,11 +355,7 @@ class SonicConnection(BaseConnection):
             if token_in.lower() == self.NATIVE_TOKEN.lower():
                 amount_raw = self._web3.to_wei(amount_in, 'ether')
             else:
-                token_contract = self._web3.eth.contract(
-                    address=Web3.to_checksum_address(token_in),
-                    abi=self.ERC20_ABI
-                )
-                decimals = token_contract.functions.decimals().call()
+                decimals = self._get_decimals(token_in)
                 amount_raw = int(amount_in * (10 ** decimals))
             
             # Set up API request
@@ -281,7 +368,7 @@ class SonicConnection(BaseConnection):
                 "gasInclude": "true"
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = get_session().get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -312,7 +399,7 @@ class SonicConnection(BaseConnection):
                 "source": "ZerePyBot"
             }
             
-            response = requests.post(url, headers=headers, json=payload)
+            response = get_session().post(url, headers=headers, json=payload)
             response.raise_for_status()
             
             data = response.json()
@@ -348,18 +435,14 @@ class SonicConnection(BaseConnection):
                     amount
                 ).build_transaction({
                     'from': account.address,
-                    'nonce': self._web3.eth.get_transaction_count(account.address),
-                    'gasPrice': self._web3.eth.gas_price,
+                    'gasPrice': self._get_pipeline(account).gas_price(),
                     'chainId': self._web3.eth.chain_id
                 })
                 
-                signed_approve = account.sign_transaction(approve_tx)
-                tx_hash = self._web3.eth.send_raw_transaction(signed_approve.rawTransaction)
+                # Not waited on: the swap takes the next nonce, so it can only be mined after the approval
+                tx_hash = self._get_pipeline(account).send(approve_tx, label="Approval")
                 logger.info(f"Approval transaction sent: {self._get_explorer_link(tx_hash.hex())}")
                 
-                # Wait for approval to be mined
-                self._web3.eth.wait_for_transaction_receipt(tx_hash)
-                
         except Exception as e:
             logger.error(f"Approval failed: {e}")
             raise
@@ -393,11 +476,7 @@ class SonicConnection(BaseConnection):
                 if token_in.lower() == "0x039e2fb66102314ce7b64ce5ce3e5183bc94ad38".lower():  # $S token
                     amount_raw = self._web3.to_wei(amount, 'ether')
                 else:
-                    token_contract = self._web3.eth.contract(
-                        address=Web3.to_checksum_address(token_in),
-                        abi=self.ERC20_ABI
-                    )
-                    decimals = token_contract.functions.decimals().call()
+                    decimals = self._get_decimals(token_in)
                     amount_raw = int(amount * (10 ** decimals))
                 self._handle_token_approval(token_in, router_address, amount_raw)
             
@@ -406,13 +485,12 @@ class SonicConnection(BaseConnection):
                 'from': account.address,
                 'to': Web3.to_checksum_address(router_address),
                 'data': encoded_data,
-                'nonce': self._web3.eth.get_transaction_count(account.address),
-                'gasPrice': self._web3.eth.gas_price,
+                'gasPrice': self._get_pipeline(account).gas_price(),
                 'chainId': self._web3.eth.chain_id,
                 'value': self._web3.to_wei(amount, 'ether') if token_in.lower() == self.NATIVE_TOKEN.lower() else 0
             }
             
-            # Estimate gas
+            # Estimate gas (fails while an approval sent just before is still pending)
             try:
                 tx['gas'] = self._web3.eth.estimate_gas(tx)
             except Exception as e:
@@ -420,8 +498,7 @@ class SonicConnection(BaseConnection):
                 tx['gas'] = 500000  # Default gas limit
             
             # Sign and send transaction
-            signed_tx = account.sign_transaction(tx)
-            tx_hash = self._web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = self._get_pipeline(account).send(tx, label="Swap")
             
             # Log and return explorer link immediately
             tx_link = self._get_explorer_link(tx_hash.hex())
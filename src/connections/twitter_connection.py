@@ -3,12 +3,18 @@ import logging
 from typing import Dict, Any, List, Tuple, Iterator
 from requests_oauthlib import OAuth1Session
 from dotenv import set_key, load_dotenv
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, flag
 from src.helpers import print_h_bar
-import json,requests
+import json
+from src.helpers.checkpoints import get_cursor_store
+from src.helpers.http import HTTP_CONNECT_TIMEOUT, get_session
+from src.helpers.rate_limit import RateLimited, endpoint_key, get_rate_limit_governor
 
 logger = logging.getLogger("connections.twitter_connection")
 
+# Pages followed back to the last seen tweet when reading only new tweets
+MAX_BACKFILL_PAGES = 5
+
 class TwitterConnectionError(Exception):
     """Base exception for Twitter connection errors"""
     pass
@@ -53,7 +59,8 @@ class TwitterConnection(BaseConnection):
                 name="get-latest-tweets",
                 parameters=[
                     ActionParameter("username", True, str, "Twitter username to get tweets from"),
-                    ActionParameter("count", False, int, "Number of tweets to retrieve")
+                    ActionParameter("count", False, int, "Number of tweets to retrieve"),
+                    ActionParameter("new_only", False, flag, "Only tweets newer than the last read, defaults to true")
                 ],
                 description="Get the latest tweets from a user"
             ),
@@ -67,7 +74,8 @@ class TwitterConnection(BaseConnection):
             "read-timeline": Action(
                 name="read-timeline",
                 parameters=[
-                    ActionParameter("count", False, int, "Number of tweets to read from timeline")
+                    ActionParameter("count", False, int, "Number of tweets to read from timeline"),
+                    ActionParameter("new_only", False, flag, "Only tweets newer than the last read, defaults to true")
                 ],
                 description="Read tweets from user's timeline"
             ),
@@ -147,13 +155,22 @@ class TwitterConnection(BaseConnection):
 
         Returns:
             Dict containing the API response (or raw response if stream=True)
+
+        Raises:
+            RateLimited: If the endpoint's rate limit is used up, without making the request
         """
         logger.debug(f"Making {method.upper()} request to {endpoint}")
+        governor = get_rate_limit_governor()
+        bucket = endpoint_key(method, endpoint)
         try:
+            governor.acquire("twitter", bucket)
             full_url = f"https://api.twitter.com/2/{endpoint.lstrip('/')}"
 
             if use_bearer:
-                response = requests.request(
+                if stream:
+                    # The filtered stream stays open indefinitely, only bound the connect
+                    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, None))
+                response = get_session().request(
                     method=method.lower(),
                     url=full_url,
                     auth=self._bearer_oauth,
@@ -164,6 +181,7 @@ class TwitterConnection(BaseConnection):
                 oauth = self._get_oauth()
                 response = getattr(oauth, method.lower())(full_url, **kwargs)
 
+            governor.check_response("twitter", bucket, response)
             if not stream and response.status_code not in [200, 201]:
                 logger.error(
                     f"Request failed: {response.status_code} - {response.text}"
@@ -179,6 +197,8 @@ class TwitterConnection(BaseConnection):
         
             return response.json()
 
+        except RateLimited:
+            raise
         except Exception as e:
             raise TwitterAPIError(f"API request failed: {str(e)}")
 
@@ -393,8 +413,44 @@ class TwitterConnection(BaseConnection):
         method = getattr(self, method_name)
         return method(**kwargs)
 
-    def read_timeline(self, count: int = None, **kwargs) -> list:
-        """Read tweets from the user's timeline"""
+    def _read_since(self, cursor_key: str, endpoint: str, params: dict, new_only: bool,
+                    page_param: str = "pagination_token") -> dict:
+        """
+        GET a tweet list endpoint, passing the newest tweet id seen last time as since_id
+        so only newer tweets come back, and record the new newest id
+
+        When more new tweets are waiting than fit in one page, pages are followed back
+        to since_id (up to MAX_BACKFILL_PAGES) and merged, so the cursor never moves
+        past tweets that weren't returned.
+        """
+        cursors = get_cursor_store()
+        since_id = cursors.get(cursor_key) if new_only else None
+        if since_id:
+            params = dict(params, since_id=since_id)
+
+        response = self._make_request('get', endpoint, params=params)
+        pages = 1
+        next_token = response.get("meta", {}).get("next_token")
+        while since_id and next_token:
+            if pages >= MAX_BACKFILL_PAGES:
+                logger.warning(
+                    f"More than {MAX_BACKFILL_PAGES} pages of new tweets for {cursor_key}, older ones are skipped"
+                )
+                break
+            page = self._make_request('get', endpoint, params=dict(params, **{page_param: next_token}))
+            pages += 1
+            next_token = page.get("meta", {}).get("next_token")
+            response.setdefault("data", []).extend(page.get("data", []))
+            for name, items in page.get("includes", {}).items():
+                response.setdefault("includes", {}).setdefault(name, []).extend(items)
+
+        newest_id = response.get("meta", {}).get("newest_id")
+        if newest_id and (since_id is None or int(newest_id) > int(since_id)):
+            cursors.set(cursor_key, newest_id)
+        return response
+
+    def read_timeline(self, count: int = None, new_only: bool = True, **kwargs) -> list:
+        """Read tweets from the user's timeline, by default only those posted since the last read"""
         if count is None:
             count = self.config["timeline_read_count"]
             
@@ -408,10 +464,11 @@ class TwitterConnection(BaseConnection):
             "max_results": count
         }
 
-        response = self._make_request(
-            'get',
+        response = self._read_since(
+            f"twitter:timeline:{credentials['TWITTER_USER_ID']}",
             f"users/{credentials['TWITTER_USER_ID']}/timelines/reverse_chronological",
-            params=params
+            params,
+            new_only
         )
 
         tweets = response.get("data", [])
@@ -442,8 +499,9 @@ class TwitterConnection(BaseConnection):
     def get_latest_tweets(self,
                           username: str,
                           count: int = 10,
+                          new_only: bool = True,
                           **kwargs) -> list:
-        """Get latest tweets for a user"""
+        """Get latest tweets for a user, by default only those posted since the last read"""
         logger.debug(f"Getting latest tweets for {username}, count: {count}")
 
         credentials = self._get_credentials()
@@ -453,9 +511,9 @@ class TwitterConnection(BaseConnection):
             "query": f"from:{username} -is:retweet -is:reply"
         }
 
-        response = self._make_request('get',
-                                      f"tweets/search/recent",
-                                      params=params)
+        response = self._read_since(
+            f"twitter:latest:{username.lower()}", "tweets/search/recent", params, new_only, page_param="next_token"
+        )
 
         tweets = response.get("data", [])
         logger.debug(f"Retrieved {len(tweets)} tweets")
@@ -551,21 +609,42 @@ class TwitterConnection(BaseConnection):
     def stream_tweets(self, filter_string:str,**kwargs) ->Iterator[Dict[str, Any]]:
         """Stream tweets. Requires Twitter Premium Plan and Bearer Token"""
         rules = self._get_rules()
-        self._delete_rules(rules)
-        self._build_rule(filter_string)
+        # Reconnects keep the existing rule rather than deleting and re-adding it
+        if [rule["value"] for rule in rules.get("data", [])] != [filter_string]:
+            self._delete_rules(rules)
+            self._build_rule(filter_string)
         logger.info("Starting Twitter stream")
+        params = {
+            "tweet.fields": "created_at,author_id,conversation_id",
+            "expansions": "author_id",
+            "user.fields": "name,username"
+        }
         try:
             response = self._make_request('get', 'tweets/search/stream', 
-                                        use_bearer=True, stream=True)
+                                        use_bearer=True, stream=True, params=params)
             
             if response.status_code != 200:
                 raise TwitterAPIError(f"Stream connection failed with status {response.status_code}: {response.text}")
                 
             for line in response.iter_lines():
                 if line:
-                    tweet_data = json.loads(line)['data']
+                    message = json.loads(line)
+                    if "data" not in message:
+                        # Operational messages, e.g. a disconnect notice
+                        logger.warning(f"Stream message: {message.get('errors', message)}")
+                        continue
+                    tweet_data = message['data']
+                    users = message.get("includes", {}).get("users", [])
+                    author = next((user for user in users if user["id"] == tweet_data.get("author_id")), None)
+                    if author:
+                        tweet_data.update({
+                            'author_name': author['name'],
+                            'author_username': author['username']
+                        })
                     yield tweet_data
                 
+        except RateLimited:
+            raise
         except Exception as e:
             logger.error(f"Error streaming tweets: {str(e)}")
             raise TwitterAPIError(f"Error streaming tweets: {str(e)}")
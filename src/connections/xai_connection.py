@@ -3,7 +3,7 @@ import os
 from typing import Dict, Any
 from openai import OpenAI
 from dotenv import set_key, load_dotenv
-from src.connections.base_connection import BaseConnection, Action, ActionParameter
+from src.connections.base_connection import BaseConnection, Action, ActionParameter, prompt_batch, system_prompt_text
 
 logger = logging.getLogger("connections.XAI_connection")
 
@@ -48,11 +48,20 @@ class XAIConnection(BaseConnection):
                 name="generate-text",
                 parameters=[
                     ActionParameter("prompt", True, str, "The input prompt for text generation"),
-                    ActionParameter("system_prompt", False, str, "System prompt to guide the model"),
+                    ActionParameter("system_prompt", False, system_prompt_text, "System prompt to guide the model"),
                     ActionParameter("model", False, str, "Model to use for generation")
                 ],
                 description="Generate text using XAI models"
             ),
+            "generate-batch": Action(
+                name="generate-batch",
+                parameters=[
+                    ActionParameter("prompts", True, prompt_batch, "List of prompts or [prompt, system_prompt] pairs"),
+                    ActionParameter("system_prompt", False, system_prompt_text, "System prompt for prompts that don't carry their own"),
+                    ActionParameter("model", False, str, "Model to use for generation")
+                ],
+                description="Generate text for several prompts concurrently using XAI models"
+            ),
             "check-model": Action(
                 name="check-model",
                 parameters=[
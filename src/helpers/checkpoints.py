@@ -0,0 +1,102 @@
+"""
+Small persisted key-value stores for read positions
+
+CheckpointStore keeps the last processed position of a reader (a block
+number, a since_id, a message id, a timestamp) in a JSON file written
+atomically, so a restarted agent resumes where it stopped instead of
+re-reading what it already saw.
+
+Cursors of the social readers live in one file shared by every agent in the
+process. Pooled connections serve several agents, so ConnectionManager runs
+each action inside cursor_scope(agent name) and get_cursor_store() prefixes
+keys with it, keeping one agent's reads from moving another's cursor.
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+logger = logging.getLogger("helpers.checkpoints")
+
+DEFAULT_CURSOR_PATH = Path.home() / ".zerepy" / "cursors.json"
+
+
+class CheckpointStore:
+    """Last processed position per reader, persisted as JSON"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._checkpoints: Dict[str, Any] = {}
+        if self.path and self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self._checkpoints = json.load(f)
+            except Exception as e:
+                logger.warning(f"Could not load checkpoints from {self.path}: {e}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._checkpoints.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._checkpoints[key] = value
+            if not self.path:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(".tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump(self._checkpoints, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.warning(f"Could not save checkpoints to {self.path}: {e}")
+
+
+class ScopedCheckpoints:
+    """View of a CheckpointStore with every key prefixed by a scope"""
+
+    def __init__(self, store: CheckpointStore, scope: str):
+        self.store = store
+        self.scope = scope
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.store.get(f"{self.scope}:{key}", default)
+
+    def set(self, key: str, value: Any) -> None:
+        self.store.set(f"{self.scope}:{key}", value)
+
+
+_cursors: Optional[CheckpointStore] = None
+_cursors_lock = threading.Lock()
+_cursor_scope: ContextVar[Optional[str]] = ContextVar("cursor_scope", default=None)
+
+
+@contextmanager
+def cursor_scope(scope: Optional[str]) -> Iterator[None]:
+    """Scope the cursors read and written by get_cursor_store() callers to `scope`, usually an agent name"""
+    token = _cursor_scope.set(scope)
+    try:
+        yield
+    finally:
+        _cursor_scope.reset(token)
+
+
+def get_cursor_store() -> Union[CheckpointStore, ScopedCheckpoints]:
+    """
+    Process-wide high-water marks for the social readers (Twitter since_id,
+    Discord last message id, Farcaster last cast time), persisted to
+    ZEREPY_CURSOR_PATH (default ~/.zerepy/cursors.json) and scoped to the
+    current cursor_scope
+    """
+    global _cursors
+    with _cursors_lock:
+        if _cursors is None:
+            _cursors = CheckpointStore(os.getenv("ZEREPY_CURSOR_PATH") or DEFAULT_CURSOR_PATH)
+    scope = _cursor_scope.get()
+    return ScopedCheckpoints(_cursors, scope) if scope else _cursors
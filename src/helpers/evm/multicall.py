@@ -0,0 +1,157 @@
+"""
+Batched balance reads for the EVM-family connections
+
+Native balances, ERC-20 balances, decimals and symbols for any number of
+addresses and tokens are read with Multicall3 `aggregate3`, one eth_call per
+MULTICALL_BATCH_SIZE reads. Chains without Multicall3 fall back to one call
+per read.
+"""
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from web3 import Web3
+
+from src.constants.abi import ERC20_ABI, MULTICALL3_ABI, MULTICALL3_ADDRESS
+from src.helpers.token_cache import get_token_cache
+
+logger = logging.getLogger("helpers.evm.multicall")
+
+MULTICALL_BATCH_SIZE = 500
+
+# chain id -> whether Multicall3 is deployed there
+_multicall_available: Dict[int, bool] = {}
+_multicall_lock = threading.Lock()
+
+
+def has_multicall(web3) -> bool:
+    chain_id = web3.eth.chain_id
+    with _multicall_lock:
+        if chain_id not in _multicall_available:
+            try:
+                _multicall_available[chain_id] = len(web3.eth.get_code(MULTICALL3_ADDRESS)) > 0
+            except Exception as e:
+                logger.warning(f"Could not check for Multicall3 on chain {chain_id}: {e}")
+                return False
+        return _multicall_available[chain_id]
+
+
+def _decode_symbol(web3, data: bytes) -> Optional[str]:
+    try:
+        return web3.codec.decode(["string"], data)[0]
+    except Exception:
+        # Some older tokens (e.g. MKR) return bytes32
+        try:
+            return web3.codec.decode(["bytes32"], data)[0].rstrip(b"\x00").decode("utf-8")
+        except Exception:
+            return None
+
+
+def _decode_uint(web3, data: bytes) -> Optional[int]:
+    try:
+        return web3.codec.decode(["uint256"], data)[0]
+    except Exception:
+        return None
+
+
+def _aggregate(web3, calls: List[Tuple[str, bytes]]) -> List[Optional[bytes]]:
+    """Run (target, calldata) calls through aggregate3; failed calls come back as None"""
+    multicall = web3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    results: List[Optional[bytes]] = []
+    for start in range(0, len(calls), MULTICALL_BATCH_SIZE):
+        batch = [(target, True, data) for target, data in calls[start:start + MULTICALL_BATCH_SIZE]]
+        for success, data in multicall.functions.aggregate3(batch).call():
+            results.append(data if success and data else None)
+    return results
+
+
+def _call_each(web3, calls: List[Tuple[str, bytes]]) -> List[Optional[bytes]]:
+    """Sequential fallback for chains without Multicall3"""
+    results: List[Optional[bytes]] = []
+    for target, data in calls:
+        try:
+            results.append(bytes(web3.eth.call({"to": target, "data": data})) or None)
+        except Exception:
+            results.append(None)
+    return results
+
+
+def get_portfolio(web3, addresses: List[str], token_addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Read native and token balances for every address, plus each token's decimals and symbol
+
+    Returns {address: {"native": float, "tokens": {token: {"symbol", "decimals", "balance"}}}}
+    with None for any value that could not be read.
+    """
+    addresses = [Web3.to_checksum_address(address) for address in addresses]
+    tokens = [Web3.to_checksum_address(token) for token in token_addresses]
+    erc20 = web3.eth.contract(abi=ERC20_ABI)
+    multicall = web3.eth.contract(abi=MULTICALL3_ABI)
+    use_multicall = has_multicall(web3)
+    chain_id = web3.eth.chain_id
+    cache = get_token_cache()
+
+    # Decimals and symbols already in the token cache are not read again
+    metadata = {}
+    for token in tokens:
+        cached = cache.get_token(chain_id, token)
+        if cached and cached.get("symbol") is not None and cached.get("decimals") is not None:
+            metadata[token] = {"symbol": cached["symbol"], "decimals": cached["decimals"]}
+    unknown = [token for token in tokens if token not in metadata]
+
+    calls: List[Tuple[str, bytes]] = []
+    for token in unknown:
+        calls.append((token, erc20.encodeABI(fn_name="decimals")))
+        calls.append((token, erc20.encodeABI(fn_name="symbol")))
+    for address in addresses:
+        if use_multicall:
+            calls.append((MULTICALL3_ADDRESS, multicall.encodeABI(fn_name="getEthBalance", args=[address])))
+        for token in tokens:
+            calls.append((token, erc20.encodeABI(fn_name="balanceOf", args=[address])))
+
+    if use_multicall:
+        try:
+            results = _aggregate(web3, calls)
+        except Exception as e:
+            logger.warning(f"Multicall failed, reading balances one by one: {e}")
+            use_multicall = False
+    if not use_multicall:
+        # getEthBalance only exists on Multicall3; native balances are read with eth_getBalance below
+        calls = [call for call in calls if call[0] != MULTICALL3_ADDRESS]
+        results = _call_each(web3, calls)
+
+    results = iter(results)
+    for token in unknown:
+        decimals = next(results)
+        symbol = next(results)
+        metadata[token] = {
+            "symbol": _decode_symbol(web3, symbol) if symbol else None,
+            "decimals": _decode_uint(web3, decimals) if decimals else None
+        }
+        cache.put_token(chain_id, token, save=False, **metadata[token])
+    if unknown:
+        cache.save()
+
+    portfolio = {}
+    for address in addresses:
+        if use_multicall:
+            native_raw = next(results)
+            native_raw = _decode_uint(web3, native_raw) if native_raw else None
+        else:
+            native_raw = web3.eth.get_balance(address)
+
+        balances = {}
+        for token in tokens:
+            raw = next(results)
+            raw = _decode_uint(web3, raw) if raw else None
+            decimals = metadata[token]["decimals"]
+            balances[token] = dict(
+                metadata[token],
+                balance=raw / (10 ** decimals) if raw is not None and decimals is not None else None
+            )
+
+        portfolio[address] = {
+            "native": float(web3.from_wei(native_raw, "ether")) if native_raw is not None else None,
+            "tokens": balances
+        }
+    return portfolio
@@ -0,0 +1,186 @@
+"""
+Nonce management and transaction sending for the EVM-family connections
+
+One TransactionPipeline is shared per (chain, account), so every connection
+writing from the same wallet draws nonces from the same counter. Transactions
+are signed and broadcast back-to-back; receipts are tracked on a background
+thread instead of blocking the caller.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("helpers.evm.transactions")
+
+GAS_PRICE_TTL = 10
+RECEIPT_POLL_INTERVAL = 2
+RECEIPT_TIMEOUT = 300
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces for one account without a round trip per transaction.
+
+    The counter starts from the node's pending transaction count and is
+    re-read from the node by `resync()` whenever a send fails or a tracked
+    transaction is dropped.
+    """
+
+    def __init__(self, web3, address: str):
+        self._web3 = web3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next: Optional[int] = None
+
+    def next(self) -> int:
+        with self._lock:
+            if self._next is None:
+                self._next = self._web3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def resync(self) -> None:
+        """Drop the local counter; the next nonce is read from the node again"""
+        with self._lock:
+            self._next = None
+
+
+class PendingTransaction:
+    def __init__(self, tx_hash, nonce: int, label: str):
+        self.tx_hash = tx_hash
+        self.nonce = nonce
+        self.label = label
+        self.sent_at = time.time()
+        self.receipt = None
+        self.done = threading.Event()
+
+
+class TransactionPipeline:
+    """Signs, broadcasts and tracks transactions for one account on one chain"""
+
+    def __init__(
+            self,
+            web3,
+            account,
+            receipt_timeout: float = RECEIPT_TIMEOUT,
+            poll_interval: float = RECEIPT_POLL_INTERVAL
+    ):
+        self._web3 = web3
+        self.account = account
+        self.nonces = NonceManager(web3, account.address)
+        self.receipt_timeout = receipt_timeout
+        self.poll_interval = poll_interval
+
+        self._send_lock = threading.Lock()
+        self._pending: Dict[str, PendingTransaction] = {}
+        self._pending_lock = threading.Lock()
+        self._tracker: Optional[threading.Thread] = None
+
+        self._gas_price: Optional[int] = None
+        self._gas_price_at = 0.0
+        self._gas_price_lock = threading.Lock()
+
+    def gas_price(self) -> int:
+        """Current gas price, re-read from the node at most every GAS_PRICE_TTL seconds"""
+        with self._gas_price_lock:
+            if self._gas_price is None or time.time() - self._gas_price_at > GAS_PRICE_TTL:
+                self._gas_price = self._web3.eth.gas_price
+                self._gas_price_at = time.time()
+            return self._gas_price
+
+    def send(self, tx: Dict[str, Any], label: str = "transaction"):
+        """Assign the next nonce, sign and broadcast `tx` without waiting for it to be mined"""
+        with self._send_lock:
+            nonce = self.nonces.next()
+            tx = dict(tx, nonce=nonce)
+            try:
+                signed = self.account.sign_transaction(tx)
+                tx_hash = self._web3.eth.send_raw_transaction(signed.rawTransaction)
+            except Exception:
+                self.nonces.resync()
+                raise
+
+        pending = PendingTransaction(tx_hash, nonce, label)
+        with self._pending_lock:
+            self._pending[tx_hash.hex()] = pending
+            self._ensure_tracker()
+        logger.debug(f"Sent {label} {tx_hash.hex()} with nonce {nonce}")
+        return tx_hash
+
+    def wait(self, tx_hash, timeout: Optional[float] = None):
+        """Block until a transaction sent through this pipeline is mined and return its receipt"""
+        key = tx_hash if isinstance(tx_hash, str) else tx_hash.hex()
+        with self._pending_lock:
+            pending = self._pending.get(key)
+        if pending is None:
+            return self._web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout or self.receipt_timeout)
+        if not pending.done.wait(timeout or self.receipt_timeout):
+            raise TimeoutError(f"Transaction {key} not mined after {timeout or self.receipt_timeout}s")
+        if pending.receipt is None:
+            raise TimeoutError(f"Transaction {key} was dropped before it was mined")
+        return pending.receipt
+
+    def pending_count(self) -> int:
+        with self._pending_lock:
+            return len(self._pending)
+
+    def _ensure_tracker(self) -> None:
+        if self._tracker is None or not self._tracker.is_alive():
+            self._tracker = threading.Thread(
+                target=self._track_receipts,
+                name=f"tx-tracker-{self.account.address[:10]}",
+                daemon=True
+            )
+            self._tracker.start()
+
+    def _track_receipts(self) -> None:
+        while True:
+            time.sleep(self.poll_interval)
+            with self._pending_lock:
+                if not self._pending:
+                    self._tracker = None
+                    return
+                pending = list(self._pending.items())
+
+            for key, tx in pending:
+                try:
+                    receipt = self._web3.eth.get_transaction_receipt(tx.tx_hash)
+                except Exception:
+                    # Not mined yet (TransactionNotFound) or a transient RPC error
+                    receipt = None
+
+                if receipt is not None:
+                    if receipt["status"] != 1:
+                        logger.error(f"❌ {tx.label} {key} reverted (nonce {tx.nonce})")
+                    else:
+                        logger.info(f"✅ {tx.label} {key} confirmed in block {receipt['blockNumber']}")
+                    self._finish(key, tx, receipt)
+                elif time.time() - tx.sent_at > self.receipt_timeout:
+                    logger.warning(
+                        f"{tx.label} {key} not mined after {self.receipt_timeout}s, resyncing nonce"
+                    )
+                    self.nonces.resync()
+                    self._finish(key, tx, None)
+
+    def _finish(self, key: str, tx: PendingTransaction, receipt) -> None:
+        tx.receipt = receipt
+        with self._pending_lock:
+            self._pending.pop(key, None)
+        tx.done.set()
+
+
+_pipelines: Dict[Tuple[int, str], TransactionPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_transaction_pipeline(web3, account, chain_id: int) -> TransactionPipeline:
+    """Get the pipeline shared by every connection sending from `account` on `chain_id`"""
+    key = (int(chain_id), account.address.lower())
+    with _pipelines_lock:
+        pipeline = _pipelines.get(key)
+        if pipeline is None:
+            pipeline = TransactionPipeline(web3, account)
+            _pipelines[key] = pipeline
+        return pipeline
@@ -0,0 +1,57 @@
+import logging
+import os
+import threading
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("helpers.http")
+
+# Pool sizing and timeouts, overridable from the environment
+HTTP_POOL_CONNECTIONS = int(os.getenv("ZEREPY_HTTP_POOL_CONNECTIONS", 16))  # hosts with a kept-alive pool
+HTTP_POOL_MAXSIZE = int(os.getenv("ZEREPY_HTTP_POOL_MAXSIZE", 16))  # kept-alive connections per host
+HTTP_CONNECT_TIMEOUT = float(os.getenv("ZEREPY_HTTP_CONNECT_TIMEOUT", 10))
+HTTP_READ_TIMEOUT = float(os.getenv("ZEREPY_HTTP_READ_TIMEOUT", 60))
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with sized keep-alive pools and a default timeout.
+
+    Reusing one session keeps TCP+TLS connections open between calls, so repeated
+    calls to the same API skip the handshake. Requests without an explicit timeout
+    get (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT) instead of waiting forever.
+    """
+
+    def __init__(
+            self,
+            pool_connections: int = HTTP_POOL_CONNECTIONS,
+            pool_maxsize: int = HTTP_POOL_MAXSIZE,
+            timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    ):
+        super().__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+_session: Optional[PooledSession] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    """Get the process-wide pooled session shared by all connections"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                logger.debug(
+                    f"Creating pooled HTTP session ({HTTP_POOL_CONNECTIONS} hosts, {HTTP_POOL_MAXSIZE} per host)"
+                )
+                _session = PooledSession()
+    return _session
@@ -0,0 +1,82 @@
+"""
+Swap quote cache and concurrent quoting for the trading connections
+
+Quotes from route aggregators (KyberSwap, 0x, Jupiter) are cached for a few
+seconds so a quote-swap followed by a swap, or several strategies quoting the
+same pair, cost one request. quote_all fetches many quotes at once instead of
+one after another.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger("helpers.quotes")
+
+QUOTE_TTL = 10
+DEFAULT_QUOTE_CONCURRENCY = 8
+
+
+class QuoteCache:
+    """Short-lived cache of aggregator quotes keyed by (token_in, token_out, amount, ...)"""
+
+    def __init__(self, ttl: float = QUOTE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._quotes: Dict[Hashable, Tuple[Any, float]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._quotes.get(key)
+            if entry and entry[1] > time.time():
+                return entry[0]
+        return None
+
+    def set(self, key: Hashable, quote: Any) -> None:
+        now = time.time()
+        with self._lock:
+            # Expired quotes are never read again, drop them as new ones come in
+            for stale in [k for k, (_, expires_at) in self._quotes.items() if expires_at <= now]:
+                del self._quotes[stale]
+            self._quotes[key] = (quote, now + self.ttl)
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        quote = self.get(key)
+        if quote is None:
+            quote = fetch()
+            self.set(key, quote)
+        return quote
+
+
+def quote_all(
+        fetch: Callable[..., Any],
+        requests: List[Tuple],
+        max_workers: int = DEFAULT_QUOTE_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """
+    Call fetch(*request) for every request concurrently
+
+    Returns one {"quote": ...} or {"error": ...} dict per request, in order.
+    """
+    def run(request):
+        try:
+            return {"quote": fetch(*request)}
+        except Exception as e:
+            return {"error": str(e)}
+
+    if not requests:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(requests)), thread_name_prefix="quote") as executor:
+        return list(executor.map(run, requests))
+
+
+def summarize_kyber_route(route_data: Dict[str, Any], decimals_out: int) -> Dict[str, Any]:
+    """The parts of a KyberSwap route a strategy compares: output amount, its USD value and gas cost"""
+    summary = route_data["routeSummary"]
+    return {
+        "amount_out": int(summary["amountOut"]) / (10 ** decimals_out),
+        "amount_out_usd": summary.get("amountOutUsd"),
+        "gas_usd": summary.get("gasUsd"),
+        "router": route_data.get("routerAddress")
+    }
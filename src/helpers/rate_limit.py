@@ -0,0 +1,208 @@
+"""
+Rate-limit governor shared by the social connections
+
+Twitter, Discord and Echochambers report each endpoint's budget in response
+headers (limit, remaining, reset). The governor keeps one bucket per platform
+endpoint from those headers and spends a token before every call. When a
+bucket is empty the call is not made: RateLimited is raised with the time the
+budget resets, so the agent can schedule the task for then instead of burning
+requests into 429s or blocking a thread while it waits.
+"""
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger("helpers.rate_limit")
+
+# Short waits (e.g. Discord's sub-second resets) are slept through rather than deferred
+MAX_INLINE_WAIT = 1.0
+# Used when a 429 carries no reset or Retry-After header
+DEFAULT_RETRY_AFTER = 60
+# Resets larger than this are epoch timestamps, smaller ones are seconds from now
+EPOCH_THRESHOLD = 1e9
+
+# Bucket applying to every endpoint of a platform, e.g. Discord's global limit
+GLOBAL_BUCKET = "*"
+# Suffix of the bucket for Twitter's per-user 24 hour caps (e.g. posts on the free tier)
+DAILY_SUFFIX = " (24h)"
+
+
+class RateLimited(Exception):
+    """Raised instead of making a call that would exceed its rate limit"""
+
+    def __init__(self, platform: str, endpoint: str, retry_at: float):
+        self.platform = platform
+        self.endpoint = endpoint
+        self.retry_at = retry_at
+        super().__init__(f"{platform} rate limit reached for {endpoint}, retry in {self.retry_after:.0f}s")
+
+    @property
+    def retry_after(self) -> float:
+        return max(self.retry_at - time.time(), 0)
+
+
+@dataclass
+class TokenBucket:
+    """Budget for one endpoint: `remaining` calls until `reset_at`, when it refills to `limit`"""
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_at: float = 0
+
+    def delay(self, now: float) -> float:
+        """Seconds until a call fits in this bucket"""
+        if self.remaining is None or self.remaining > 0 or now >= self.reset_at:
+            return 0
+        return self.reset_at - now
+
+    def take(self, now: float) -> None:
+        if self.reset_at and now >= self.reset_at:
+            # The window has rolled over since the last response
+            self.remaining = self.limit
+            self.reset_at = 0
+        if self.remaining is not None:
+            self.remaining = max(self.remaining - 1, 0)
+
+
+def _header(headers: Mapping[str, str], *names: str) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def _reset_time(value: Optional[str], now: float) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    return reset if reset > EPOCH_THRESHOLD else now + reset
+
+
+_ID_SEGMENT = re.compile(r"(?<=/)(\w+)/\d{5,}(?=/|$)")
+
+
+def endpoint_key(method: str, path: str, major_params: Tuple[str, ...] = ()) -> str:
+    """
+    Bucket key for a call, with ids in the path folded so e.g. every tweet's likes share one bucket
+
+    Ids following a segment in `major_params` are kept, for APIs like Discord's
+    that budget each channel or guild separately.
+    """
+    path = "/" + path.split("?", 1)[0].strip("/")
+    path = _ID_SEGMENT.sub(lambda m: m.group(0) if m.group(1) in major_params else f"{m.group(1)}/:id", path)
+    return f"{method.upper()} {path}"
+
+
+class RateLimitGovernor:
+    def __init__(self, max_inline_wait: float = MAX_INLINE_WAIT):
+        self.max_inline_wait = max_inline_wait
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def delay(self, platform: str, endpoint: str) -> float:
+        """Seconds until a call to the endpoint fits its budget, 0 if it can go now"""
+        now = time.time()
+        with self._lock:
+            keys = ((platform, GLOBAL_BUCKET), (platform, endpoint), (platform, endpoint + DAILY_SUFFIX))
+            return max((bucket.delay(now) for key in keys if (bucket := self._buckets.get(key))), default=0)
+
+    def acquire(self, platform: str, endpoint: str) -> None:
+        """Spend one call from the endpoint's budget, raising RateLimited if it is used up"""
+        delay = self.delay(platform, endpoint)
+        if delay > self.max_inline_wait:
+            raise RateLimited(platform, endpoint, time.time() + delay)
+        if delay > 0:
+            time.sleep(delay)
+
+        now = time.time()
+        with self._lock:
+            for key in ((platform, endpoint), (platform, endpoint + DAILY_SUFFIX)):
+                bucket = self._buckets.get(key)
+                if bucket:
+                    bucket.take(now)
+
+    def update(self, platform: str, endpoint: str, status_code: int, headers: Mapping[str, str]) -> None:
+        """
+        Record the budget reported in a response's headers
+
+        Understands X-RateLimit-Limit / -Remaining / -Reset (Twitter and Discord
+        use these, with Discord's Reset-After preferred when present),
+        Twitter's x-user-limit-24hour-* and Retry-After on a 429. Discord's
+        X-RateLimit-Global marks the whole platform as limited.
+        """
+        now = time.time()
+        daily_remaining = _header(headers, "x-user-limit-24hour-remaining")
+        if daily_remaining is not None:
+            daily_limit = _header(headers, "x-user-limit-24hour-limit")
+            with self._lock:
+                bucket = self._buckets.setdefault((platform, endpoint + DAILY_SUFFIX), TokenBucket())
+                bucket.limit = int(daily_limit) if daily_limit is not None else bucket.limit
+                bucket.remaining = int(daily_remaining)
+                bucket.reset_at = _reset_time(_header(headers, "x-user-limit-24hour-reset"), now) or bucket.reset_at
+            if status_code == 429 and int(daily_remaining) == 0:
+                logger.warning(f"{platform} daily limit hit on {endpoint}")
+                return
+
+        limit = _header(headers, "x-rate-limit-limit", "X-RateLimit-Limit")
+        remaining = _header(headers, "x-rate-limit-remaining", "X-RateLimit-Remaining")
+        reset_at = _reset_time(_header(headers, "X-RateLimit-Reset-After"), now) or \
+            _reset_time(_header(headers, "x-rate-limit-reset", "X-RateLimit-Reset"), now)
+
+        key = endpoint
+        if status_code == 429:
+            retry_at = _reset_time(_header(headers, "Retry-After"), now)
+            reset_at = max(filter(None, (reset_at, retry_at)), default=now + DEFAULT_RETRY_AFTER)
+            remaining = "0"
+            if _header(headers, "X-RateLimit-Global"):
+                key = GLOBAL_BUCKET
+            logger.warning(f"{platform} rate limit hit on {endpoint if key == endpoint else 'all endpoints'}, "
+                           f"resets in {reset_at - now:.0f}s")
+        elif remaining is None:
+            return
+
+        with self._lock:
+            bucket = self._buckets.setdefault((platform, key), TokenBucket())
+            if limit is not None:
+                bucket.limit = int(limit)
+            bucket.remaining = int(remaining)
+            if reset_at is not None:
+                bucket.reset_at = reset_at
+
+    def check_response(self, platform: str, endpoint: str, response) -> None:
+        """update() from a requests response, then raise RateLimited if it was a 429"""
+        self.update(platform, endpoint, response.status_code, response.headers)
+        if response.status_code == 429:
+            raise RateLimited(platform, endpoint, time.time() + self.delay(platform, endpoint))
+
+    def status(self, platform: Optional[str] = None) -> Dict[str, Dict[str, Optional[float]]]:
+        """Current budgets, for logging and debugging"""
+        now = time.time()
+        with self._lock:
+            return {
+                f"{p} {endpoint}": {
+                    "limit": bucket.limit,
+                    "remaining": bucket.remaining,
+                    "resets_in": max(bucket.reset_at - now, 0) if bucket.reset_at else None
+                }
+                for (p, endpoint), bucket in self._buckets.items()
+                if platform is None or p == platform
+            }
+
+
+_governor: Optional[RateLimitGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_rate_limit_governor() -> RateLimitGovernor:
+    """Process-wide governor, so agents sharing an account share its budget"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = RateLimitGovernor()
+        return _governor
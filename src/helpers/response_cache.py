@@ -0,0 +1,188 @@
+"""
+LLM response cache for the API servers
+
+Standard library only, so the single-file server images can ship it next to the server module.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger("helpers.response_cache")
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_TTL = 3600
+
+
+class ResponseCache:
+    """
+    LRU cache of generated responses with TTL expiry and a size bound in bytes.
+
+    Entries live in memory, least recently used first out once `max_bytes` is
+    exceeded. With a `path`, entries are also written to an SQLite file bounded
+    by `disk_max_bytes`, so they survive restarts and can be shared by several
+    server processes on one host; memory misses fall back to disk.
+    """
+
+    def __init__(
+            self,
+            max_bytes: int = DEFAULT_MAX_BYTES,
+            ttl: float = DEFAULT_TTL,
+            path: Optional[str] = None,
+            disk_max_bytes: int = DEFAULT_DISK_MAX_BYTES
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT, expires_at REAL, size INTEGER, last_used REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """Build the cache from ZEREPY_RESPONSE_CACHE* variables, or None when caching is not enabled"""
+        if os.getenv("ZEREPY_RESPONSE_CACHE", "false").lower() not in ("1", "true", "yes"):
+            return None
+        cache = cls(
+            max_bytes=int(os.getenv("ZEREPY_RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            ttl=float(os.getenv("ZEREPY_RESPONSE_CACHE_TTL", DEFAULT_TTL)),
+            path=os.getenv("ZEREPY_RESPONSE_CACHE_PATH") or None,
+            disk_max_bytes=int(os.getenv("ZEREPY_RESPONSE_CACHE_DISK_MAX_BYTES", DEFAULT_DISK_MAX_BYTES))
+        )
+        logger.info(f"Response cache enabled ({cache.max_bytes} bytes, ttl {cache.ttl}s)")
+        return cache
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Key for a request, e.g. make_key(model, system_prompt, prompt, temperature, max_tokens)"""
+        encoded = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, size = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                self._remove(key)
+                self._stats["expirations"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    self._store(key, row[0], row[1])
+                    self._stats["disk_hits"] += 1
+                    return row[0]
+                if row:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._stats["expirations"] += 1
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """Cache a response, evicting least recently used entries past the size bound"""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, expires_at, self._size(key, value), time.time())
+                )
+                self._evict_disk()
+                self._db.commit()
+
+    def stream_through(
+            self, key: str, chunks: Iterable[str], completed: Optional[Callable[[], bool]] = None
+    ) -> Iterator[str]:
+        """
+        Pass streamed chunks on and cache the full response once the stream completes
+
+        `completed` is checked after the last chunk; streams that report they were cut
+        off (e.g. closed before the provider's end marker) are not cached.
+        """
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        if parts and (completed is None or completed()):
+            self.set(key, "".join(parts))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+            if self._db is not None:
+                stats["disk_entries"], stats["disk_bytes"] = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    @staticmethod
+    def _size(key: str, value: str) -> int:
+        return len(key) + len(value.encode("utf-8"))
+
+    def _store(self, key: str, value: str, expires_at: float) -> None:
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict_disk(self) -> None:
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.disk_max_bytes:
+            return
+        excess = total - self.disk_max_bytes
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall()
+        doomed = []
+        for key, size in rows:
+            if excess <= 0:
+                break
+            doomed.append((key,))
+            excess -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._stats["evictions"] += len(doomed)
@@ -6,10 +6,11 @@ from solana.rpc.commitment import Confirmed
 
 from src.constants import LAMPORTS_PER_SOL
 from src.types import JupiterTokenData
+from src.helpers.http import get_session
+from src.helpers.token_cache import get_token_cache
 
 from solders.keypair import Keypair  # type: ignore
 from solders.pubkey import Pubkey  # type: ignore
-import requests
 
 from spl.token.async_client import AsyncToken
 from spl.token.instructions import get_associated_token_address
@@ -58,7 +59,7 @@ class SolanaReadHelper:
         url = f"https://api.jup.ag/price/v2?ids={token_address}"
 
         try:
-            with requests.get(url) as response:
+            with get_session().get(url) as response:
                 response.raise_for_status()
                 data = response.json()
                 price = data.get("data", {}).get(token_address, {}).get("price")
@@ -73,9 +74,17 @@ class SolanaReadHelper:
     @staticmethod
     def get_token_by_ticker(
         ticker: str,
+    ) -> str:
+        return get_token_cache().get_address(
+            "solana", ticker, lambda: SolanaReadHelper._fetch_token_by_ticker(ticker)
+        )
+
+    @staticmethod
+    def _fetch_token_by_ticker(
+        ticker: str,
     ) -> str:
         try:
-            response = requests.get(
+            response = get_session().get(
                 f"https://api.dexscreener.com/latest/dex/search?q={ticker}"
             )
             response.raise_for_status()
@@ -110,20 +119,24 @@ class SolanaReadHelper:
         address: str,
     ) -> str:
         try:
-            response = requests.get(
-                "https://tokens.jup.ag/tokens?tags=verified",
-                headers={"Content-Type": "application/json"},
-            )
-            response.raise_for_status()
-
-            data = response.json()
-            for token in data:
-                if token.get("address") == str(address):
-                    return JupiterTokenData(
-                        address=token.get("address"),
-                        symbol=token.get("symbol"),
-                        name=token.get("name"),
-                    )
+            cache = get_token_cache()
+            token = cache.get_token("solana", str(address))
+            if token is None and not cache.token_list_fresh("solana"):
+                # Index the whole verified list once instead of scanning it per lookup
+                response = get_session().get(
+                    "https://tokens.jup.ag/tokens?tags=verified",
+                    headers={"Content-Type": "application/json"},
+                )
+                response.raise_for_status()
+                cache.index_token_list("solana", response.json())
+                token = cache.get_token("solana", str(address))
+
+            if token and token.get("symbol"):
+                return JupiterTokenData(
+                    address=token.get("address"),
+                    symbol=token.get("symbol"),
+                    name=token.get("name"),
+                )
             return None
         except Exception as error:
             raise Exception(f"Error fetching token data: {str(error)}")
@@ -17,10 +17,55 @@ from spl.token.async_client import AsyncToken
 from spl.token.constants import TOKEN_PROGRAM_ID
 
 from src.constants import DEFAULT_OPTIONS
+from src.helpers.http import get_session
 from src.helpers.solana.transfer import SolanaTransferHelper
+from src.helpers.token_cache import get_token_cache
+
+JUPITER_QUOTE_URL = "https://quote-api.jup.ag/v6/quote"
 
 
 class TradeManager:
+    @staticmethod
+    async def get_decimals(async_client: AsyncClient, wallet: Keypair, mint: str) -> int:
+        """Decimals of an SPL mint, read from the chain once and cached"""
+        token = get_token_cache().get_token("solana", mint)
+        if token and token.get("decimals") is not None:
+            return token["decimals"]
+        spl_client = AsyncToken(
+            async_client, Pubkey.from_string(mint), TOKEN_PROGRAM_ID, wallet
+        )
+        decimals = (await spl_client.get_mint_info()).decimals
+        get_token_cache().put_token("solana", mint, decimals=decimals)
+        return decimals
+
+    @staticmethod
+    def quote(
+        input_mint: str,
+        output_mint: str,
+        amount: int,
+        slippage_bps: int,
+    ) -> dict:
+        """
+        Get a Jupiter route quote without building a transaction.
+
+        The Jupiter SDK's quote makes a blocking request inside a coroutine, so
+        this calls the quote API directly through the shared HTTP session and
+        can run from worker threads concurrently.
+        """
+        response = get_session().get(
+            JUPITER_QUOTE_URL,
+            params={
+                "inputMint": input_mint,
+                "outputMint": output_mint,
+                "amount": str(amount),
+                "slippageBps": slippage_bps,
+            },
+        )
+        data = response.json()
+        if "routePlan" not in data:
+            raise Exception(data.get("error", f"Quote failed with status {response.status_code}"))
+        return data
+
     @staticmethod
     async def trade(
         async_client: AsyncClient,
@@ -50,11 +95,7 @@ class TradeManager:
         # convert wallet.secret() from bytes to string
         input_mint = str(input_mint)
         output_mint = str(output_mint)
-        spl_client = AsyncToken(
-            async_client, Pubkey.from_string(input_mint), TOKEN_PROGRAM_ID, wallet
-        )
-        mint = await spl_client.get_mint_info()
-        decimals = mint.decimals
+        decimals = await TradeManager.get_decimals(async_client, wallet, input_mint)
         input_amount = int(input_amount * 10**decimals)
 
         try:
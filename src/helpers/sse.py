@@ -0,0 +1,25 @@
+import json
+import logging
+from typing import Iterable, Iterator
+
+logger = logging.getLogger("helpers.sse")
+
+# Keep proxies from caching or buffering the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_events(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Format streamed text chunks as server-sent events
+
+    Each chunk is sent as `data: {"text": ...}` and the stream ends with `data: [DONE]`.
+    The response status has already gone out by the time generation fails, so errors
+    are sent in-band as an `error` event.
+    """
+    try:
+        for chunk in chunks:
+            yield f"data: {json.dumps({'text': chunk})}\n\n"
+    except Exception as e:
+        logger.error(f"Error while streaming: {e}")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    yield "data: [DONE]\n\n"
@@ -0,0 +1,191 @@
+"""
+Token metadata cache shared by the chain connections
+
+Indexes token addresses by ticker and metadata (symbol, name, decimals) by
+address, per chain, so repeated lookups are local dictionary reads instead of
+DexScreener, Jupiter or RPC requests. Entries expire after a TTL and the index
+is snapshotted to ~/.zerepy/token_cache.json so it survives restarts.
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger("helpers.token_cache")
+
+# Ticker -> address mappings move (new pools, rugs); decimals and symbols never change
+TICKER_TTL = 6 * 3600
+METADATA_TTL = 30 * 24 * 3600
+DEFAULT_CACHE_PATH = Path.home() / ".zerepy" / "token_cache.json"
+# Changes are written at most this often; a full token list is written as soon as it is indexed
+SAVE_DELAY = 5
+
+
+class TokenMetadataCache:
+    def __init__(self, path: Optional[str] = None, ticker_ttl: float = TICKER_TTL, metadata_ttl: float = METADATA_TTL):
+        self.path = Path(path) if path else None
+        self.ticker_ttl = ticker_ttl
+        self.metadata_ttl = metadata_ttl
+        self._lock = threading.RLock()
+        # "chain:ticker" -> {"address", "expires_at"}
+        self._tickers: Dict[str, Dict[str, Any]] = {}
+        # "chain:address" -> {"symbol", "name", "decimals", "expires_at"}
+        self._tokens: Dict[str, Dict[str, Any]] = {}
+        # chain -> time a full token list was last indexed
+        self._lists: Dict[str, float] = {}
+        # Unsaved changes and the pending flush; _save_lock orders writes without holding up lookups
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(chain, value: str) -> str:
+        # EVM addresses are case-insensitive hex; Solana base58 addresses are not
+        value = str(value)
+        return f"{chain}:{value.lower() if value.startswith('0x') else value}"
+
+    def get_address(self, chain, ticker: str, fetch: Callable[[], Optional[str]]) -> Optional[str]:
+        """Address for a ticker on a chain, calling `fetch` only on a miss or expired entry"""
+        key = self._key(chain, ticker.lower())
+        with self._lock:
+            entry = self._tickers.get(key)
+            if entry and entry["expires_at"] > time.time():
+                return entry["address"]
+
+        address = fetch()
+        if address:
+            with self._lock:
+                self._tickers[key] = {"address": address, "expires_at": time.time() + self.ticker_ttl}
+            self._schedule_save()
+        return address
+
+    def get_token(self, chain, address: str) -> Optional[Dict[str, Any]]:
+        """Cached metadata for a token address, or None"""
+        with self._lock:
+            entry = self._tokens.get(self._key(chain, address))
+            if entry and entry["expires_at"] > time.time():
+                return dict(entry)
+        return None
+
+    def put_token(self, chain, address: str, save: bool = True, **metadata) -> None:
+        """Store or update metadata (symbol, name, decimals) for a token address"""
+        metadata = {name: value for name, value in metadata.items() if value is not None}
+        if not metadata:
+            return
+        key = self._key(chain, address)
+        with self._lock:
+            # Replaced rather than updated in place, so a snapshot being written never changes under it
+            self._tokens[key] = {
+                **self._tokens.get(key, {}), **metadata,
+                "address": address, "expires_at": time.time() + self.metadata_ttl
+            }
+            self._dirty = True
+        if save:
+            self._schedule_save()
+
+    def get_decimals(self, chain, address: str, fetch: Callable[[], int]) -> int:
+        """Decimals for a token address, calling `fetch` only the first time"""
+        entry = self.get_token(chain, address)
+        if entry and entry.get("decimals") is not None:
+            return entry["decimals"]
+        decimals = fetch()
+        self.put_token(chain, address, decimals=decimals)
+        return decimals
+
+    def index_token_list(self, chain, tokens: Iterable[Dict[str, Any]]) -> None:
+        """Index a full token list (e.g. Jupiter's verified tokens) by address in one pass"""
+        count = 0
+        for token in tokens:
+            if token.get("address"):
+                self.put_token(
+                    chain, token["address"], save=False,
+                    symbol=token.get("symbol"), name=token.get("name"), decimals=token.get("decimals")
+                )
+                count += 1
+        with self._lock:
+            self._lists[str(chain)] = time.time()
+            self._dirty = True
+        logger.debug(f"Indexed {count} tokens for {chain}")
+        self.save()
+
+    def token_list_fresh(self, chain) -> bool:
+        """Whether a full token list for `chain` was indexed within the ticker TTL"""
+        with self._lock:
+            return time.time() - self._lists.get(str(chain), 0) < self.ticker_ttl
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+            now = time.time()
+            self._tickers = {k: v for k, v in snapshot.get("tickers", {}).items() if v["expires_at"] > now}
+            self._tokens = {k: v for k, v in snapshot.get("tokens", {}).items() if v["expires_at"] > now}
+            self._lists = snapshot.get("lists", {})
+            logger.debug(f"Loaded {len(self._tokens)} tokens and {len(self._tickers)} tickers from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not load token cache from {self.path}: {e}")
+
+    def _schedule_save(self) -> None:
+        """Mark the cache changed and write it within SAVE_DELAY seconds"""
+        with self._lock:
+            self._dirty = True
+            if not self.path or self._flush_timer is not None:
+                return
+            self._flush_timer = threading.Timer(SAVE_DELAY, self.save)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def save(self) -> None:
+        """Write unsaved changes to disk now"""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty:
+                    return
+                # Entries are never mutated in place, so shallow copies are a consistent snapshot
+                snapshot = {"tickers": dict(self._tickers), "tokens": dict(self._tokens), "lists": dict(self._lists)}
+                self._dirty = False
+
+            tmp_path = None
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # A unique temporary file, so processes sharing the cache path never write the same one
+                with tempfile.NamedTemporaryFile(
+                        "w", dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".tmp", delete=False
+                ) as f:
+                    tmp_path = f.name
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.warning(f"Could not save token cache to {self.path}: {e}")
+                with self._lock:
+                    self._dirty = True
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+
+_cache: Optional[TokenMetadataCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenMetadataCache:
+    """Process-wide token cache, snapshotted to ZEREPY_TOKEN_CACHE_PATH (default ~/.zerepy/token_cache.json)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TokenMetadataCache(os.getenv("ZEREPY_TOKEN_CACHE_PATH") or DEFAULT_CACHE_PATH)
+            # Flush changes still waiting on the save timer
+            atexit.register(_cache.save)
+        return _cache
@@ -0,0 +1,114 @@
+"""
+Token counts for prompt budgeting
+
+Prompts bound for a provider whose tokenizer is available locally are counted
+with it: tiktoken for OpenAI models, when tiktoken is installed. Everything
+else is estimated at about four characters per token for English text, never
+less than one token per word, padded by ESTIMATE_SAFETY_MARGIN because real
+tokenizers often split code, URLs and non-English text much finer.
+"""
+import logging
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger("helpers.tokens")
+
+CHARS_PER_TOKEN = 4
+# Estimates are inflated by this factor so prompts budgeted with them stay inside real token limits
+ESTIMATE_SAFETY_MARGIN = 1.25
+
+# Providers whose models tiktoken encodes exactly
+TIKTOKEN_PROVIDERS = ("openai",)
+TIKTOKEN_DEFAULT_ENCODING = "o200k_base"
+
+T = TypeVar("T")
+
+
+class Tokenizer:
+    """A provider's own tokenizer, for exact counts and cuts instead of estimates"""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+
+    def encode(self, text: str) -> List[int]:
+        return self.encoding.encode(text, disallowed_special=())
+
+    def count(self, text: str) -> int:
+        return len(self.encode(text))
+
+    def truncate(self, text: str, budget: int) -> str:
+        return self.encoding.decode(self.encode(text)[:max(budget, 0)])
+
+
+_tokenizers: Dict[Tuple[str, Optional[str]], Optional[Tokenizer]] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(provider: Optional[str], model: Optional[str] = None) -> Optional[Tokenizer]:
+    """The tokenizer for a provider's model, or None where only estimates are available"""
+    if tiktoken is None or provider not in TIKTOKEN_PROVIDERS:
+        return None
+    key = (provider, model)
+    with _tokenizers_lock:
+        if key not in _tokenizers:
+            try:
+                try:
+                    encoding = tiktoken.encoding_for_model(model) if model else None
+                except KeyError:
+                    encoding = None
+                # Loading an encoding may download it on first use
+                _tokenizers[key] = Tokenizer(encoding or tiktoken.get_encoding(TIKTOKEN_DEFAULT_ENCODING))
+            except Exception as e:
+                logger.warning(f"Could not load the {provider} tokenizer, estimating token counts: {e}")
+                _tokenizers[key] = None
+        return _tokenizers[key]
+
+
+def estimate_tokens(text: str, tokenizer: Optional[Tokenizer] = None) -> int:
+    """Number of tokens in `text`, exact with a tokenizer and a padded estimate without"""
+    if not text:
+        return 0
+    if tokenizer:
+        return tokenizer.count(text)
+    return math.ceil(max(len(text) / CHARS_PER_TOKEN, len(text.split())) * ESTIMATE_SAFETY_MARGIN)
+
+
+def truncate_to_tokens(text: str, budget: int, marker: str = "...", tokenizer: Optional[Tokenizer] = None) -> str:
+    """Cut `text` to `budget` tokens (about, without a tokenizer), at a word boundary where possible"""
+    if estimate_tokens(text, tokenizer) <= budget:
+        return text
+    if tokenizer:
+        cut = tokenizer.truncate(text, budget - tokenizer.count(marker))
+    else:
+        cut = text[:max(int(budget / ESTIMATE_SAFETY_MARGIN) * CHARS_PER_TOKEN - len(marker), 0)]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut + marker
+
+
+def fit_recent(
+        items: Iterable[T],
+        budget: int,
+        render: Callable[[T], str] = str,
+        tokenizer: Optional[Tokenizer] = None
+) -> List[T]:
+    """
+    The most recent items (the end of `items`) whose rendered text fits in
+    `budget` tokens together, in their original order
+    """
+    kept: List[T] = []
+    used = 0
+    for item in reversed(list(items)):
+        cost = estimate_tokens(render(item), tokenizer)
+        if used + cost > budget:
+            break
+        kept.append(item)
+        used += cost
+    kept.reverse()
+    return kept
@@ -0,0 +1,267 @@
+"""
+Latency-aware routing over the configured LLM providers
+
+Instead of pinning the first configured provider, the agent sends each
+generation to the fastest healthy one. Per-provider rolling latencies and
+error rates decide the order, a provider that fails is skipped for a growing
+cooldown, and a request that gets no answer fails over to the next provider.
+With `hedge_after` set, a request still running after that many seconds (or
+after the provider's rolling p95 with "p95") is duplicated on the next
+provider, and whichever answers first is used.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Union
+
+from src.helpers.rate_limit import RateLimited
+from src.prompt_builder import PromptParts
+
+logger = logging.getLogger("llm_router")
+
+LATENCY_WINDOW = 50
+# Samples needed before a provider's error rate or p95 is trusted
+MIN_SAMPLES = 5
+MAX_ERROR_RATE = 0.5
+# Cooldown after a failure, doubled for each consecutive one
+FAILURE_COOLDOWN = 30
+MAX_FAILURE_COOLDOWN = 600
+
+# A plain string, or (stable, volatile) parts that providers with prefix caching send separately
+SystemPrompt = Union[str, PromptParts]
+
+
+class ProviderStats:
+    """Rolling latency and outcome window for one provider"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record(self, latency: Optional[float], ok: bool, retry_at: Optional[float] = None) -> None:
+        self.outcomes.append(ok)
+        if ok:
+            if latency is not None:
+                self.latencies.append(latency)
+            self.consecutive_failures = 0
+            self.cooldown_until = 0.0
+            return
+
+        self.consecutive_failures += 1
+        cooldown = min(FAILURE_COOLDOWN * 2 ** (self.consecutive_failures - 1), MAX_FAILURE_COOLDOWN)
+        self.cooldown_until = max(retry_at or 0.0, time.time() + cooldown)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[round(p * (len(ordered) - 1))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def healthy(self, now: Optional[float] = None) -> bool:
+        if (now or time.time()) < self.cooldown_until:
+            return False
+        return len(self.outcomes) < MIN_SAMPLES or self.error_rate <= MAX_ERROR_RATE
+
+
+class LLMRouter:
+    """Routes generate-text calls to the fastest healthy LLM provider, failing over and optionally hedging"""
+
+    def __init__(
+            self,
+            connection_manager,
+            providers: List[str],
+            hedge_after: Union[float, str, None] = None,
+            window: int = LATENCY_WINDOW
+    ):
+        if not providers:
+            raise ValueError("No configured LLM provider found")
+        if isinstance(hedge_after, str) and hedge_after != "p95":
+            raise ValueError('hedge_after must be a number of seconds or "p95"')
+
+        self.connection_manager = connection_manager
+        self.providers = list(providers)
+        self.hedge_after = hedge_after
+        self._stats = {name: ProviderStats(window) for name in self.providers}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def ranked(self) -> List[str]:
+        """
+        Providers in the order to try them: healthy ones by p50 latency, then the rest
+        by how soon their cooldown ends. Providers without samples rank first, in
+        configured order, so each gets measured.
+        """
+        now = time.time()
+        with self._lock:
+            def key(name: str):
+                stats = self._stats[name]
+                if stats.healthy(now):
+                    return (0, stats.percentile(0.5) or 0.0)
+                return (1, stats.cooldown_until)
+            return sorted(self.providers, key=key)
+
+    def _hedge_delay(self, provider: str) -> Optional[float]:
+        if self.hedge_after is None or len(self.providers) < 2:
+            return None
+        if self.hedge_after != "p95":
+            return float(self.hedge_after)
+        with self._lock:
+            stats = self._stats[provider]
+            return stats.percentile(0.95) if len(stats.latencies) >= MIN_SAMPLES else None
+
+    def _record(self, provider: str, latency: Optional[float], ok: bool, retry_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._stats[provider].record(latency, ok, retry_at)
+        if not ok:
+            logger.warning(f"LLM provider {provider} failed, routing to the next one")
+
+    def _call(self, provider: str, prompt: str, system_prompt: SystemPrompt) -> Optional[str]:
+        started = time.monotonic()
+        try:
+            result = self.connection_manager.perform_action(
+                connection_name=provider,
+                action_name="generate-text",
+                params=[prompt, system_prompt]
+            )
+        except RateLimited as e:
+            self._record(provider, None, False, e.retry_at)
+            return None
+        self._record(provider, time.monotonic() - started, result is not None)
+        return result
+
+    async def _call_async(self, provider: str, prompt: str, system_prompt: SystemPrompt) -> Optional[str]:
+        started = time.monotonic()
+        try:
+            result = await self.connection_manager.perform_action_async(
+                connection_name=provider,
+                action_name="generate-text",
+                params=[prompt, system_prompt]
+            )
+        except RateLimited as e:
+            self._record(provider, None, False, e.retry_at)
+            return None
+        except asyncio.CancelledError:
+            # Lost a hedge: the time so far is a lower bound on its latency, enough to rank it behind the winner
+            with self._lock:
+                self._stats[provider].latencies.append(time.monotonic() - started)
+            raise
+        self._record(provider, time.monotonic() - started, result is not None)
+        return result
+
+    def generate(self, prompt: str, system_prompt: SystemPrompt) -> Optional[str]:
+        """Generate text on the best provider, failing over (and hedging, if enabled) until one answers"""
+        candidates = deque(self.ranked())
+        if self._hedge_delay(candidates[0]) is None:
+            while candidates:
+                result = self._call(candidates.popleft(), prompt, system_prompt)
+                if result is not None:
+                    return result
+            return None
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=len(self.providers) * 2, thread_name_prefix="llm-hedge"
+                )
+            executor = self._executor
+        running = {}
+        hedged = False
+        while candidates or running:
+            if candidates and not running:
+                provider = candidates.popleft()
+                running[executor.submit(self._call, provider, prompt, system_prompt)] = provider
+            # At most one duplicate per request, even if the original fails before the duplicate answers
+            delay = self._hedge_delay(next(iter(running.values()))) if candidates and not hedged else None
+            done, _ = wait(running, timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                provider = candidates.popleft()
+                logger.info(f"LLM request slow, hedging on {provider}")
+                running[executor.submit(self._call, provider, prompt, system_prompt)] = provider
+                continue
+            for future in done:
+                running.pop(future)
+                if future.result() is not None:
+                    # Requests still running finish in the background; their answers are dropped
+                    return future.result()
+        return None
+
+    async def generate_async(self, prompt: str, system_prompt: SystemPrompt) -> Optional[str]:
+        """Async variant of generate"""
+        candidates = deque(self.ranked())
+        running: Dict[asyncio.Task, str] = {}
+        hedged = False
+        try:
+            while candidates or running:
+                if candidates and not running:
+                    provider = candidates.popleft()
+                    running[asyncio.create_task(self._call_async(provider, prompt, system_prompt))] = provider
+                delay = self._hedge_delay(next(iter(running.values()))) if candidates and not hedged else None
+                done, _ = await asyncio.wait(running, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    provider = candidates.popleft()
+                    logger.info(f"LLM request slow, hedging on {provider}")
+                    running[asyncio.create_task(self._call_async(provider, prompt, system_prompt))] = provider
+                    continue
+                for task in done:
+                    running.pop(task)
+                    if task.result() is not None:
+                        return task.result()
+            return None
+        finally:
+            for task in running:
+                task.cancel()
+
+    def generate_batch(self, prompts: List[Any], system_prompt: Optional[SystemPrompt] = None) -> Optional[List[Optional[str]]]:
+        """Run a batch on the best provider, failing over if the whole batch fails"""
+        for provider in self.ranked():
+            results = self.connection_manager.generate_batch(provider, prompts, system_prompt)
+            if results is not None:
+                return results
+            self._record(provider, None, False)
+        return None
+
+    async def generate_batch_async(
+            self, prompts: List[Any], system_prompt: Optional[SystemPrompt] = None
+    ) -> Optional[List[Optional[str]]]:
+        """Async variant of generate_batch"""
+        for provider in self.ranked():
+            results = await self.connection_manager.generate_batch_async(provider, prompts, system_prompt)
+            if results is not None:
+                return results
+            self._record(provider, None, False)
+        return None
+
+    def close(self) -> None:
+        """Shut down the hedging threads; requests still running finish in the background"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Rolling latency percentiles, error rate and health per provider"""
+        now = time.time()
+        with self._lock:
+            return {
+                name: {
+                    "p50": stats.percentile(0.5),
+                    "p95": stats.percentile(0.95),
+                    "error_rate": stats.error_rate,
+                    "samples": len(stats.outcomes),
+                    "healthy": stats.healthy(now),
+                }
+                for name, stats in self._stats.items()
+            }
@@ -0,0 +1,211 @@
+"""
+Process-wide metrics for actions and connections
+
+Counters, gauges and latency histograms kept in memory and rendered in the
+Prometheus text format by the server's /metrics endpoint. ConnectionManager
+and the action handler record every call through track(), which counts
+outcomes, times the call and keeps an in-flight gauge:
+
+    zerepy_connection_requests_total{connection, action, outcome}
+    zerepy_connection_request_duration_seconds{connection, action}
+    zerepy_connection_requests_in_flight{connection, action}
+    zerepy_action_runs_total{action, outcome}
+    zerepy_action_run_duration_seconds{action}
+    zerepy_action_runs_in_flight{action}
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.helpers.rate_limit import RateLimited
+
+# Seconds; LLM generations and chain calls sit in the upper buckets, cache hits in the lower ones
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, lock: threading.Lock):
+        self.name = name
+        self.description = description
+        self._lock = lock
+        self._values: Dict[LabelKey, float] = {}
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, lock: threading.Lock, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, lock)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: observations per bucket (not cumulative, the last one is +Inf), sum, count
+        self._series: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+            counts, totals = series
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return int(series[1][1]) if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, (total, count)) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {int(count)}")
+        return lines
+
+
+class Timing:
+    """Handed out by track(); callers set `outcome` when the result, not an exception, decides it"""
+
+    def __init__(self):
+        self.outcome = "ok"
+
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = "zerepy"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+
+    def _get(self, cls, name: str, description: str, **kwargs) -> Metric:
+        full_name = f"{self.namespace}_{name}"
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, description, self._lock, **kwargs)
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {full_name} is already registered as a {metric.kind}")
+        return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get(Counter, name, description)
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._get(Gauge, name, description)
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, description, buckets=buckets)
+
+    @contextmanager
+    def track(self, family: str, subject: str, **labels) -> Iterator[Timing]:
+        """
+        Count, time and gauge one call, e.g. track("connection_requests", "Connection action", ...)
+        records connection_requests_total, connection_requests_in_flight and
+        connection_request_duration_seconds. Exceptions are counted as "error",
+        or "rate_limited" for RateLimited, and re-raised.
+        """
+        in_flight = self.gauge(f"{family}_in_flight", f"{subject}s currently running")
+        duration = self.histogram(f"{family.removesuffix('s')}_duration_seconds", f"{subject} latency in seconds")
+        total = self.counter(f"{family}_total", f"{subject}s by outcome")
+
+        timing = Timing()
+        in_flight.inc(**labels)
+        started = time.monotonic()
+        try:
+            yield timing
+        except RateLimited:
+            timing.outcome = "rate_limited"
+            raise
+        except BaseException:
+            timing.outcome = "error"
+            raise
+        finally:
+            in_flight.dec(**labels)
+            duration.observe(time.monotonic() - started, **labels)
+            total.inc(outcome=timing.outcome, **labels)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+                lines.append(f"# HELP {metric.name} {metric.description}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Process-wide registry shared by every agent, connection and the server's /metrics endpoint"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
@@ -0,0 +1,123 @@
+"""
+Token-budgeted prompt assembly
+
+Prompts are built from named sections (bio, traits, examples, ...) instead
+of one unbounded string. Each section can have its own token budget, and when
+the whole prompt is over budget the lowest-priority sections lose their last
+lines first. Stable sections are placed before ones that change between
+builds, so providers that cache prompt prefixes (Anthropic, OpenAI) keep
+reusing the stable part. build_parts() returns the two parts separately for
+connections that mark the cacheable prefix explicitly.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.helpers.tokens import Tokenizer, estimate_tokens, truncate_to_tokens
+
+logger = logging.getLogger("prompt_builder")
+
+DEFAULT_SYSTEM_PROMPT_TOKENS = 4000
+
+# A prompt as (stable, volatile): the part that stays the same between builds and the part that changes
+PromptParts = Tuple[str, str]
+
+
+def join_prompt_parts(stable: str, volatile: str) -> str:
+    """The prompt text of a (stable, volatile) pair, as sent to providers without prefix caching"""
+    return "\n".join(part for part in (stable, volatile) if part)
+
+
+@dataclass
+class PromptSection:
+    name: str
+    lines: List[str]
+    header: Optional[str] = None
+    # Sections that change between builds go after the stable ones
+    stable: bool = True
+    # 0 is never trimmed; higher numbers are trimmed first
+    priority: int = 1
+    # Own token budget, applied before the prompt-wide one
+    budget: Optional[int] = None
+
+
+class PromptBuilder:
+    def __init__(self, budget: int = DEFAULT_SYSTEM_PROMPT_TOKENS, tokenizer: Optional[Tokenizer] = None):
+        self.budget = budget
+        # The target provider's tokenizer when available, otherwise sizes are estimated
+        self.tokenizer = tokenizer
+        self.sections: List[PromptSection] = []
+        # Filled by build(): estimated size and lines dropped per section
+        self.tokens = 0
+        self.dropped: Dict[str, int] = {}
+
+    def add(
+            self,
+            name: str,
+            lines: List[str],
+            header: Optional[str] = None,
+            stable: bool = True,
+            priority: int = 1,
+            budget: Optional[int] = None
+    ) -> "PromptBuilder":
+        self.sections.append(PromptSection(name, list(lines), header, stable, priority, budget))
+        return self
+
+    def build(self) -> str:
+        return join_prompt_parts(*self.build_parts())
+
+    def build_parts(self) -> PromptParts:
+        """Build the prompt as its stable sections and the sections that change between builds"""
+        # Stable sections first, each group in the order added
+        sections = [s for s in self.sections if s.stable] + [s for s in self.sections if not s.stable]
+        kept: Dict[str, List[str]] = {}
+        costs: Dict[str, List[int]] = {}
+        self.dropped = {}
+
+        for section in sections:
+            lines = [line for line in section.lines if line]
+            if section.priority == 0 and section.budget is None:
+                lines_cost = [estimate_tokens(line, self.tokenizer) for line in lines]
+            else:
+                # Single lines longer than the section's budget are cut rather than dropped whole
+                limit = section.budget or self.budget
+                lines = [truncate_to_tokens(line, limit, tokenizer=self.tokenizer) for line in lines]
+                lines_cost = [estimate_tokens(line, self.tokenizer) for line in lines]
+                while section.budget is not None and lines and sum(lines_cost) > section.budget:
+                    lines.pop()
+                    lines_cost.pop()
+            kept[section.name] = lines
+            costs[section.name] = lines_cost
+            self.dropped[section.name] = len(section.lines) - len(lines)
+
+        def header_cost(section: PromptSection) -> int:
+            return estimate_tokens(section.header, self.tokenizer) if section.header and kept[section.name] else 0
+
+        total = sum(sum(costs[s.name]) + header_cost(s) for s in sections)
+        trimmable = sorted((s for s in sections if s.priority > 0), key=lambda s: -s.priority)
+        for section in trimmable:
+            while total > self.budget and kept[section.name]:
+                kept[section.name].pop()
+                total -= costs[section.name].pop()
+                self.dropped[section.name] += 1
+                if not kept[section.name]:
+                    total -= estimate_tokens(section.header, self.tokenizer) if section.header else 0
+
+        dropped = {name: count for name, count in self.dropped.items() if count}
+        if dropped:
+            logger.info(f"Prompt trimmed to about {total} tokens, dropped lines: {dropped}")
+        if total > self.budget:
+            logger.warning(f"Prompt is about {total} tokens, over its {self.budget} token budget")
+        self.tokens = total
+
+        def render(group: List[PromptSection]) -> List[str]:
+            lines = []
+            for section in group:
+                if kept[section.name]:
+                    lines.extend([section.header] if section.header else [])
+                    lines.extend(kept[section.name])
+            return lines
+
+        stable = render([s for s in sections if s.stable])
+        volatile = render([s for s in sections if not s.stable])
+        return "\n".join(stable), "\n".join(volatile)
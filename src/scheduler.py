@@ -0,0 +1,170 @@
+"""
+Task scheduler for the agent loop
+
+Replaces picking a random weighted task every loop_delay. Each task gets its
+own period, derived from its weight so the long-run mix matches the weights,
+and tasks wait on a heap ordered by when they are next due. A task that did
+nothing (its action returned False) backs off for its cooldown, so the loop
+moves on to the next due task instead of sleeping a whole loop_delay on a
+no-op.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("scheduler")
+
+
+@dataclass
+class ScheduledTask:
+    name: str
+    weight: float
+    # Lower bound on the period, e.g. tweet_interval for post-tweet
+    min_interval: float = 0
+    # Delay before retrying after a run that did nothing; defaults to the task's period
+    cooldown: Optional[float] = None
+    last_run: float = 0
+    last_success: bool = True
+    runs: int = 0
+    skips: int = 0
+
+
+class TaskScheduler:
+    """
+    Heap of due times for an agent's tasks.
+
+    A task with weight w out of a total W runs every loop_delay * W / w seconds,
+    so one task falls due per loop_delay on average, as with weighted random
+    choice. `weights_fn` returns the current weights in task order, so
+    time-of-day multipliers stretch or shrink periods as they change.
+    """
+
+    def __init__(
+            self,
+            tasks: List[ScheduledTask],
+            loop_delay: float,
+            weights_fn: Optional[Callable[[], List[float]]] = None
+    ):
+        self.tasks: Dict[str, ScheduledTask] = {task.name: task for task in tasks}
+        self._order = [task.name for task in tasks]
+        self.loop_delay = loop_delay
+        self.weights_fn = weights_fn
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due: Dict[str, float] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+
+        # The first task starts right away, the rest follow one loop_delay apart
+        now = time.time()
+        offset = 0
+        for task in tasks:
+            if task.weight > 0:
+                self._schedule(task.name, now + offset)
+                offset += loop_delay
+
+    def _current_weights(self) -> Dict[str, float]:
+        weights = self.weights_fn() if self.weights_fn else [self.tasks[name].weight for name in self._order]
+        return dict(zip(self._order, weights))
+
+    def period(self, name: str) -> Optional[float]:
+        """Seconds between runs of a task at the current weights, or None if its weight is zero"""
+        weights = self._current_weights()
+        weight = weights.get(name, 0)
+        if weight <= 0:
+            return None
+        total = sum(w for w in weights.values() if w > 0)
+        return max(self.loop_delay * total / weight, self.tasks[name].min_interval)
+
+    def _schedule(self, name: str, due: float) -> None:
+        self._due[name] = due
+        heapq.heappush(self._heap, (due, next(self._counter), name))
+        self._wakeup.set()
+
+    def trigger(self, name: str) -> None:
+        """Make a task due now, or one loop_delay after its last run if that is later"""
+        task = self.tasks.get(name)
+        if task is None:
+            return
+        due = max(time.time(), task.last_run + self.loop_delay)
+        if due < self._due.get(name, float("inf")):
+            self._schedule(name, due)
+
+    def retry_now(self, name: str) -> None:
+        """Make a task due now if its last run did nothing, e.g. when the input it was missing arrives"""
+        task = self.tasks.get(name)
+        if task is not None and not task.last_success and name in self._due:
+            self._schedule(name, time.time())
+
+    def defer(self, name: str, until: float) -> float:
+        """Reschedule a task that could not run yet, e.g. until a rate limit resets, without counting a skip"""
+        self._schedule(name, until)
+        return until
+
+    def _peek(self) -> Optional[Tuple[float, str]]:
+        # Entries superseded by a later _schedule for the same task are skipped lazily
+        while self._heap:
+            due, _, name = self._heap[0]
+            if self._due.get(name) == due:
+                return due, name
+            heapq.heappop(self._heap)
+        return None
+
+    async def next_task(self) -> str:
+        """Sleep until the next task is due and return its name"""
+        while True:
+            self._wakeup.clear()
+            head = self._peek()
+            if head is None:
+                await self._wakeup.wait()
+                continue
+            due, name = head
+            delay = due - time.time()
+            if delay <= 0:
+                heapq.heappop(self._heap)
+                del self._due[name]
+                if self.period(name) is None:
+                    # Weight is zero right now (e.g. a night multiplier of 0), look again later
+                    self._schedule(name, time.time() + self.loop_delay)
+                    continue
+                return name
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def complete(self, name: str, success: bool) -> float:
+        """Reschedule a task after it ran; returns when it is next due"""
+        task = self.tasks[name]
+        now = time.time()
+        period = self.period(name)
+        task.last_success = success
+        if success:
+            task.runs += 1
+            task.last_run = now
+        else:
+            task.skips += 1
+
+        if period is None:
+            # Weight dropped to zero (e.g. night multiplier of 0), check again after a loop_delay
+            due = now + self.loop_delay
+        elif success:
+            due = now + period
+        else:
+            due = now + (task.cooldown if task.cooldown is not None else period)
+        self._schedule(name, due)
+        return due
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        now = time.time()
+        return {
+            name: {
+                "runs": task.runs,
+                "skips": task.skips,
+                "due_in": max(self._due[name] - now, 0) if name in self._due else None
+            }
+            for name, task in self.tasks.items()
+        }
@@ -1,13 +1,14 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi.responses import PlainTextResponse
 
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import logging
 import asyncio
-import signal
-import threading
 from pathlib import Path
 from src.cli import ZerePyCLI
+from src.helpers.rate_limit import RateLimited
+from src.metrics import get_metrics_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("server/app")
@@ -29,31 +30,21 @@ class ServerState:
         self.cli = ZerePyCLI()
         self.agent_running = False
         self.agent_task = None
-        self._stop_event = threading.Event()
 
-    def _run_agent_loop(self):
-        """Run agent loop in a separate thread"""
+    async def _run_agent_loop(self):
+        """Run the agent loop as a task on the server's event loop"""
         try:
-            log_once = False
-            while not self._stop_event.is_set():
-                if self.cli.agent:
-                    try:
-                        if not log_once:
-                            logger.info("Loop logic not implemented")
-                            log_once = True
-
-                    except Exception as e:
-                        logger.error(f"Error in agent action: {e}")
-                        if self._stop_event.wait(timeout=30):
-                            break
+            await self.cli.agent.loop_async()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Error in agent loop thread: {e}")
+            logger.error(f"Error in agent loop task: {e}")
         finally:
             self.agent_running = False
             logger.info("Agent loop stopped")
 
     async def start_agent_loop(self):
-        """Start the agent loop in background thread"""
+        """Start the agent loop in a background task"""
         if not self.cli.agent:
             raise ValueError("No agent loaded")
         
@@ -61,16 +52,17 @@ class ServerState:
             raise ValueError("Agent already running")
 
         self.agent_running = True
-        self._stop_event.clear()
-        self.agent_task = threading.Thread(target=self._run_agent_loop)
-        self.agent_task.start()
+        self.agent_task = asyncio.create_task(self._run_agent_loop())
 
     async def stop_agent_loop(self):
         """Stop the agent loop"""
         if self.agent_running:
-            self._stop_event.set()
             if self.agent_task:
-                self.agent_task.join(timeout=5)
+                self.agent_task.cancel()
+                try:
+                    await asyncio.wait_for(self.agent_task, timeout=5)
+                except (asyncio.CancelledError, asyncio.TimeoutError):
+                    pass
             self.agent_running = False
 
 class ZerePyServer:
@@ -123,9 +115,10 @@ class ZerePyServer:
             
             try:
                 connections = {}
-                for name, conn in self.state.cli.agent.connection_manager.connections.items():
+                connection_manager = self.state.cli.agent.connection_manager
+                for name, conn in connection_manager.connections.items():
                     connections[name] = {
-                        "configured": conn.is_configured(),
+                        "configured": connection_manager.is_configured(name),
                         "is_llm_provider": conn.is_llm_provider
                     }
                 return {"connections": connections}
@@ -146,6 +139,8 @@ class ZerePyServer:
                     params=action_request.params
                 )
                 return {"status": "success", "result": result}
+            except RateLimited as e:
+                raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
 
@@ -177,11 +172,15 @@ class ZerePyServer:
                 raise HTTPException(status_code=400, detail="No agent loaded")
             
             try:
-                connection = self.state.cli.agent.connection_manager.connections.get(name)
+                connection_manager = self.state.cli.agent.connection_manager
+                connection = connection_manager.connections.get(name)
                 if not connection:
                     raise HTTPException(status_code=404, detail=f"Connection {name} not found")
                 
-                success = connection.configure(**config.params)
+                try:
+                    success = connection.configure(**config.params)
+                finally:
+                    connection_manager.invalidate_configured(name)
                 if success:
                     return {"status": "success", "message": f"Connection {name} configured successfully"}
                 else:
@@ -191,25 +190,34 @@ class ZerePyServer:
                 raise HTTPException(status_code=500, detail=str(e))
 
         @self.app.get("/connections/{name}/status")
-        async def connection_status(name: str):
-            """Get configuration status of a connection"""
+        async def connection_status(name: str, refresh: bool = False):
+            """Get configuration status of a connection, pass refresh=true to bypass the status cache"""
             if not self.state.cli.agent:
                 raise HTTPException(status_code=400, detail="No agent loaded")
                 
             try:
-                connection = self.state.cli.agent.connection_manager.connections.get(name)
+                connection_manager = self.state.cli.agent.connection_manager
+                connection = connection_manager.connections.get(name)
                 if not connection:
                     raise HTTPException(status_code=404, detail=f"Connection {name} not found")
                     
                 return {
                     "name": name,
-                    "configured": connection.is_configured(verbose=True),
+                    "configured": connection_manager.is_configured(name, refresh=refresh, verbose=refresh),
                     "is_llm_provider": connection.is_llm_provider
                 }
                 
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/metrics", response_class=PlainTextResponse)
+        async def metrics():
+            """Action and connection counters, latencies and in-flight gauges in the Prometheus text format"""
+            return PlainTextResponse(
+                get_metrics_registry().render(),
+                media_type="text/plain; version=0.0.4; charset=utf-8"
+            )
+
 def create_app():
     server = ZerePyServer()
     return server.app
\ No newline at end of file
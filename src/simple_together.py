@@ -14,6 +14,9 @@ load_dotenv()
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
 TOGETHER_MODEL = os.getenv("TOGETHER_MODEL", "meta-llama/Llama-3-70b-chat-hf")
 
+# Reuse connections to Together AI between requests
+session = requests.Session()
+
 # Configure FastAPI
 app = FastAPI(
     title="ZerePy Baultro API (Together AI)",
@@ -162,7 +165,7 @@ def generate_with_together(messages, model=None, temperature=0.7, max_tokens=102
             "max_tokens": max_tokens
         }
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = session.post(url, headers=headers, json=payload, timeout=(10, 120))
         
         if response.status_code != 200:
             print(f"Error from Together API: {response.status_code}")
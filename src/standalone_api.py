@@ -5,6 +5,7 @@ This version integrates with the Together AI API to provide real LLM responses.
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import logging
@@ -14,7 +15,10 @@ import json
 import random
 from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from src.helpers.response_cache import ResponseCache
+from src.helpers.sse import SSE_HEADERS, sse_events
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -46,6 +50,7 @@ class PromptRequest(BaseModel):
     model: Optional[str] = None
     temperature: Optional[float] = 0.7
     max_tokens: Optional[int] = 1024
+    stream: Optional[bool] = False
 
 class ChatMessage(BaseModel):
     role: str
@@ -57,6 +62,7 @@ class ChatRequest(BaseModel):
     model: Optional[str] = None
     temperature: Optional[float] = 0.7
     max_tokens: Optional[int] = 1024
+    stream: Optional[bool] = False
 
 class ResponseModel(BaseModel):
     text: str
@@ -70,6 +76,14 @@ class TogetherAIClient:
         self.api_url = "https://api.together.xyz/v1"
         self.default_model = os.getenv("TOGETHER_MODEL", "meta-llama/Llama-3-70b-chat-hf")
         
+        # Keep connections to the API alive between requests instead of a new TLS handshake per call
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=int(os.getenv("TOGETHER_POOL_SIZE", 16))))
+        self.timeout = (10, float(os.getenv("TOGETHER_READ_TIMEOUT", 120)))
+        
+        # Opt-in with ZEREPY_RESPONSE_CACHE=true, None when disabled
+        self.response_cache = ResponseCache.from_env()
+        
         if not self.api_key:
             logger.warning("Together AI API key not found in environment. Using mock mode.")
             self.mock_mode = True
@@ -77,38 +91,54 @@ class TogetherAIClient:
             self.mock_mode = False
             logger.info(f"Together AI client initialized with model: {self.default_model}")
     
+    def _chat_request(self, messages, model, temperature, max_tokens):
+        """Build headers and payload for a chat completion request"""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        # Format messages for Together AI
+        formatted_messages = []
+        for msg in messages:
+            formatted_messages.append({
+                "role": msg["role"],
+                "content": msg["content"]
+            })
+        
+        payload = {
+            "model": model or self.default_model,
+            "messages": formatted_messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        return headers, payload
+    
+    def _cache_key(self, messages, model, temperature, max_tokens):
+        """Response cache key for a request, None when caching is disabled"""
+        if not self.response_cache:
+            return None
+        return ResponseCache.make_key(model or self.default_model, messages, temperature, max_tokens)
+    
     def generate_chat(self, messages, model=None, temperature=0.7, max_tokens=1024):
         """Generate a response using chat completion"""
         if self.mock_mode:
             return self._mock_response(messages[-1]["content"] if messages else "")
         
+        cache_key = self._cache_key(messages, model, temperature, max_tokens)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            model = model or self.default_model
+            headers, payload = self._chat_request(messages, model, temperature, max_tokens)
             
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Format messages for Together AI
-            formatted_messages = []
-            for msg in messages:
-                formatted_messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-            
-            payload = {
-                "model": model,
-                "messages": formatted_messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens
-            }
-            
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/chat/completions",
                 headers=headers,
-                json=payload
+                json=payload,
+                timeout=self.timeout
             )
             
             if response.status_code != 200:
@@ -116,22 +146,87 @@ class TogetherAIClient:
                 return self._mock_response(messages[-1]["content"] if messages else "", is_error=True)
             
             result = response.json()
-            return result["choices"][0]["message"]["content"]
+            text = result["choices"][0]["message"]["content"]
+            if cache_key:
+                self.response_cache.set(cache_key, text)
+            return text
             
         except Exception as e:
             logger.error(f"Error in Together AI API call: {str(e)}")
             return self._mock_response(messages[-1]["content"] if messages else "", is_error=True)
     
-    def generate_completion(self, prompt, system_prompt, model=None, temperature=0.7, max_tokens=1024):
-        """Generate a response using text completion"""
-        # Convert to chat format
-        messages = [
+    def stream_chat(self, messages, model=None, temperature=0.7, max_tokens=1024):
+        """Generate a response using chat completion, yielding text chunks as they arrive"""
+        if self.mock_mode:
+            yield self._mock_response(messages[-1]["content"] if messages else "")
+            return
+        
+        cache_key = self._cache_key(messages, model, temperature, max_tokens)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        try:
+            headers, payload = self._chat_request(messages, model, temperature, max_tokens)
+            payload["stream"] = True
+            
+            with self.session.post(
+                f"{self.api_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                stream=True,
+                timeout=self.timeout
+            ) as response:
+                if response.status_code != 200:
+                    logger.error(f"Together AI API error: {response.status_code} - {response.text}")
+                    yield self._mock_response(messages[-1]["content"] if messages else "", is_error=True)
+                    return
+                
+                # Only a stream that reached [DONE] is complete enough to cache
+                stream = {"done": False}
+                chunks = self._stream_content(response, stream)
+                if cache_key:
+                    chunks = self.response_cache.stream_through(cache_key, chunks, completed=lambda: stream["done"])
+                yield from chunks
+            
+        except Exception as e:
+            logger.error(f"Error in Together AI API call: {str(e)}")
+            yield self._mock_response(messages[-1]["content"] if messages else "", is_error=True)
+    
+    def _stream_content(self, response, stream):
+        """Text chunks of a streamed completion; sets stream["done"] once the [DONE] marker arrives"""
+        # The API streams server-sent events, one completion chunk per data line
+        for line in response.iter_lines():
+            if not line or not line.startswith(b"data:"):
+                continue
+            data = line[len(b"data:"):].strip()
+            if data == b"[DONE]":
+                stream["done"] = True
+                return
+            choices = json.loads(data).get("choices") or []
+            content = choices[0].get("delta", {}).get("content") if choices else None
+            if content:
+                yield content
+    
+    def _completion_messages(self, prompt, system_prompt):
+        """Convert a prompt and system prompt to chat format"""
+        return [
             {"role": "system", "content": system_prompt or "You are a helpful AI assistant."},
             {"role": "user", "content": prompt}
         ]
-        
+    
+    def generate_completion(self, prompt, system_prompt, model=None, temperature=0.7, max_tokens=1024):
+        """Generate a response using text completion"""
+        messages = self._completion_messages(prompt, system_prompt)
         return self.generate_chat(messages, model, temperature, max_tokens)
     
+    def stream_completion(self, prompt, system_prompt, model=None, temperature=0.7, max_tokens=1024):
+        """Generate a response using text completion, yielding text chunks as they arrive"""
+        messages = self._completion_messages(prompt, system_prompt)
+        return self.stream_chat(messages, model, temperature, max_tokens)
+    
     def _mock_response(self, prompt, is_error=False):
         """Generate a mock response when API is unavailable"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -145,6 +240,10 @@ class TogetherAIClient:
 # Initialize Together AI client
 together_client = TogetherAIClient()
 
+def sse_response(chunks):
+    """Stream text chunks to the client as server-sent events, ending with [DONE]"""
+    return StreamingResponse(sse_events(chunks), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # Game-specific system prompts
 GAME_SYSTEM_PROMPTS = {
     "battle": """You are a secure AI vault protecting valuable digital assets.
@@ -226,6 +325,13 @@ async def root():
         "mock_mode": together_client.mock_mode
     }
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Response cache hit/miss counters and size"""
+    if not together_client.response_cache:
+        return {"enabled": False}
+    return {"enabled": True, **together_client.response_cache.stats()}
+
 @app.get("/providers")
 async def list_providers():
     """List available LLM providers"""
@@ -238,6 +344,15 @@ async def generate_content(request: PromptRequest):
         # Use default system prompt if none provided
         system_prompt = request.system_prompt or "You are a helpful AI assistant for the Baultro gaming platform."
         
+        if request.stream:
+            return sse_response(together_client.stream_completion(
+                prompt=request.prompt,
+                system_prompt=system_prompt,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens
+            ))
+        
         # Generate response using Together AI
         response = together_client.generate_completion(
             prompt=request.prompt,
@@ -277,6 +392,14 @@ async def chat(request: ChatRequest):
         if not formatted_messages:
             raise HTTPException(status_code=400, detail="No messages provided")
         
+        if request.stream:
+            return sse_response(together_client.stream_chat(
+                messages=formatted_messages,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens
+            ))
+        
         # Generate response using Together AI
         response = together_client.generate_chat(
             messages=formatted_messages,
@@ -309,6 +432,15 @@ async def game_prompt(request: PromptRequest):
         # Use game-specific system prompt
         system_prompt = GAME_SYSTEM_PROMPTS[game_type]
         
+        if request.stream:
+            return sse_response(together_client.stream_completion(
+                prompt=request.prompt,
+                system_prompt=system_prompt,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens
+            ))
+        
         # Generate response using Together AI
         response = together_client.generate_completion(
             prompt=request.prompt,
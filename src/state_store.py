@@ -0,0 +1,378 @@
+"""
+Persistent agent state
+
+Agent state that must survive a restart (when the last tweet went out, which
+messages were already replied to) is written through to an embedded store, so
+a restarted agent does not re-reply to old content. Sets of seen ids and logs
+of sent messages are bounded in memory and on disk, so memory stays flat over
+long uptimes.
+
+The backend is chosen with "state_store" in the agent JSON:
+
+    "state_store": {"backend": "sqlite", "path": "~/.zerepy/state/agent.db", "retention_days": 30}
+
+"sqlite" (the default) keeps state in ~/.zerepy/state/<agent>.db; "memory"
+keeps the previous in-memory behaviour.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Type
+
+logger = logging.getLogger("state_store")
+
+DEFAULT_STATE_DIR = Path.home() / ".zerepy" / "state"
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_SET_LIMIT = 10000
+# Additions to a persistent set between sweeps of expired members on disk
+PRUNE_EVERY = 500
+
+
+class BoundedSet:
+    """
+    Set of ids that forgets its oldest members past `limit`, and members
+    older than `window` seconds if a window is given
+    """
+
+    def __init__(self, limit: int = DEFAULT_SET_LIMIT, members: Iterable[str] = (), window: Optional[float] = None):
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        # member -> time added, oldest first
+        self._members: "OrderedDict[str, float]" = OrderedDict()
+        for member in members:
+            self._insert(member)
+
+    def _expire(self, now: float) -> None:
+        if self.window is None:
+            return
+        cutoff = now - self.window
+        while self._members and next(iter(self._members.values())) < cutoff:
+            self._members.popitem(last=False)
+
+    def _insert(self, member: str, added_at: Optional[float] = None) -> bool:
+        now = time.time()
+        self._expire(now)
+        if member in self._members:
+            return False
+        self._members[member] = added_at or now
+        while len(self._members) > self.limit:
+            self._members.popitem(last=False)
+        return True
+
+    def add(self, member: str) -> bool:
+        """Add a member, returning False if it was already present"""
+        with self._lock:
+            return self._insert(member)
+
+    def discard(self, member: str) -> None:
+        with self._lock:
+            self._members.pop(member, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._members.clear()
+
+    def __contains__(self, member) -> bool:
+        added_at = self._members.get(member)
+        return added_at is not None and (self.window is None or added_at >= time.time() - self.window)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.time())
+            return len(self._members)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            self._expire(time.time())
+            return iter(list(self._members))
+
+
+class BoundedLog:
+    """Append-only list of recent entries that keeps the last `maxlen`, like a deque"""
+
+    def __init__(self, maxlen: int, entries: Iterable[Any] = ()):
+        self.maxlen = maxlen
+        self._entries = deque(entries, maxlen=maxlen)
+
+    def append(self, entry: Any) -> None:
+        self._entries.append(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._entries))
+
+
+class StateStore:
+    """In-memory state store, the base for persistent backends. Nothing survives a restart"""
+
+    def load_values(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return {}
+
+    def set_value(self, key: str, value: Any) -> None:
+        pass
+
+    def delete_value(self, key: str) -> None:
+        pass
+
+    def member_set(self, namespace: str, limit: int = DEFAULT_SET_LIMIT, window: Optional[float] = None) -> BoundedSet:
+        return BoundedSet(limit, window=window)
+
+    def message_log(self, namespace: str, maxlen: int) -> BoundedLog:
+        return BoundedLog(maxlen)
+
+    def prune(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class _PersistentSet(BoundedSet):
+    def __init__(
+            self,
+            store: "SQLiteStateStore",
+            namespace: str,
+            limit: int,
+            window: Optional[float],
+            members: Iterable[Tuple[str, float]]
+    ):
+        super().__init__(limit, window=window)
+        for member, added_at in members:
+            self._insert(member, added_at)
+        self._store = store
+        self._namespace = namespace
+
+    def add(self, member: str) -> bool:
+        if not super().add(member):
+            return False
+        self._store._add_member(self._namespace, member)
+        return True
+
+    def discard(self, member: str) -> None:
+        super().discard(member)
+        self._store._delete_members(self._namespace, member)
+
+    def clear(self) -> None:
+        super().clear()
+        self._store._delete_members(self._namespace)
+
+
+class _PersistentLog(BoundedLog):
+    def __init__(self, store: "SQLiteStateStore", namespace: str, maxlen: int, entries: Iterable[Any]):
+        super().__init__(maxlen, entries)
+        self._store = store
+        self._namespace = namespace
+
+    def append(self, entry: Any) -> None:
+        super().append(entry)
+        self._store._append_entry(self._namespace, entry, self.maxlen)
+
+
+class SQLiteStateStore(StateStore):
+    """
+    State in one SQLite file, in WAL mode so a crash mid-write never loses
+    committed state. Values are only written when they change, set members and
+    log entries one row at a time as they are added.
+    """
+
+    def __init__(self, path: Path, retention_days: float = DEFAULT_RETENTION_DAYS):
+        self.path = Path(path).expanduser()
+        self.retention = retention_days * 24 * 3600
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Actions run in worker threads, all access goes through _lock
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS members (
+                namespace TEXT NOT NULL, member TEXT NOT NULL, added_at REAL NOT NULL,
+                PRIMARY KEY (namespace, member)
+            );
+            CREATE INDEX IF NOT EXISTS members_by_age ON members (namespace, added_at);
+            CREATE TABLE IF NOT EXISTS log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, namespace TEXT NOT NULL, entry TEXT NOT NULL, added_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS log_by_namespace ON log (namespace, id);
+        """)
+        # JSON last written per key, so unchanged values are not rewritten
+        self._written: Dict[str, str] = {}
+        self._set_limits: Dict[str, int] = {}
+        self._set_windows: Dict[str, Optional[float]] = {}
+        self._adds_since_prune = 0
+        self.prune()
+
+    def load_values(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT key, value FROM kv WHERE key IN ({','.join('?' * len(keys))})", keys
+            ).fetchall()
+        self._written.update(rows)
+        return {key: json.loads(value) for key, value in rows}
+
+    def set_value(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value)
+        if self._written.get(key) == encoded:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO kv (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, encoded, time.time())
+            )
+        self._written[key] = encoded
+
+    def delete_value(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM kv WHERE key = ?", (key,))
+        self._written.pop(key, None)
+
+    def member_set(self, namespace: str, limit: int = DEFAULT_SET_LIMIT, window: Optional[float] = None) -> BoundedSet:
+        self._set_limits[namespace] = limit
+        self._set_windows[namespace] = window
+        since = time.time() - window if window is not None else 0
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT member, added_at FROM members WHERE namespace = ? AND added_at >= ? "
+                "ORDER BY added_at DESC LIMIT ?",
+                (namespace, since, limit)
+            ).fetchall()
+        return _PersistentSet(self, namespace, limit, window, reversed(rows))
+
+    def message_log(self, namespace: str, maxlen: int) -> BoundedLog:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT entry FROM log WHERE namespace = ? ORDER BY id DESC LIMIT ?", (namespace, maxlen)
+            ).fetchall()
+        return _PersistentLog(self, namespace, maxlen, (json.loads(entry) for entry, in reversed(rows)))
+
+    def _add_member(self, namespace: str, member: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO members (namespace, member, added_at) VALUES (?, ?, ?)",
+                (namespace, str(member), time.time())
+            )
+            self._adds_since_prune += 1
+            prune = self._adds_since_prune >= PRUNE_EVERY
+        if prune:
+            self.prune()
+
+    def _delete_members(self, namespace: str, member: Optional[str] = None) -> None:
+        with self._lock:
+            if member is None:
+                self._db.execute("DELETE FROM members WHERE namespace = ?", (namespace,))
+            else:
+                self._db.execute("DELETE FROM members WHERE namespace = ? AND member = ?", (namespace, str(member)))
+
+    def _append_entry(self, namespace: str, entry: Any, maxlen: int) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO log (namespace, entry, added_at) VALUES (?, ?, ?)",
+                (namespace, json.dumps(entry), time.time())
+            )
+            self._db.execute(
+                "DELETE FROM log WHERE namespace = ? AND id <= "
+                "(SELECT id FROM log WHERE namespace = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (namespace, namespace, maxlen)
+            )
+
+    def prune(self) -> None:
+        """Drop set members older than the retention period, or past their set's limit"""
+        with self._lock:
+            self._adds_since_prune = 0
+            now = time.time()
+            # Sets with a window longer than the retention period keep members for their whole window
+            longer = {ns: window for ns, window in self._set_windows.items() if window and window > self.retention}
+            self._db.execute(
+                f"DELETE FROM members WHERE added_at < ? AND namespace NOT IN ({','.join('?' * len(longer))})",
+                (now - self.retention, *longer)
+            )
+            for namespace, window in longer.items():
+                self._db.execute(
+                    "DELETE FROM members WHERE namespace = ? AND added_at < ?", (namespace, now - window)
+                )
+            for namespace, limit in self._set_limits.items():
+                self._db.execute(
+                    "DELETE FROM members WHERE namespace = ? AND added_at <= "
+                    "(SELECT added_at FROM members WHERE namespace = ? ORDER BY added_at DESC LIMIT 1 OFFSET ?)",
+                    (namespace, namespace, limit)
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+STATE_STORES: Dict[str, Type[StateStore]] = {
+    "memory": StateStore,
+    "sqlite": SQLiteStateStore,
+}
+
+
+def open_state_store(agent_name: str, config: Optional[Dict[str, Any]] = None) -> StateStore:
+    """Open the state store an agent's "state_store" config asks for, SQLite by default"""
+    config = config or {}
+    backend = config.get("backend", "sqlite")
+    if backend not in STATE_STORES:
+        raise ValueError(f"Unknown state store backend '{backend}', expected one of {', '.join(STATE_STORES)}")
+    if backend == "memory":
+        return StateStore()
+
+    path = config.get("path") or DEFAULT_STATE_DIR / f"{agent_name}.db"
+    try:
+        return SQLiteStateStore(path, config.get("retention_days", DEFAULT_RETENTION_DAYS))
+    except sqlite3.Error as e:
+        logger.warning(f"Could not open state store at {path}, state will not persist: {e}")
+        return StateStore()
+
+
+class AgentState(dict):
+    """
+    agent.state, writing the values of `persisted_keys` through to a StateStore
+
+    Keys in `persisted_sets` map to (limit, window) and hold bounded sets
+    backed by the store, so actions that do state[key].add(id) persist each id
+    as it is added.
+    """
+
+    def __init__(
+            self,
+            store: StateStore,
+            persisted_keys: Iterable[str],
+            persisted_sets: Dict[str, Tuple[int, Optional[float]]]
+    ):
+        super().__init__()
+        self.store = store
+        self.persisted_keys = set(persisted_keys)
+        self.persisted_sets = dict(persisted_sets)
+        super().update(store.load_values(self.persisted_keys))
+        for key, (limit, window) in self.persisted_sets.items():
+            super().__setitem__(key, store.member_set(key, limit, window))
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.persisted_sets and not isinstance(value, BoundedSet):
+            # Assigning a plain set replaces the members of the persistent one
+            members = self[key]
+            members.clear()
+            for member in value:
+                members.add(member)
+            return
+        super().__setitem__(key, value)
+        if key in self.persisted_keys:
+            self.store.set_value(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        if key in self.persisted_keys:
+            self.store.delete_value(key)
@@ -0,0 +1,299 @@
+"""
+Chain subscriptions for agents
+
+Watches new blocks and incoming ERC-20 transfers on EVM chains (Sonic,
+Ethereum, EVM, Monad) and account changes on Solana, and feeds them into an
+in-process event queue. Events are deduplicated by id, and each watcher's
+position is checkpointed to disk, so a restarted agent resumes where it
+stopped instead of replaying or missing events.
+
+Subscriptions are listed under "subscriptions" in the agent JSON:
+
+    {"connection": "sonic", "events": ["blocks", "transfers"], "task": "react-to-transfer"}
+    {"connection": "solana", "accounts": ["<pubkey>"], "rpc": "http://127.0.0.1:8899"}
+
+"rpc" points a watcher at another node, e.g. a local anvil or
+solana-test-validator, and "task" names an action to run for each event.
+"""
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from src.helpers.checkpoints import CheckpointStore
+
+if TYPE_CHECKING:
+    from web3 import Web3
+
+logger = logging.getLogger("subscriptions")
+
+# keccak("Transfer(address,address,uint256)"), spelled out so importing this module does not load web3
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+DEFAULT_POLL_INTERVAL = 2
+# Widest block range asked for in one eth_getLogs call
+MAX_LOG_RANGE = 2000
+# Block events emitted when catching up after downtime; older blocks are skipped
+MAX_BLOCK_BACKFILL = 20
+EVENT_QUEUE_SIZE = 1000
+SEEN_EVENTS_LIMIT = 10000
+
+# Environment variables holding each EVM connection's wallet key, in lookup order
+WALLET_KEY_ENV = {
+    "sonic": ["SONIC_PRIVATE_KEY"],
+    "ethereum": ["ETH_PRIVATE_KEY"],
+    "evm": ["EVM_PRIVATE_KEY", "ETH_PRIVATE_KEY"],
+    "monad": ["MONAD_PRIVATE_KEY"],
+}
+
+
+@dataclass
+class ChainEvent:
+    subscription: str
+    kind: str  # "block", "transfer" or "account"
+    id: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    task: Optional[str] = None
+
+
+class EventQueue:
+    """Bounded queue of chain events that drops events it has already seen"""
+
+    def __init__(self, maxsize: int = EVENT_QUEUE_SIZE, seen_limit: int = SEEN_EVENTS_LIMIT):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self.seen_limit = seen_limit
+
+    def put(self, event: ChainEvent) -> bool:
+        """Queue an event, returning False for duplicates. When full, the oldest event is dropped"""
+        if event.id in self._seen:
+            return False
+        self._seen[event.id] = None
+        while len(self._seen) > self.seen_limit:
+            self._seen.popitem(last=False)
+
+        if self._queue.full():
+            dropped = self._queue.get_nowait()
+            logger.warning(f"Event queue full, dropping {dropped.kind} event {dropped.id}")
+        self._queue.put_nowait(event)
+        return True
+
+    async def get(self) -> ChainEvent:
+        return await self._queue.get()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+class Watcher(ABC):
+    def __init__(self, name: str, checkpoints: CheckpointStore, poll_interval: float, task: Optional[str]):
+        self.name = name
+        self.checkpoints = checkpoints
+        self.poll_interval = poll_interval
+        self.task = task
+
+    @abstractmethod
+    async def poll(self, queue: EventQueue) -> None:
+        """Check the chain once and queue any new events"""
+        pass
+
+    async def run(self, queue: EventQueue) -> None:
+        logger.info(f"👀 Watching {self.name}")
+        while True:
+            try:
+                await self.poll(queue)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Subscription {self.name} poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+class EvmWatcher(Watcher):
+    """Polls an EVM node for new blocks and ERC-20 Transfer logs to `address`"""
+
+    def __init__(
+            self,
+            name: str,
+            web3: "Web3",
+            checkpoints: CheckpointStore,
+            address: Optional[str] = None,
+            events: Optional[List[str]] = None,
+            poll_interval: float = DEFAULT_POLL_INTERVAL,
+            task: Optional[str] = None
+    ):
+        super().__init__(name, checkpoints, poll_interval, task)
+        from web3 import Web3
+
+        self.web3 = web3
+        self._checksum = Web3.to_checksum_address
+        self.address = self._checksum(address) if address else None
+        self.events = events or ["blocks", "transfers"]
+        self._checkpoint_key = f"{name}:block"
+
+    def _address_topic(self) -> str:
+        return "0x" + "0" * 24 + self.address[2:].lower()
+
+    async def poll(self, queue: EventQueue) -> None:
+        latest = await asyncio.to_thread(lambda: self.web3.eth.block_number)
+        last = self.checkpoints.get(self._checkpoint_key)
+        if last is None:
+            # First run: start from the current head rather than replaying history
+            self.checkpoints.set(self._checkpoint_key, latest)
+            return
+        if latest <= last:
+            return
+
+        if "blocks" in self.events:
+            for number in range(max(last + 1, latest - MAX_BLOCK_BACKFILL + 1), latest + 1):
+                block = await asyncio.to_thread(self.web3.eth.get_block, number)
+                block_hash = block["hash"].hex()
+                queue.put(ChainEvent(self.name, "block", f"{self.name}:block:{block_hash}", {
+                    "number": number,
+                    "hash": block_hash,
+                    "timestamp": block["timestamp"],
+                    "transactions": len(block["transactions"])
+                }, self.task))
+
+        if "transfers" in self.events and self.address:
+            start = last + 1
+            while start <= latest:
+                end = min(start + MAX_LOG_RANGE - 1, latest)
+                logs = await asyncio.to_thread(self.web3.eth.get_logs, {
+                    "fromBlock": start,
+                    "toBlock": end,
+                    "topics": [TRANSFER_TOPIC, None, self._address_topic()]
+                })
+                for log in logs:
+                    # ERC-721 transfers share the signature but index the token id as a fourth topic
+                    if len(log["topics"]) != 3:
+                        continue
+                    tx_hash = log["transactionHash"].hex()
+                    queue.put(ChainEvent(self.name, "transfer", f"{self.name}:transfer:{tx_hash}:{log['logIndex']}", {
+                        "token": log["address"],
+                        "from": self._checksum("0x" + bytes(log["topics"][1])[-20:].hex()),
+                        "to": self.address,
+                        "value": int.from_bytes(bytes(log["data"]), "big"),
+                        "block": log["blockNumber"],
+                        "tx_hash": tx_hash
+                    }, self.task))
+                self.checkpoints.set(self._checkpoint_key, end)
+                start = end + 1
+
+        self.checkpoints.set(self._checkpoint_key, latest)
+
+
+class SolanaAccountWatcher(Watcher):
+    """Polls a Solana node for lamport or data changes on a set of accounts"""
+
+    def __init__(
+            self,
+            name: str,
+            rpc_url: str,
+            accounts: List[str],
+            checkpoints: CheckpointStore,
+            poll_interval: float = DEFAULT_POLL_INTERVAL,
+            task: Optional[str] = None
+    ):
+        super().__init__(name, checkpoints, poll_interval, task)
+        self.rpc_url = rpc_url
+        self.accounts = accounts
+        self._client = None
+
+    async def poll(self, queue: EventQueue) -> None:
+        from solana.rpc.async_api import AsyncClient
+        from solana.rpc.commitment import Confirmed
+        from solders.pubkey import Pubkey  # type: ignore
+
+        if self._client is None:
+            self._client = AsyncClient(self.rpc_url)
+        response = await self._client.get_multiple_accounts(
+            [Pubkey.from_string(account) for account in self.accounts], commitment=Confirmed
+        )
+        slot = response.context.slot
+
+        for account, info in zip(self.accounts, response.value):
+            state = None if info is None else {
+                "lamports": info.lamports,
+                "owner": str(info.owner),
+                "data_hash": hashlib.sha256(bytes(info.data)).hexdigest()
+            }
+            key = f"{self.name}:account:{account}"
+            previous = self.checkpoints.get(key, "unseen")
+            if state == previous:
+                continue
+            self.checkpoints.set(key, state)
+            if previous == "unseen":
+                continue
+
+            data = {"account": account, "slot": slot, "state": state}
+            if state and previous:
+                data["lamports_change"] = state["lamports"] - previous["lamports"]
+            queue.put(ChainEvent(self.name, "account", f"{self.name}:account:{account}:{slot}", data, self.task))
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class SubscriptionEngine:
+    """Builds watchers from an agent's subscription config and runs them on the current event loop"""
+
+    def __init__(self, connection_manager, subscriptions: List[Dict[str, Any]], checkpoint_path: Optional[Path] = None):
+        self.queue = EventQueue()
+        self.checkpoints = CheckpointStore(checkpoint_path)
+        self.watchers: List[Watcher] = []
+        self._tasks: List[asyncio.Task] = []
+        for config in subscriptions:
+            try:
+                self.watchers.append(self._build_watcher(connection_manager, config))
+            except Exception as e:
+                logger.error(f"Could not set up subscription {config.get('connection')}: {e}")
+
+    def _build_watcher(self, connection_manager, config: Dict[str, Any]) -> Watcher:
+        name = config["connection"]
+        connection = connection_manager.connections.get(name)
+        poll_interval = config.get("poll_interval", DEFAULT_POLL_INTERVAL)
+        task = config.get("task")
+
+        if name == "solana":
+            rpc_url = config.get("rpc") or (connection.config["rpc"] if connection else None)
+            if not rpc_url:
+                raise ValueError("No Solana RPC configured")
+            accounts = config.get("accounts")
+            if not accounts:
+                from solders.keypair import Keypair  # type: ignore
+                accounts = [str(Keypair.from_base58_string(os.getenv("SOLANA_PRIVATE_KEY")).pubkey())]
+            return SolanaAccountWatcher(name, rpc_url, accounts, self.checkpoints, poll_interval, task)
+
+        from web3 import Web3
+
+        if config.get("rpc"):
+            web3 = Web3(Web3.HTTPProvider(config["rpc"]))
+        elif connection is not None and getattr(connection, "_web3", None) is not None:
+            web3 = connection._web3
+        else:
+            raise ValueError(f"No RPC for {name}; configure the connection or set \"rpc\"")
+
+        address = config.get("address")
+        if not address:
+            key = next((os.getenv(env) for env in WALLET_KEY_ENV.get(name, []) if os.getenv(env)), None)
+            address = web3.eth.account.from_key(key).address if key else None
+        return EvmWatcher(name, web3, self.checkpoints, address, config.get("events"), poll_interval, task)
+
+    def start(self) -> List[asyncio.Task]:
+        self._tasks = [asyncio.create_task(watcher.run(self.queue)) for watcher in self.watchers]
+        return self._tasks
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for watcher in self.watchers:
+            if isinstance(watcher, SolanaAccountWatcher):
+                await watcher.close()
@@ -0,0 +1,167 @@
+"""
+Background Twitter ingestion for agents
+
+The filtered stream pushes mentions to the agent as they are posted, instead
+of the agent polling read-timeline every INPUT_REFRESH_DELAY seconds. Streamed
+and polled tweets share one bounded, deduplicated TweetQueue that the reply
+and like actions draw from, so a tweet is never engaged with twice.
+"""
+import logging
+import random
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.helpers.rate_limit import RateLimited
+from src.state_store import BoundedSet
+
+logger = logging.getLogger("tweet_stream")
+
+TWEET_QUEUE_SIZE = 200
+SEEN_TWEETS_LIMIT = 10000
+
+# Reconnect backoff, doubled after each failed connection, per Twitter's filtered stream guidelines
+STREAM_MIN_BACKOFF = 5
+STREAM_MAX_BACKOFF = 320
+
+
+class TweetQueue:
+    """
+    Bounded queue of tweets waiting to be replied to or liked
+
+    Supports the list operations the Twitter actions use (len, pop(0), extend),
+    so it can stand in for the plain list in agent.state["timeline_tweets"].
+    Tweets already queued or consumed are dropped; when full, the oldest tweet
+    is dropped. A tweet counts as seen once an action pops it, so one dropped
+    for space can be queued again later. Passing a persistent `seen` set keeps
+    that memory across restarts.
+    """
+
+    def __init__(self, maxsize: int = TWEET_QUEUE_SIZE, seen: Optional[BoundedSet] = None):
+        self.maxsize = maxsize
+        self._tweets: deque = deque()
+        self._queued: set = set()
+        self._seen = seen if seen is not None else BoundedSet(SEEN_TWEETS_LIMIT)
+        self._lock = threading.Lock()
+
+    def add(self, tweet: Dict[str, Any], front: bool = False) -> bool:
+        """Queue a tweet, returning False if it is queued or was consumed before. `front` puts it ahead of polled tweets"""
+        tweet_id = tweet.get("id")
+        with self._lock:
+            if tweet_id is not None:
+                if tweet_id in self._queued or tweet_id in self._seen:
+                    return False
+                self._queued.add(tweet_id)
+
+            if len(self._tweets) >= self.maxsize:
+                # Mentions sit at the front, so drop from the back when one comes in
+                dropped = self._tweets.pop() if front else self._tweets.popleft()
+                self._queued.discard(dropped.get("id"))
+            if front:
+                self._tweets.appendleft(tweet)
+            else:
+                self._tweets.append(tweet)
+            return True
+
+    def append(self, tweet: Dict[str, Any]) -> None:
+        self.add(tweet)
+
+    def extend(self, tweets: Optional[Iterable[Dict[str, Any]]]) -> int:
+        """Queue several tweets, returning how many were new"""
+        return sum(self.add(tweet) for tweet in tweets or [])
+
+    def pop(self, index: int = 0) -> Dict[str, Any]:
+        """Take a tweet for an action to engage with, marking it seen"""
+        with self._lock:
+            if index == 0:
+                tweet = self._tweets.popleft()
+            elif index == -1:
+                tweet = self._tweets.pop()
+            else:
+                tweet = self._tweets[index]
+                del self._tweets[index]
+            tweet_id = tweet.get("id")
+            if tweet_id is not None:
+                self._queued.discard(tweet_id)
+                self._seen.add(tweet_id)
+            return tweet
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tweets)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._tweets))
+
+
+class TweetStreamConsumer:
+    """Keeps a filtered stream open in a daemon thread, reconnecting with backoff, and feeds a TweetQueue"""
+
+    def __init__(
+            self,
+            connection_manager,
+            filter_string: str,
+            queue: TweetQueue,
+            on_tweet: Optional[Callable[[Dict[str, Any]], None]] = None,
+            min_backoff: float = STREAM_MIN_BACKOFF,
+            max_backoff: float = STREAM_MAX_BACKOFF
+    ):
+        self.connection_manager = connection_manager
+        self.filter_string = filter_string
+        self.queue = queue
+        self.on_tweet = on_tweet
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tweet-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        # The thread exits at the next tweet, keep-alive or reconnect; it is a daemon so it never blocks shutdown
+        self._stop.set()
+
+    def _run(self) -> None:
+        backoff = self.min_backoff
+        while not self._stop.is_set():
+            logger.info(f"📡 Connecting to Twitter stream for '{self.filter_string}'")
+            stream = self.connection_manager.perform_action(
+                connection_name="twitter",
+                action_name="stream-tweets",
+                params=[self.filter_string]
+            )
+            delay = None
+            try:
+                for tweet in stream or []:
+                    if self._stop.is_set():
+                        return
+                    # Receiving tweets means the connection is healthy again
+                    backoff = self.min_backoff
+                    if self.queue.add(tweet, front=True):
+                        logger.info(f"\n📨 Streamed tweet: {tweet.get('text', '')[:50]}...")
+                        if self.on_tweet:
+                            self.on_tweet(tweet)
+                if stream is not None:
+                    logger.warning("Twitter stream closed by server")
+            except RateLimited as e:
+                # Too many connection attempts; wait out the window rather than the backoff
+                logger.warning(str(e))
+                delay = e.retry_after
+            except Exception as e:
+                logger.warning(f"Twitter stream dropped: {e}")
+
+            if delay is None:
+                delay = backoff + random.uniform(0, backoff / 4)
+            logger.info(f"⏳ Reconnecting to Twitter stream in {delay:.0f} seconds")
+            self._stop.wait(delay)
+            backoff = min(backoff * 2, self.max_backoff)
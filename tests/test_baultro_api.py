@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import pytest
+
+from src import baultro_api
+
+
+class StubConnectionManager:
+    def __init__(self):
+        self.streamed = []
+
+    def get_model_providers(self):
+        return ["stub"]
+
+    def stream_text(self, connection_name, prompt, system_prompt, model=None):
+        self.streamed.append(connection_name)
+        yield "Hello"
+        yield ", world"
+
+
+class StubAgent:
+    def __init__(self, name):
+        self.name = name
+        self.connection_manager = StubConnectionManager()
+
+    def _construct_system_prompt(self):
+        return "You are a test agent."
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(baultro_api, "ZerePyAgent", StubAgent)
+    monkeypatch.setattr(baultro_api, "agent_cache", {})
+    monkeypatch.setattr(baultro_api, "default_llm_provider", None)
+    monkeypatch.setattr(baultro_api, "MOCK_LLM", False)
+    monkeypatch.setattr(baultro_api, "response_cache", None)
+    return baultro_api
+
+
+def read_events(response):
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+    body = "".join(asyncio.run(collect()))
+    return [event.removeprefix("data: ") for event in body.split("\n\n") if event]
+
+
+def test_get_default_agent_sets_the_default_provider(api):
+    api.get_default_agent()
+    assert api.default_llm_provider == "stub"
+
+
+def test_generate_streams_through_the_default_provider(api):
+    response = asyncio.run(api.generate_content(api.PromptRequest(prompt="hi", stream=True)))
+
+    events = read_events(response)
+    assert [json.loads(event)["text"] for event in events[:-1]] == ["Hello", ", world"]
+    assert events[-1] == "[DONE]"
+    assert api.agent_cache["default"].connection_manager.streamed == ["stub"]
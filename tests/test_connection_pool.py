@@ -0,0 +1,231 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src import connection_pool
+from src.connection_manager import ConnectionManager
+from src.connection_pool import ConfigurationStatusCache, ConnectionPool
+from src.connections.base_connection import Action, BaseConnection
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(connection_pool.time, "monotonic", clock)
+    return clock
+
+
+class FakeConnection(BaseConnection):
+    @property
+    def is_llm_provider(self):
+        return False
+
+    def validate_config(self, config):
+        return config
+
+    def configure(self, **kwargs):
+        return True
+
+    def is_configured(self, verbose=False):
+        return True
+
+    def register_actions(self):
+        self.actions = {}
+
+    def perform_action(self, action_name, kwargs):
+        return None
+
+
+class StatefulConnection(FakeConnection):
+    poolable = False
+
+
+class BusyConnection(FakeConnection):
+    """Holds each action for a moment and records the most actions it ran at once"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def register_actions(self):
+        self.actions = {"work": Action("work", [], "Hold a slot for a moment")}
+
+    def perform_action(self, action_name, kwargs):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.05)
+        with self._lock:
+            self.running -= 1
+        return True
+
+
+class SlowConnection(FakeConnection):
+    """Takes `delay` seconds to construct, like chain connections making RPC round-trips"""
+
+    def __init__(self, config):
+        time.sleep(config["delay"])
+        super().__init__(config)
+
+
+class BrokenConnection(FakeConnection):
+    def __init__(self, config):
+        raise ValueError("bad config")
+
+
+@pytest.fixture
+def connection_types(monkeypatch):
+    """Connection names resolvable by ConnectionManager in these tests"""
+    types = {"busy": BusyConnection, "slow": SlowConnection, "slower": SlowConnection, "broken": BrokenConnection}
+    monkeypatch.setattr(ConnectionManager, "_class_name_to_type", staticmethod(types.get))
+    return types
+
+
+class StatusConnection:
+    """Answers is_configured() from a list of results, raising the ones that are exceptions"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.checks = 0
+
+    def is_configured(self, verbose=False):
+        self.checks += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_status_cache_keeps_configured_results_for_the_ttl(clock):
+    cache = ConfigurationStatusCache(ttl=300, negative_ttl=5)
+    connection = StatusConnection(True, True)
+
+    assert cache.get("openai", connection)
+    clock.now += 299
+    assert cache.get("openai", connection)
+    assert connection.checks == 1
+
+    clock.now += 2
+    assert cache.get("openai", connection)
+    assert connection.checks == 2
+
+
+def test_status_cache_rechecks_unconfigured_results_soon(clock):
+    cache = ConfigurationStatusCache(ttl=300, negative_ttl=5)
+    connection = StatusConnection(False, True)
+
+    assert not cache.get("openai", connection)
+    assert not cache.get("openai", connection)
+    assert connection.checks == 1
+
+    clock.now += 6
+    assert cache.get("openai", connection)
+    assert connection.checks == 2
+
+
+def test_status_cache_does_not_cache_exceptions(clock):
+    cache = ConfigurationStatusCache()
+    connection = StatusConnection(ConnectionError("timed out"), True)
+
+    with pytest.raises(ConnectionError):
+        cache.get("openai", connection)
+    assert cache.get("openai", connection)
+    assert connection.checks == 2
+
+
+def test_status_cache_refresh_and_invalidate(clock):
+    cache = ConfigurationStatusCache()
+    connection = StatusConnection(True, False, True)
+
+    assert cache.get("openai", connection)
+    assert not cache.get("openai", connection, refresh=True)
+    cache.invalidate("openai")
+    assert cache.get("openai", connection)
+    assert connection.checks == 3
+
+
+def test_pool_shares_connections_with_the_same_config():
+    pool = ConnectionPool()
+    first = pool.acquire("fake", FakeConnection, {"model": "a"})
+    second = pool.acquire("fake", FakeConnection, {"model": "a"})
+    other = pool.acquire("fake", FakeConnection, {"model": "b"})
+
+    assert first == second
+    assert pool.get(first) is pool.get(second)
+    assert pool.get(other) is not pool.get(first)
+    assert pool.size == 2
+
+
+def test_pool_gives_stateful_connections_an_instance_each():
+    pool = ConnectionPool()
+    first = pool.acquire("stateful", StatefulConnection, {"room": "general"})
+    second = pool.acquire("stateful", StatefulConnection, {"room": "general"})
+
+    assert first != second
+    assert pool.get(first) is not pool.get(second)
+
+
+def test_managers_sharing_a_pool_share_the_connection_and_its_limit(connection_types):
+    pool = ConnectionPool()
+    config = [{"name": "busy", "max_concurrency": 2}]
+    managers = [ConnectionManager(config, connection_pool=pool) for _ in range(3)]
+    connection = managers[0].connections["busy"]
+    assert all(manager.connections["busy"] is connection for manager in managers)
+
+    threads = [
+        threading.Thread(target=manager.perform_action, args=("busy", "work", []))
+        for manager in managers for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert connection.peak == 2
+
+
+def test_async_actions_share_the_pooled_limit(connection_types):
+    pool = ConnectionPool()
+    config = [{"name": "busy", "max_concurrency": 1}]
+    first, second = ConnectionManager(config, connection_pool=pool), ConnectionManager(config, connection_pool=pool)
+
+    async def run():
+        return await asyncio.gather(*(
+            manager.perform_action_async("busy", "work", []) for manager in (first, second) for _ in range(2)
+        ))
+
+    assert asyncio.run(run()) == [True] * 4
+    assert first.connections["busy"].peak == 1
+
+
+def test_connections_initialize_concurrently(connection_types):
+    config = [{"name": "slow", "delay": 0.3}, {"name": "slower", "delay": 0.3}, {"name": "busy"}]
+
+    started = time.monotonic()
+    manager = ConnectionManager(config)
+    assert time.monotonic() - started < 0.55
+    assert list(manager.connections) == ["slow", "slower", "busy"]
+
+
+def test_slow_and_failing_connections_are_left_out(connection_types):
+    config = [
+        {"name": "slow", "delay": 1, "init_timeout": 0.1},
+        {"name": "broken"},
+        {"name": "busy"},
+    ]
+
+    started = time.monotonic()
+    manager = ConnectionManager(config)
+    assert time.monotonic() - started < 0.5
+    assert list(manager.connections) == ["busy"]
@@ -0,0 +1,200 @@
+import pytest
+from farcaster.models import ApiCast, IterableCastsResult
+
+from src.connection_manager import ConnectionManager
+from src.connection_pool import ConnectionPool
+from src.connections import farcaster_connection, twitter_connection
+from src.connections.base_connection import Action, BaseConnection
+from src.connections.farcaster_connection import FarcasterConnection
+from src.connections.twitter_connection import TwitterConnection
+from src.helpers import checkpoints
+from src.helpers.checkpoints import CheckpointStore, cursor_scope, get_cursor_store
+
+
+@pytest.fixture
+def cursors(monkeypatch):
+    store = CheckpointStore()
+    monkeypatch.setattr(checkpoints, "_cursors", store)
+    return store
+
+
+class CursorReader(BaseConnection):
+    """Reads a counter's new values, keeping its read position in the cursor store like the social readers"""
+
+    head = 0
+
+    @property
+    def is_llm_provider(self):
+        return False
+
+    def validate_config(self, config):
+        return config
+
+    def configure(self, **kwargs):
+        return True
+
+    def is_configured(self, verbose=False):
+        return True
+
+    def register_actions(self):
+        self.actions = {"read-new": Action("read-new", [], "Read values since the last read")}
+
+    def perform_action(self, action_name, kwargs):
+        cursors = get_cursor_store()
+        seen = cursors.get("counter", 0)
+        cursors.set("counter", self.head)
+        return list(range(seen + 1, self.head + 1))
+
+
+class FakeTwitter(TwitterConnection):
+    """Serves tweet list endpoints from a newest-first list of ids, `page_size` per page"""
+
+    def __init__(self, ids, page_size):
+        self.ids = ids
+        self.page_size = page_size
+        self.requests = []
+
+    def _make_request(self, method, endpoint, **kwargs):
+        params = kwargs["params"]
+        self.requests.append(params)
+        since_id = int(params.get("since_id", 0))
+        ids = [tweet_id for tweet_id in self.ids if tweet_id > since_id]
+        start = int(params.get("pagination_token", 0))
+        page = ids[start:start + self.page_size]
+        meta = {"newest_id": str(page[0])} if page else {}
+        if start + self.page_size < len(ids):
+            meta["next_token"] = str(start + self.page_size)
+        return {
+            "data": [{"id": str(tweet_id)} for tweet_id in page],
+            "includes": {"users": [{"id": f"user{start}"}]},
+            "meta": meta,
+        }
+
+
+def read(twitter):
+    return twitter._read_since("twitter:timeline:1", "timeline", {"max_results": twitter.page_size}, True)
+
+
+def test_checkpoint_store_persists_cursor_advance(tmp_path):
+    path = tmp_path / "cursors.json"
+    store = CheckpointStore(path)
+    assert store.get("twitter:timeline:1") is None
+
+    store.set("twitter:timeline:1", "10")
+    store.set("twitter:timeline:1", "20")
+    assert CheckpointStore(path).get("twitter:timeline:1") == "20"
+
+
+def test_cursor_scopes_are_separate(cursors):
+    get_cursor_store().set("twitter:timeline:1", "10")
+    with cursor_scope("alice"):
+        assert get_cursor_store().get("twitter:timeline:1") is None
+        get_cursor_store().set("twitter:timeline:1", "20")
+    with cursor_scope("bob"):
+        assert get_cursor_store().get("twitter:timeline:1") is None
+
+    assert get_cursor_store().get("twitter:timeline:1") == "10"
+    assert cursors.get("alice:twitter:timeline:1") == "20"
+
+
+def test_agents_sharing_a_pooled_connection_keep_their_own_cursors(cursors):
+    pool = ConnectionPool()
+    managers = []
+    for agent in ("alice", "bob"):
+        manager = ConnectionManager([], connection_pool=pool, cursor_scope=agent)
+        key = pool.acquire("reader", CursorReader, {})
+        manager.connections["reader"] = pool.get(key)
+        manager._pool_keys["reader"] = key
+        managers.append(manager)
+    alice, bob = managers
+    reader = pool.get(alice._pool_keys["reader"])
+    assert reader is pool.get(bob._pool_keys["reader"])
+
+    reader.head = 3
+    assert alice.perform_action("reader", "read-new", []) == [1, 2, 3]
+    reader.head = 5
+    assert bob.perform_action("reader", "read-new", []) == [1, 2, 3, 4, 5]
+    assert alice.perform_action("reader", "read-new", []) == [4, 5]
+
+
+def test_twitter_first_read_takes_one_page(cursors):
+    twitter = FakeTwitter(list(range(30, 0, -1)), page_size=10)
+
+    response = read(twitter)
+    assert len(response["data"]) == 10
+    assert len(twitter.requests) == 1
+    assert cursors.get("twitter:timeline:1") == "30"
+
+
+def test_twitter_follows_pages_back_to_the_cursor(cursors):
+    cursors.set("twitter:timeline:1", "5")
+    twitter = FakeTwitter(list(range(30, 0, -1)), page_size=10)
+
+    response = read(twitter)
+    assert [int(tweet["id"]) for tweet in response["data"]] == list(range(30, 5, -1))
+    assert len(response["includes"]["users"]) == 3
+    assert cursors.get("twitter:timeline:1") == "30"
+
+    twitter.ids = [31] + twitter.ids
+    assert [tweet["id"] for tweet in read(twitter)["data"]] == ["31"]
+
+
+def test_twitter_backfill_is_capped(cursors, monkeypatch, caplog):
+    monkeypatch.setattr(twitter_connection, "MAX_BACKFILL_PAGES", 2)
+    cursors.set("twitter:timeline:1", "1")
+    twitter = FakeTwitter(list(range(50, 0, -1)), page_size=10)
+
+    response = read(twitter)
+    assert len(response["data"]) == 20
+    assert "older ones are skipped" in caplog.text
+    assert cursors.get("twitter:timeline:1") == "50"
+
+
+class FakeFarcaster(FarcasterConnection):
+    def __init__(self):
+        pass
+
+
+def make_fetch(timestamps):
+    """Newest-first pages over casts with the given timestamps, cursors being offsets"""
+    fetched = []
+
+    def fetch(cursor, limit):
+        start = int(cursor or 0)
+        fetched.append((start, limit))
+        page = timestamps[start:start + limit]
+        casts = [ApiCast.model_construct(hash=f"0x{ts:x}", timestamp=ts) for ts in page]
+        next_cursor = str(start + limit) if start + limit < len(timestamps) else None
+        return IterableCastsResult(casts=casts, cursor=next_cursor)
+
+    return fetch, fetched
+
+
+def test_farcaster_first_read_takes_the_newest_casts(cursors):
+    fetch, fetched = make_fetch(list(range(100, 0, -1)))
+
+    result = FakeFarcaster()._read_new_casts("farcaster:timeline", fetch, 10)
+    assert [cast.timestamp for cast in result.casts] == list(range(100, 90, -1))
+    assert fetched == [(0, 10)]
+    assert cursors.get("farcaster:timeline") == 100
+
+
+def test_farcaster_follows_pages_back_to_the_cursor(cursors):
+    cursors.set("farcaster:timeline", 40)
+    fetch, fetched = make_fetch(list(range(100, 0, -1)))
+
+    result = FakeFarcaster()._read_new_casts("farcaster:timeline", fetch, 10)
+    assert [cast.timestamp for cast in result.casts] == list(range(100, 40, -1))
+    assert len(fetched) == 3
+    assert cursors.get("farcaster:timeline") == 100
+
+
+def test_farcaster_backfill_is_capped(cursors, monkeypatch, caplog):
+    monkeypatch.setattr(farcaster_connection, "FARCASTER_MAX_BACKFILL_PAGES", 2)
+    cursors.set("farcaster:timeline", 1)
+    fetch, fetched = make_fetch(list(range(100, 0, -1)))
+
+    result = FakeFarcaster()._read_new_casts("farcaster:timeline", fetch, 10)
+    assert len(result.casts) == 2 * farcaster_connection.FARCASTER_PAGE_SIZE
+    assert "older ones are skipped" in caplog.text
+    assert cursors.get("farcaster:timeline") == 100
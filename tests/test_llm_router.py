@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src import llm_router
+from src.helpers.rate_limit import RateLimited
+from src.llm_router import FAILURE_COOLDOWN, MAX_FAILURE_COOLDOWN, LLMRouter
+
+
+class FakeConnectionManager:
+    """
+    Answers generate-text per provider from a (delay, result) pair, recording
+    which providers were called. A result that is an exception is raised.
+    """
+
+    def __init__(self, **behaviour):
+        self.behaviour = behaviour
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _answer(self, connection_name):
+        with self._lock:
+            self.calls.append(connection_name)
+        delay, result = self.behaviour[connection_name]
+        return delay, result
+
+    def perform_action(self, connection_name, action_name, params):
+        delay, result = self._answer(connection_name)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def perform_action_async(self, connection_name, action_name, params):
+        delay, result = self._answer(connection_name)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def measure(router, provider, *latencies):
+    for latency in latencies:
+        router._record(provider, latency, True)
+
+
+def test_unmeasured_providers_rank_first_then_by_latency():
+    router = LLMRouter(FakeConnectionManager(), ["a", "b", "c", "d"])
+    measure(router, "a", 3.0, 3.0, 3.0)
+    measure(router, "c", 1.0, 1.0, 1.0)
+    measure(router, "d", 2.0)
+
+    assert router.ranked() == ["b", "c", "d", "a"]
+
+
+def test_fails_over_and_cools_down_the_failed_provider():
+    manager = FakeConnectionManager(a=(0, None), b=(0, "from b"))
+    router = LLMRouter(manager, ["a", "b"])
+    started = time.time()
+
+    assert router.generate("prompt", "system") == "from b"
+    assert manager.calls == ["a", "b"]
+    assert router._stats["a"].cooldown_until == pytest.approx(started + FAILURE_COOLDOWN, abs=1)
+
+    # "a" is cooling down, so the next request goes straight to "b"
+    assert router.ranked() == ["b", "a"]
+    assert router.generate("prompt", "system") == "from b"
+    assert manager.calls == ["a", "b", "b"]
+    assert not router.stats()["a"]["healthy"]
+
+
+def test_failover_async():
+    manager = FakeConnectionManager(a=(0, RateLimited("a", "generate-text", time.time() + 60)), b=(0, "from b"))
+    router = LLMRouter(manager, ["a", "b"])
+
+    assert asyncio.run(router.generate_async("prompt", "system")) == "from b"
+    assert manager.calls == ["a", "b"]
+
+
+def test_cooldown_doubles_with_consecutive_failures(monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(llm_router.time, "time", lambda: now)
+    router = LLMRouter(FakeConnectionManager(), ["a"])
+
+    cooldowns = []
+    for _ in range(7):
+        router._record("a", None, False)
+        cooldowns.append(router._stats["a"].cooldown_until - now)
+    assert cooldowns == [30, 60, 120, 240, 480, MAX_FAILURE_COOLDOWN, MAX_FAILURE_COOLDOWN]
+
+    # One success clears the cooldown and the backoff
+    router._record("a", 1.0, True)
+    router._record("a", None, False)
+    assert router._stats["a"].cooldown_until - now == FAILURE_COOLDOWN
+
+
+def test_rate_limited_provider_waits_for_its_reset():
+    retry_at = time.time() + 3600
+    manager = FakeConnectionManager(a=(0, RateLimited("a", "generate-text", retry_at)), b=(0, None))
+    router = LLMRouter(manager, ["a", "b"])
+
+    assert router.generate("prompt", "system") is None
+    assert router._stats["a"].cooldown_until == retry_at
+    # Both are cooling down: "b" ends its cooldown first, so it is tried first
+    assert router.ranked() == ["b", "a"]
+
+
+def slow_first_fails():
+    # "a" is hedged on "b", then fails while "b" is still running; "c" answers instantly if asked
+    return FakeConnectionManager(a=(0.2, None), b=(0.5, "from b"), c=(0, "from c"))
+
+
+def test_hedges_at_most_once_when_the_original_fails():
+    manager = slow_first_fails()
+    router = LLMRouter(manager, ["a", "b", "c"], hedge_after=0.05)
+    try:
+        assert router.generate("prompt", "system") == "from b"
+    finally:
+        router.close()
+    assert manager.calls == ["a", "b"]
+
+
+def test_hedges_at_most_once_when_the_original_fails_async():
+    manager = slow_first_fails()
+    router = LLMRouter(manager, ["a", "b", "c"], hedge_after=0.05)
+    assert asyncio.run(router.generate_async("prompt", "system")) == "from b"
+    assert manager.calls == ["a", "b"]
+
+
+def test_close_shuts_down_the_hedging_threads():
+    manager = FakeConnectionManager(a=(0.1, "from a"), b=(0, "from b"))
+    router = LLMRouter(manager, ["a", "b"], hedge_after=5)
+
+    assert router.generate("prompt", "system") == "from a"
+    executor = router._executor
+    router.close()
+    assert router._executor is None
+    assert executor._shutdown
+
+    # A closed router starts new threads on the next hedged request
+    assert router.generate("prompt", "system") is not None
+    assert router._executor is not executor
+    router.close()
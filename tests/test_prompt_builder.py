@@ -0,0 +1,49 @@
+from src.connections.anthropic_connection import PROMPT_CACHE_CONTROL, AnthropicConnection
+from src.connections.base_connection import system_prompt_parts, system_prompt_text
+from src.prompt_builder import PromptBuilder
+
+
+def build(example_tweets):
+    builder = PromptBuilder()
+    builder.add("bio", ["I am a test agent."], priority=0)
+    builder.add("traits", ["- curious"], header="Your key traits are:", priority=0)
+    builder.add("example_tweets", example_tweets, stable=False, priority=2)
+    return builder
+
+
+def test_build_parts_keeps_the_stable_sections_first():
+    stable, volatile = build(["- gm", "- wagmi"]).build_parts()
+
+    assert stable == "I am a test agent.\nYour key traits are:\n- curious"
+    assert volatile == "- gm\n- wagmi"
+    assert build(["- gm", "- wagmi"]).build() == f"{stable}\n{volatile}"
+    assert build([]).build() == stable
+
+
+def test_system_prompt_parsers():
+    assert system_prompt_text(("stable", "volatile")) == "stable\nvolatile"
+    assert system_prompt_text(("stable", "")) == "stable"
+    assert system_prompt_text("plain") == "plain"
+    assert system_prompt_parts("plain") == ("plain", "")
+    assert system_prompt_parts(["stable", "volatile"]) == ("stable", "volatile")
+
+
+def test_anthropic_caches_only_the_stable_part():
+    connection = AnthropicConnection({"model": "claude-3-5-sonnet-20241022"})
+    parts = build(["- gm"]).build_parts()
+
+    first = connection._system_blocks(parts)
+    refreshed = connection._system_blocks(build(["- gn"]).build_parts())
+    assert first[0] == refreshed[0] == {"type": "text", "text": parts[0], "cache_control": PROMPT_CACHE_CONTROL}
+    assert first[1] == {"type": "text", "text": "- gm"}
+    assert refreshed[1] == {"type": "text", "text": "- gn"}
+
+    # Prompts not split into parts are cached whole
+    assert connection._system_blocks("You are helpful.") == [
+        {"type": "text", "text": "You are helpful.", "cache_control": PROMPT_CACHE_CONTROL}
+    ]
+
+
+def test_anthropic_without_prompt_caching_sends_one_string():
+    connection = AnthropicConnection({"model": "claude-3-5-sonnet-20241022", "prompt_caching": False})
+    assert connection._system_blocks(("stable", "volatile")) == "stable\nvolatile"
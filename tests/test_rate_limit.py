@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from src.helpers.rate_limit import RateLimited, RateLimitGovernor, endpoint_key
+
+TIMELINE = "GET /2/users/:id/timelines/reverse_chronological"
+
+
+class Response:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+
+
+def test_endpoint_key_folds_ids():
+    assert endpoint_key("get", "2/users/1234567890/timelines/reverse_chronological?max_results=5") == TIMELINE
+    assert endpoint_key("GET", "/channels/1234567890/messages", major_params=("channels",)) == \
+        "GET /channels/1234567890/messages"
+
+
+def test_bucket_is_spent_until_empty():
+    governor = RateLimitGovernor()
+    reset = time.time() + 900
+    governor.update("twitter", TIMELINE, 200, {
+        "x-rate-limit-limit": "180", "x-rate-limit-remaining": "2", "x-rate-limit-reset": str(int(reset))
+    })
+
+    governor.acquire("twitter", TIMELINE)
+    governor.acquire("twitter", TIMELINE)
+    with pytest.raises(RateLimited) as raised:
+        governor.acquire("twitter", TIMELINE)
+    assert raised.value.retry_at == pytest.approx(int(reset), abs=1)
+    assert 880 < raised.value.retry_after <= 900
+
+    # Other endpoints and platforms keep their own budgets
+    governor.acquire("twitter", "POST /2/tweets")
+    governor.acquire("discord", TIMELINE)
+
+
+def test_bucket_refills_after_reset():
+    governor = RateLimitGovernor()
+    governor.update("twitter", TIMELINE, 200, {
+        "x-rate-limit-limit": "5", "x-rate-limit-remaining": "0", "x-rate-limit-reset": str(time.time() - 1)
+    })
+    governor.acquire("twitter", TIMELINE)
+    assert governor.status("twitter")[f"twitter {TIMELINE}"]["remaining"] == 4
+
+
+def test_short_waits_are_slept_through():
+    governor = RateLimitGovernor(max_inline_wait=1)
+    governor.update("discord", "POST /channels/1/messages", 200, {
+        "X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.1"
+    })
+    started = time.monotonic()
+    governor.acquire("discord", "POST /channels/1/messages")
+    assert time.monotonic() - started >= 0.05
+
+
+def test_429_raises_with_retry_after():
+    governor = RateLimitGovernor()
+    with pytest.raises(RateLimited) as raised:
+        governor.check_response("echochambers", "GET /api/rooms", Response(429, {"Retry-After": "30"}))
+    assert raised.value.retry_at == pytest.approx(time.time() + 30, abs=1)
+    assert governor.delay("echochambers", "GET /api/rooms") > 28
+
+
+def test_global_limit_blocks_every_endpoint():
+    governor = RateLimitGovernor()
+    governor.update("discord", "GET /channels/1/messages", 429, {"Retry-After": "10", "X-RateLimit-Global": "true"})
+
+    with pytest.raises(RateLimited):
+        governor.acquire("discord", "POST /channels/2/messages")
+    governor.acquire("twitter", TIMELINE)
+
+
+def test_daily_cap_outlasts_the_window():
+    governor = RateLimitGovernor()
+    governor.update("twitter", "POST /2/tweets", 200, {
+        "x-rate-limit-limit": "100", "x-rate-limit-remaining": "99", "x-rate-limit-reset": str(time.time() + 900),
+        "x-user-limit-24hour-limit": "17", "x-user-limit-24hour-remaining": "0",
+        "x-user-limit-24hour-reset": str(time.time() + 20000),
+    })
+
+    with pytest.raises(RateLimited) as raised:
+        governor.acquire("twitter", "POST /2/tweets")
+    assert raised.value.retry_after > 19000
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+from src.scheduler import ScheduledTask, TaskScheduler
+
+
+def make_scheduler(loop_delay=0.02, **overrides):
+    tasks = [
+        ScheduledTask("post", weight=1, **overrides.get("post", {})),
+        ScheduledTask("reply", weight=3, **overrides.get("reply", {})),
+        ScheduledTask("idle", weight=0),
+    ]
+    return TaskScheduler(tasks, loop_delay)
+
+
+def next_tasks(scheduler, count):
+    async def run():
+        return [await scheduler.next_task() for _ in range(count)]
+    return asyncio.run(run())
+
+
+def test_period_follows_the_weights():
+    scheduler = make_scheduler(loop_delay=10, post={"min_interval": 60})
+    assert scheduler.period("reply") == pytest.approx(10 * 4 / 3)
+    # 10 * 4 / 1 = 40 is below post's min_interval
+    assert scheduler.period("post") == 60
+    assert scheduler.period("idle") is None
+
+
+def test_tasks_come_due_in_order():
+    scheduler = make_scheduler()
+    assert next_tasks(scheduler, 2) == ["post", "reply"]
+    assert scheduler.stats()["idle"]["due_in"] is None
+
+
+def test_completed_tasks_are_rescheduled_by_period():
+    scheduler = make_scheduler(loop_delay=0.01)
+
+    async def run():
+        for _ in range(20):
+            scheduler.complete(await scheduler.next_task(), True)
+    asyncio.run(run())
+
+    # reply has three times post's weight, so it runs about three times as often
+    assert scheduler.tasks["reply"].runs + scheduler.tasks["post"].runs == 20
+    assert scheduler.tasks["reply"].runs >= 2 * scheduler.tasks["post"].runs
+    assert scheduler.tasks["idle"].runs == 0
+
+
+def test_complete_false_backs_off_for_the_cooldown():
+    scheduler = make_scheduler(loop_delay=10, reply={"cooldown": 2})
+    now = time.time()
+
+    due = scheduler.complete("reply", False)
+    assert due == pytest.approx(now + 2, abs=0.5)
+    assert scheduler.tasks["reply"].skips == 1
+    assert not scheduler.tasks["reply"].last_success
+
+    # Without a cooldown a task that did nothing waits a whole period
+    due = scheduler.complete("post", False)
+    assert due == pytest.approx(now + scheduler.period("post"), abs=0.5)
+
+
+def test_retry_now_only_after_a_run_that_did_nothing():
+    scheduler = make_scheduler(loop_delay=10, reply={"cooldown": 60})
+    scheduler.complete("post", True)
+    scheduler.complete("reply", False)
+
+    scheduler.retry_now("post")
+    scheduler.retry_now("reply")
+    assert scheduler.stats()["reply"]["due_in"] == 0
+    assert scheduler.stats()["post"]["due_in"] > 30
+
+
+def test_defer_does_not_count_a_skip():
+    scheduler = make_scheduler(loop_delay=10)
+    until = time.time() + 5
+    scheduler.defer("post", until)
+
+    assert scheduler.stats()["post"]["due_in"] == pytest.approx(5, abs=0.5)
+    assert scheduler.tasks["post"].skips == 0
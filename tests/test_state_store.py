@@ -0,0 +1,152 @@
+import time
+
+import pytest
+
+from src import state_store
+from src.state_store import AgentState, BoundedSet, SQLiteStateStore, StateStore, open_state_store
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(state_store.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStateStore(tmp_path / "agent.db", retention_days=1)
+    yield store
+    store.close()
+
+
+def reopen(store):
+    store.close()
+    return SQLiteStateStore(store.path, retention_days=store.retention / 86400)
+
+
+def stored_members(store, namespace):
+    rows = store._db.execute("SELECT member FROM members WHERE namespace = ? ORDER BY added_at", (namespace,))
+    return [member for member, in rows]
+
+
+def test_bounded_set_forgets_the_oldest_past_its_limit():
+    members = BoundedSet(limit=3, members=["a", "b", "c"])
+    assert members.add("d")
+    assert not members.add("d")
+    assert list(members) == ["b", "c", "d"]
+    assert "a" not in members
+
+
+def test_bounded_set_expires_members_outside_its_window(clock):
+    members = BoundedSet(window=60)
+    members.add("old")
+    clock.now += 30
+    members.add("new")
+    clock.now += 31
+
+    assert "old" not in members
+    assert list(members) == ["new"]
+    # An expired member can be added again
+    assert members.add("old")
+
+
+def test_members_survive_a_restart(store):
+    replied = store.member_set("replied", limit=10)
+    replied.add("1")
+    replied.add("2")
+    store.set_value("last_tweet_time", 1234)
+
+    store = reopen(store)
+    assert list(store.member_set("replied", limit=10)) == ["1", "2"]
+    assert store.load_values(["last_tweet_time", "missing"]) == {"last_tweet_time": 1234}
+    store.close()
+
+
+def test_prune_drops_members_past_the_retention_period(store, clock):
+    replied = store.member_set("replied")
+    replied.add("old")
+    clock.now += 2 * 86400
+    replied.add("new")
+
+    store.prune()
+    assert stored_members(store, "replied") == ["new"]
+
+
+def test_prune_keeps_members_for_a_longer_window(store, clock):
+    seen = store.member_set("seen", window=7 * 86400)
+    seen.add("old")
+    clock.now += 2 * 86400
+
+    store.prune()
+    assert stored_members(store, "seen") == ["old"]
+
+    clock.now += 6 * 86400
+    store.prune()
+    assert stored_members(store, "seen") == []
+
+
+def test_prune_trims_sets_to_their_limit(store, clock):
+    replied = store.member_set("replied", limit=2)
+    for member in ("1", "2", "3", "4"):
+        replied.add(member)
+        clock.now += 1
+
+    store.prune()
+    assert stored_members(store, "replied") == ["3", "4"]
+
+
+def test_adds_trigger_a_prune(store, clock, monkeypatch):
+    monkeypatch.setattr(state_store, "PRUNE_EVERY", 3)
+    replied = store.member_set("replied", limit=2)
+    for member in ("1", "2"):
+        replied.add(member)
+        clock.now += 1
+    assert len(stored_members(store, "replied")) == 2
+
+    replied.add("3")
+    assert stored_members(store, "replied") == ["2", "3"]
+
+
+def test_message_log_keeps_the_last_entries(store):
+    log = store.message_log("sent", maxlen=2)
+    for entry in ({"id": 1}, {"id": 2}, {"id": 3}):
+        log.append(entry)
+    assert list(log) == [{"id": 2}, {"id": 3}]
+
+    store = reopen(store)
+    assert list(store.message_log("sent", maxlen=2)) == [{"id": 2}, {"id": 3}]
+    assert store._db.execute("SELECT COUNT(*) FROM log").fetchone() == (2,)
+    store.close()
+
+
+def test_agent_state_writes_through(store):
+    state = AgentState(store, ["last_tweet_time"], {"replied_tweets": (10, None)})
+    state["last_tweet_time"] = 99
+    state["replied_tweets"].add("5")
+    state["replied_tweets"] = {"6", "7"}
+    state["scratch"] = "not persisted"
+
+    store = reopen(store)
+    state = AgentState(store, ["last_tweet_time"], {"replied_tweets": (10, None)})
+    assert state["last_tweet_time"] == 99
+    assert sorted(state["replied_tweets"]) == ["6", "7"]
+    assert "scratch" not in state
+    store.close()
+
+
+def test_open_state_store_backends(tmp_path):
+    assert type(open_state_store("agent", {"backend": "memory"})) is StateStore
+    store = open_state_store("agent", {"path": str(tmp_path / "agent.db")})
+    assert isinstance(store, SQLiteStateStore)
+    store.close()
+    with pytest.raises(ValueError):
+        open_state_store("agent", {"backend": "redis"})
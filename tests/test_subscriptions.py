@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from src.helpers.checkpoints import CheckpointStore
+from src.subscriptions import TRANSFER_TOPIC, ChainEvent, EventQueue, EvmWatcher, Watcher
+
+WALLET = "0x" + "11" * 20
+SENDER = "0x" + "22" * 20
+TOKEN = "0x" + "33" * 20
+
+
+class StubEth:
+    """The parts of web3.eth the watcher reads, backed by an in-memory chain"""
+
+    def __init__(self):
+        self.block_number = 0
+        self.logs = []
+
+    def get_block(self, number):
+        return {"hash": number.to_bytes(32, "big"), "timestamp": 1700000000 + number, "transactions": [b"tx"] * number}
+
+    def get_logs(self, params):
+        return [
+            log for log in self.logs
+            if params["fromBlock"] <= log["blockNumber"] <= params["toBlock"]
+        ]
+
+
+class StubWeb3:
+    def __init__(self):
+        self.eth = StubEth()
+
+    def mine(self, count=1):
+        self.eth.block_number += count
+
+    def transfer(self, value, tx_hash, log_index=0):
+        self.eth.logs.append({
+            "address": TOKEN,
+            "topics": [
+                bytes.fromhex(TRANSFER_TOPIC[2:]),
+                bytes(12) + bytes.fromhex(SENDER[2:]),
+                bytes(12) + bytes.fromhex(WALLET[2:])
+            ],
+            "data": value.to_bytes(32, "big"),
+            "blockNumber": self.eth.block_number,
+            "transactionHash": tx_hash,
+            "logIndex": log_index
+        })
+
+
+def drain(queue: EventQueue):
+    return [queue._queue.get_nowait() for _ in range(queue.qsize())]
+
+
+@pytest.fixture
+def chain():
+    web3 = StubWeb3()
+    web3.mine(10)
+    return web3
+
+
+def make_watcher(web3, checkpoints):
+    return EvmWatcher("sonic", web3, checkpoints, address=WALLET)
+
+
+def test_watcher_is_abstract():
+    with pytest.raises(TypeError):
+        Watcher("base", CheckpointStore(), 1, None)
+
+
+def test_evm_watcher_emits_blocks_and_transfers(chain):
+    checkpoints = CheckpointStore()
+    watcher = make_watcher(chain, checkpoints)
+    queue = EventQueue()
+
+    # The first poll only records the head
+    asyncio.run(watcher.poll(queue))
+    assert queue.qsize() == 0
+    assert checkpoints.get("sonic:block") == 10
+
+    chain.mine()
+    chain.transfer(5 * 10 ** 18, b"\xaa" * 32)
+    chain.mine()
+    asyncio.run(watcher.poll(queue))
+
+    events = drain(queue)
+    blocks = [event for event in events if event.kind == "block"]
+    transfers = [event for event in events if event.kind == "transfer"]
+    assert [event.data["number"] for event in blocks] == [11, 12]
+    assert len(transfers) == 1
+    assert transfers[0].data["value"] == 5 * 10 ** 18
+    assert transfers[0].data["from"].lower() == SENDER
+    assert transfers[0].data["block"] == 11
+    assert checkpoints.get("sonic:block") == 12
+
+
+def test_evm_watcher_resumes_from_checkpoint(chain, tmp_path):
+    path = tmp_path / "checkpoints.json"
+    asyncio.run(make_watcher(chain, CheckpointStore(path)).poll(EventQueue()))
+
+    # Blocks mined while the agent was down are picked up by a fresh watcher, and only those
+    chain.mine()
+    chain.transfer(7, b"\xbb" * 32)
+    chain.mine(2)
+    queue = EventQueue()
+    watcher = make_watcher(chain, CheckpointStore(path))
+    asyncio.run(watcher.poll(queue))
+
+    events = drain(queue)
+    assert [event.data["number"] for event in events if event.kind == "block"] == [11, 12, 13]
+    assert [event.data["value"] for event in events if event.kind == "transfer"] == [7]
+    assert CheckpointStore(path).get("sonic:block") == 13
+
+    asyncio.run(watcher.poll(queue))
+    assert queue.qsize() == 0
+
+
+def test_event_queue_drops_duplicates():
+    queue = EventQueue()
+    event = ChainEvent("sonic", "block", "sonic:block:0x01")
+
+    assert queue.put(event)
+    assert not queue.put(ChainEvent("sonic", "block", "sonic:block:0x01"))
+    assert queue.put(ChainEvent("sonic", "block", "sonic:block:0x02"))
+    assert queue.qsize() == 2
+
+
+def test_event_queue_drops_oldest_when_full():
+    queue = EventQueue(maxsize=2)
+    for number in range(3):
+        queue.put(ChainEvent("sonic", "block", f"sonic:block:{number}"))
+
+    assert [event.id for event in drain(queue)] == ["sonic:block:1", "sonic:block:2"]
+    # Dropped events still count as seen
+    assert not queue.put(ChainEvent("sonic", "block", "sonic:block:0"))
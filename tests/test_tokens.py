@@ -0,0 +1,50 @@
+from src.helpers import tokens
+from src.helpers.tokens import Tokenizer, estimate_tokens, fit_recent, get_tokenizer, truncate_to_tokens
+from src.prompt_builder import PromptBuilder
+
+
+class CharEncoding:
+    """A tiktoken-like encoding with one token per character"""
+
+    def encode(self, text, disallowed_special=()):
+        return [ord(char) for char in text]
+
+    def decode(self, ids):
+        return "".join(chr(i) for i in ids)
+
+
+def test_estimate_is_padded():
+    text = "word " * 100
+    assert estimate_tokens(text) >= len(text) / tokens.CHARS_PER_TOKEN * tokens.ESTIMATE_SAFETY_MARGIN
+    assert estimate_tokens("") == 0
+
+
+def test_truncated_estimate_fits_the_budget():
+    text = "lorem ipsum dolor sit amet " * 200
+    cut = truncate_to_tokens(text, 50)
+    assert cut.endswith("...")
+    assert estimate_tokens(cut) <= 50
+
+
+def test_tokenizer_counts_and_cuts_exactly():
+    tokenizer = Tokenizer(CharEncoding())
+    assert estimate_tokens("hello world", tokenizer) == 11
+    assert truncate_to_tokens("hello world", 20, tokenizer=tokenizer) == "hello world"
+    assert truncate_to_tokens("hello brave new world", 15, tokenizer=tokenizer) == "hello brave..."
+    assert fit_recent(["aaaa", "bbbb", "cccc"], 9, tokenizer=tokenizer) == ["bbbb", "cccc"]
+
+
+def test_prompt_builder_budgets_with_the_tokenizer():
+    builder = PromptBuilder(budget=12, tokenizer=Tokenizer(CharEncoding()))
+    builder.add("bio", ["bio"], priority=0)
+    builder.add("examples", ["- one", "- two"], priority=1)
+
+    assert builder.build() == "bio\n- one"
+    assert builder.tokens == 8
+    assert builder.dropped["examples"] == 1
+
+
+def test_only_openai_gets_a_tokenizer(monkeypatch):
+    assert get_tokenizer("anthropic", "claude-3-5-sonnet-20241022") is None
+    monkeypatch.setattr(tokens, "tiktoken", None)
+    assert get_tokenizer("openai", "gpt-4o") is None
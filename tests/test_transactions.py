@@ -0,0 +1,129 @@
+import threading
+
+import pytest
+
+from src.helpers.evm.transactions import NonceManager, TransactionPipeline
+
+ADDRESS = "0x" + "44" * 20
+
+
+class FakeEth:
+    """A node that accepts transactions whose nonce is next for the account, and mines on demand"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.confirmed = 0
+        self.accepted = {}
+        self.mined = {}
+        self.fail_next_send = False
+        self.count_reads = 0
+
+    def get_transaction_count(self, address, block_identifier):
+        with self._lock:
+            self.count_reads += 1
+            return self.confirmed + len(self.accepted)
+
+    def send_raw_transaction(self, raw):
+        with self._lock:
+            if self.fail_next_send:
+                self.fail_next_send = False
+                raise ValueError("connection reset")
+            if raw["nonce"] != self.confirmed + len(self.accepted):
+                raise ValueError(f"nonce too high: {raw['nonce']}")
+            tx_hash = raw["nonce"].to_bytes(32, "big")
+            self.accepted[tx_hash] = raw
+            return tx_hash
+
+    def mine(self):
+        with self._lock:
+            for number, (tx_hash, raw) in enumerate(sorted(self.accepted.items(), key=lambda item: item[1]["nonce"])):
+                self.mined[tx_hash] = {"status": 1, "blockNumber": 100 + number}
+            self.confirmed += len(self.accepted)
+            self.accepted = {}
+
+    def drop(self):
+        with self._lock:
+            self.accepted = {}
+
+    def get_transaction_receipt(self, tx_hash):
+        return self.mined.get(tx_hash)
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+class SignedTransaction:
+    def __init__(self, tx):
+        self.rawTransaction = tx
+
+
+class FakeAccount:
+    address = ADDRESS
+
+    def sign_transaction(self, tx):
+        return SignedTransaction(tx)
+
+
+@pytest.fixture
+def web3():
+    web3 = FakeWeb3()
+    web3.eth.confirmed = 7
+    return web3
+
+
+def make_pipeline(web3, **kwargs):
+    return TransactionPipeline(web3, FakeAccount(), poll_interval=0.01, **kwargs)
+
+
+def test_nonces_are_consecutive_from_the_pending_count(web3):
+    nonces = NonceManager(web3, ADDRESS)
+    assert [nonces.next() for _ in range(3)] == [7, 8, 9]
+    assert web3.eth.count_reads == 1
+
+
+def test_concurrent_sends_get_unique_nonces(web3):
+    pipeline = make_pipeline(web3)
+    threads = [threading.Thread(target=pipeline.send, args=({"to": ADDRESS},)) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(raw["nonce"] for raw in web3.eth.accepted.values()) == list(range(7, 17))
+
+
+def test_failed_send_resyncs_the_nonce(web3):
+    pipeline = make_pipeline(web3)
+    pipeline.send({"to": ADDRESS})
+
+    web3.eth.fail_next_send = True
+    with pytest.raises(ValueError):
+        pipeline.send({"to": ADDRESS})
+
+    # The failed nonce was never used, so the next send reuses it after re-reading the node
+    tx_hash = pipeline.send({"to": ADDRESS})
+    assert web3.eth.accepted[tx_hash]["nonce"] == 8
+    assert web3.eth.count_reads == 2
+
+
+def test_receipts_are_tracked_in_the_background(web3):
+    pipeline = make_pipeline(web3)
+    tx_hash = pipeline.send({"to": ADDRESS}, label="transfer")
+    assert pipeline.pending_count() == 1
+
+    web3.eth.mine()
+    assert pipeline.wait(tx_hash, timeout=2)["status"] == 1
+    assert pipeline.pending_count() == 0
+
+
+def test_dropped_transaction_resyncs_the_nonce(web3):
+    pipeline = make_pipeline(web3, receipt_timeout=0.05)
+    tx_hash = pipeline.send({"to": ADDRESS})
+    web3.eth.drop()
+
+    with pytest.raises(TimeoutError):
+        pipeline.wait(tx_hash, timeout=2)
+    tx_hash = pipeline.send({"to": ADDRESS})
+    assert web3.eth.accepted[tx_hash]["nonce"] == 7